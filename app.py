@@ -3,14 +3,40 @@
 # Réécriture FR (120–800 mots) • Titre FR propre (anti-chiffres) ou traduction stricte du titre source
 # Nettoyage source & corps • Signature: - LesArmeniens.com • Clé OpenAI saisie une fois (ENV → DB)
 
-from flask import Flask, request, redirect, url_for, Response, render_template_string, session, flash
-import sqlite3, os, hashlib, io, traceback, re, threading, time, json as _json
-from datetime import datetime, timezone
-from urllib.parse import urljoin
+from flask import Flask, request, redirect, url_for, Response, render_template_string, session, flash, g, send_file
+from markupsafe import escape
+import sqlite3, os, hashlib, traceback, re, threading, time, heapq, zlib, gzip, codecs, json as _json
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse, urlencode
 import requests
+import urllib3
+import llm
+import metrics
+import profiler
 from bs4 import BeautifulSoup
+import soupsieve as sv
 import feedparser
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
+try:
+    from langdetect import DetectorFactory, detect_langs
+    from langdetect.lang_detect_exception import LangDetectException
+    DetectorFactory.seed = 0             # résultats déterministes
+except ImportError:                      # détection réduite à l'écriture + mots-outils FR
+    detect_langs = None
+import cpuwork
+from cpuwork import compile_extractor, extract_with, find_main_image_in_html
+from textnorm import (
+    TARGET_MIN_WORDS, TARGET_MAX_WORDS, SIGNATURE,
+    strip_tags, looks_french, word_count, alpha_ratio, digit_ratio,
+    ensure_signature, normalize_title, title_from_text, clean_body_text, ensure_min_words,
+    normalize_edited_body, truncate_text,
+)
 
 # ================== CONFIG ==================
 APP_NAME   = "Console Arménienne"
@@ -23,9 +49,52 @@ AUTO_PUBLISH = True                    # Publie immédiatement tout nouvel artic
 REQUIRE_IMAGE = True                   # Photo obligatoire
 IMPORT_INTERVAL_MIN = int(os.environ.get("IMPORT_INTERVAL_MIN", "10"))  # boucle auto (minutes)
 
-# Longueurs cibles (mots)
-TARGET_MIN_WORDS = int(os.environ.get("TARGET_MIN_WORDS", "120"))
-TARGET_MAX_WORDS = int(os.environ.get("TARGET_MAX_WORDS", "800"))
+# Tâches de fond dans le processus web (défaut) ; WEB_BACKGROUND=0 : confiées à `python -m worker run`
+# (même machine, même site.db) — le web ne fait plus que lire, écrire la modération et mettre en file.
+WEB_BACKGROUND = os.environ.get("WEB_BACKGROUND", "1") != "0"
+ROLE = {"worker": False}               # vrai dans le processus worker (voir worker.py)
+SCHED_RESYNC_S = int(os.environ.get("SCHED_RESYNC_S", "15"))   # worker : relecture des échéances en base
+IMPORT_LEASE_S = 3600                  # un seul import à la fois, tous processus confondus
+# Écritures de l'import par lots : une transaction par source, ou plus tôt passé N articles / S secondes
+IMPORT_BATCH_ROWS = int(os.environ.get("IMPORT_BATCH_ROWS", "20"))
+IMPORT_BATCH_S    = float(os.environ.get("IMPORT_BATCH_S", "30"))
+
+# Maintenance (archivage + ménage images + VACUUM)
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "180"))       # 0 = pas d'archivage
+MAINTENANCE_INTERVAL_H = int(os.environ.get("MAINTENANCE_INTERVAL_H", "24"))
+
+# Rattrapage (backfill) via l'API batch
+BACKFILL_BATCH_MAX = int(os.environ.get("BACKFILL_BATCH_MAX", "500"))    # lignes par batch
+BACKFILL_POLL_S    = int(os.environ.get("BACKFILL_POLL_S", "60"))
+
+# Cache disque des pages/flux bruts (ré-extraction hors ligne)
+PAGE_CACHE_DIR    = os.environ.get("PAGE_CACHE_DIR", "page_cache")
+PAGE_CACHE_MAX_MB = int(os.environ.get("PAGE_CACHE_MAX_MB", "200"))     # 0 = cache désactivé
+IMAGES_DIR = "static/images"
+
+# Récupération des pages/flux : lecture en flux, bornée en taille (le reste est ignoré)
+PAGE_MAX_BYTES = int(os.environ.get("PAGE_MAX_BYTES", str(2 * 1024 * 1024)))
+FEED_MAX_BYTES = int(os.environ.get("FEED_MAX_BYTES", str(5 * 1024 * 1024)))
+SITEMAP_MAX_BYTES = int(os.environ.get("SITEMAP_MAX_BYTES", str(50 * 1024 * 1024)))   # décompressés, par sitemap
+PAGE_TYPES = ("text/html", "application/xhtml+xml", "text/plain")   # Content-Type acceptés pour une page
+
+# Longueurs cibles (mots) : TARGET_MIN_WORDS / TARGET_MAX_WORDS (ENV, défaut 120/800) — voir textnorm.py
+
+# Articles longs : au-delà de SINGLE_CALL_MAX_CHARS, découpage par paragraphes + condensation en parallèle
+SINGLE_CALL_MAX_CHARS = int(os.environ.get("SINGLE_CALL_MAX_CHARS", "5000"))
+# ARTICLE_MAX_CHARS (ENV, défaut 60000) : borne de sécurité à l'extraction — voir cpuwork.py
+CHUNK_MAX_TOKENS      = int(os.environ.get("CHUNK_MAX_TOKENS", "1500"))
+CHUNK_PARALLEL        = int(os.environ.get("CHUNK_PARALLEL", "4"))
+
+# Pool de processus pour le parsing HTML / l'encodage d'images (0 = tout dans le processus web)
+CPU_WORKERS   = int(os.environ.get("CPU_WORKERS", "0"))
+CPU_RECYCLE   = int(os.environ.get("CPU_RECYCLE", "200"))     # tâches par worker avant remplacement
+CPU_TIMEOUT_S = int(os.environ.get("CPU_TIMEOUT_S", "60"))
+
+# Diffusion à la publication : hub WebSub (annoncé dans /rss.xml) + webhooks, via une file sortante
+PUBLIC_URL    = os.environ.get("PUBLIC_URL", "").rstrip("/")   # défaut du paramètre admin site_url
+WEBSUB_HUB    = os.environ.get("WEBSUB_HUB", "")                # défaut du paramètre admin websub_hub
+OUTBOUND_MAX_ATTEMPTS = int(os.environ.get("OUTBOUND_MAX_ATTEMPTS", "8"))
 
 # ---- RSS par défaut
 DEFAULT_FEEDS = [
@@ -124,6 +193,9 @@ DEFAULT_SCRAPERS = [
     }
 ]
 
+# /metrics : si défini, exige ?token=... ou "Authorization: Bearer ..." (METRICS_ENABLED=0 désactive tout, voir metrics.py)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "").strip()
+
 # OpenAI via ENV (écrasé par les paramètres admin si saisis)
 ENV_OPENAI_KEY   = os.environ.get("OPENAI_API_KEY", "").strip()
 ENV_OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini").strip() or "gpt-4o-mini"
@@ -131,12 +203,51 @@ ENV_OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini").strip() or "gpt
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
 
+if metrics.ENABLED:
+    @app.before_request
+    def _metrics_start():
+        g.t0 = time.perf_counter()
+
+    @app.after_request
+    def _metrics_stop(resp):
+        route = request.url_rule.rule if request.url_rule else "(inconnue)"
+        metrics.observe("http_request_seconds", time.perf_counter() - g.get("t0", time.perf_counter()), route=route)
+        metrics.inc("http_requests_total", route=route, status=resp.status_code)
+        return resp
+
+# Profilage à la demande (armé depuis l'admin) : un test de dict par requête sinon
+@app.before_request
+def _profile_start():
+    if profiler.ARMED["remaining"] and request.url_rule:
+        g.prof = profiler.request_start(request.url_rule.rule)
+
+@app.teardown_request
+def _profile_stop(_exc):
+    token = g.pop("prof", None)
+    if token:
+        profiler.request_stop(token)
+
 # ================== DB ==================
 def db():
     con = sqlite3.connect(DB_PATH, check_same_thread=False)
     con.row_factory = sqlite3.Row
     return con
 
+def utc_iso(value) -> str | None:
+    """Date ISO (ou 'AAAA-MM-JJ HH:MM:SS', naïve = UTC) → 'AAAA-MM-JJTHH:MM:SS+00:00' ; None si illisible.
+    Format unique de published_at / updated_at : les comparaisons de chaînes suivent l'ordre chronologique."""
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+def now_iso() -> str:
+    """Horodatage UTC au format de utc_iso (updated_at, published_at…)."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
 def column_exists(con, table, name):
     rows = con.execute(f"PRAGMA table_info({table})").fetchall()
     return any(r["name"] == name for r in rows)
@@ -156,14 +267,149 @@ def init_db():
         orig_link TEXT UNIQUE,
         source TEXT
     )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS posts_archive(
+        id INTEGER PRIMARY KEY,
+        orig_link TEXT UNIQUE,
+        source TEXT,
+        created_at TEXT,
+        archived_at TEXT,
+        data BLOB                            -- ligne posts complète, JSON compressé zlib
+    )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS scraper_samples(
+        name TEXT PRIMARY KEY,               -- nom du scraper
+        url TEXT,
+        html BLOB,                           -- page article nettoyée, zlib
+        fetched_at TEXT
+    )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS backfill_jobs(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        orig_link TEXT UNIQUE,
+        source TEXT,
+        title_src TEXT,
+        raw_text TEXT,
+        img_url TEXT,
+        status TEXT DEFAULT 'pending',       -- pending | submitted | done | failed
+        batch_id TEXT,
+        error TEXT,
+        created_at TEXT,
+        updated_at TEXT
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_backfill_status ON backfill_jobs(status, batch_id)")
+    con.execute("""CREATE TABLE IF NOT EXISTS page_cache(
+        url TEXT PRIMARY KEY,
+        kind TEXT,                           -- page | feed
+        sha1 TEXT,                           -- contenu adressé: PAGE_CACHE_DIR/ab/<sha1>.z
+        size INTEGER,                        -- octets compressés
+        fetched_at TEXT
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_sha1 ON page_cache(sha1)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_kind ON page_cache(kind, fetched_at)")
+    con.execute("""CREATE TABLE IF NOT EXISTS outbound_queue(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT,                           -- websub | webhook
+        url TEXT,
+        body TEXT,                           -- formulaire (websub) ou JSON (webhook)
+        status TEXT DEFAULT 'pending',       -- pending | done | failed
+        attempts INTEGER DEFAULT 0,
+        next_at TEXT,
+        last_error TEXT,
+        created_at TEXT
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_outbound_due ON outbound_queue(status, next_at)")
+    con.execute("""CREATE TABLE IF NOT EXISTS leases(
+        name TEXT PRIMARY KEY,               -- verrou inter-processus (ex. import)
+        owner TEXT,
+        expires_at REAL
+    )""")
+    con.execute("""CREATE TABLE IF NOT EXISTS worker_tasks(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT,                           -- import | maintenance | backfill | url | rewrite
+        arg TEXT,                            -- JSON
+        status TEXT DEFAULT 'pending',       -- pending | running | done | failed
+        result TEXT,
+        created_at TEXT,
+        finished_at TEXT
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_worker_tasks_status ON worker_tasks(status, id)")
+    con.execute("""CREATE TABLE IF NOT EXISTS post_tombstones(
+        id INTEGER PRIMARY KEY,              -- article sorti de la publication (synchro /api/posts)
+        removed_at TEXT,
+        reason TEXT                          -- unpublish | schedule | delete | archive
+    )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_tombstones_removed ON post_tombstones(removed_at)")
     con.execute("""CREATE TABLE IF NOT EXISTS settings(
         key TEXT PRIMARY KEY,
         value TEXT
     )""")
     if not column_exists(con, "posts", "publish_at"):
         con.execute("ALTER TABLE posts ADD COLUMN publish_at TEXT")
+    # fragments pré-rendus (calculés à l'écriture, voir refresh_fragments)
+    for col in ("excerpt", "card_html", "rss_item"):
+        if not column_exists(con, "posts", col):
+            con.execute(f"ALTER TABLE posts ADD COLUMN {col} TEXT")
+    # image : dimensions, aperçu flou (data URI), variantes srcset — voir cpuwork.image_meta
+    for col, typ in (("image_w", "INTEGER"), ("image_h", "INTEGER"), ("image_lqip", "TEXT"), ("image_srcset", "TEXT")):
+        if not column_exists(con, "posts", col):
+            con.execute(f"ALTER TABLE posts ADD COLUMN {col} {typ}")
+    # date de (dernière) mise en ligne : pubDate du flux, filtre ?since= — reprise de publish_at/created_at
+    if not column_exists(con, "posts", "published_at"):
+        con.execute("ALTER TABLE posts ADD COLUMN published_at TEXT")
+        for r in con.execute("SELECT id, publish_at, created_at FROM posts WHERE status='published'").fetchall():
+            con.execute("UPDATE posts SET published_at=? WHERE id=?",
+                        (utc_iso(r["publish_at"] or r["created_at"]), r["id"]))
+    # anti-doublon d'image par contrainte (INSERT … ON CONFLICT, voir write_batch) ; à la création de l'index,
+    # les doublons antérieurs gardent leur image mais perdent leur sha1 (seul le plus ancien le conserve)
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE name='idx_posts_image_sha1'").fetchone():
+        con.execute("UPDATE posts SET image_sha1=NULL WHERE image_sha1 IS NOT NULL AND id NOT IN "
+                    "(SELECT MIN(id) FROM posts WHERE image_sha1 IS NOT NULL GROUP BY image_sha1)")
+        con.execute("CREATE UNIQUE INDEX idx_posts_image_sha1 ON posts(image_sha1)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_posts_status_id ON posts(status, id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_posts_status_published ON posts(status, published_at, id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_posts_status_updated ON posts(status, updated_at, id)")
+    # updated_at au format unique de utc_iso (les anciennes écritures mélangeaient minutes et microsecondes)
+    for r in con.execute("SELECT id, updated_at FROM posts WHERE updated_at IS NOT NULL AND updated_at NOT GLOB "
+                         "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9]+00:00'"
+                         ).fetchall():
+        con.execute("UPDATE posts SET updated_at=? WHERE id=?", (utc_iso(r["updated_at"]), r["id"]))
+    init_fts(con)
+    # nouveau format de fragments → tout recalculer une fois, sinon seulement les manquants
+    v = con.execute("SELECT value FROM settings WHERE key='fragments_version'").fetchone()
+    stale = "" if v and v["value"] == FRAGMENTS_VERSION else " OR 1"
+    for r in con.execute(f"SELECT id FROM posts WHERE card_html IS NULL OR rss_item IS NULL{stale}").fetchall():
+        refresh_fragments(con, r["id"])
+    con.execute("INSERT OR REPLACE INTO settings(key, value) VALUES('fragments_version', ?)", (FRAGMENTS_VERSION,))
     con.commit(); con.close()
 
+# ---- Recherche plein texte (FTS5 sur title/body, synchronisé par triggers)
+FTS_ENABLED = False
+
+def init_fts(con):
+    global FTS_ENABLED
+    try:
+        existed = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='posts_fts'").fetchone() is not None
+        con.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+            title, body, content='posts', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""")
+        con.execute("""CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END""")
+        con.execute("""CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        END""")
+        con.execute("""CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, body ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO posts_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END""")
+        if not existed:
+            # base existante → indexe les articles déjà présents
+            con.execute("INSERT INTO posts_fts(posts_fts) VALUES('rebuild')")
+        FTS_ENABLED = True
+    except sqlite3.OperationalError as e:
+        print("[DB] FTS5 indisponible, recherche en mode LIKE:", e)
+        FTS_ENABLED = False
+
 def get_setting(key, default=""):
     con = db()
     try:
@@ -173,14 +419,102 @@ def get_setting(key, default=""):
         con.close()
 
 def set_setting(key, value):
+    set_settings({key: value})
+
+def set_settings(values: dict):
+    """Plusieurs réglages en un seul commit."""
     con = db()
     try:
-        con.execute("INSERT INTO settings(key,value) VALUES(?,?) "
-                    "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, value))
+        con.executemany("INSERT INTO settings(key,value) VALUES(?,?) "
+                        "ON CONFLICT(key) DO UPDATE SET value=excluded.value", list(values.items()))
         con.commit()
     finally:
         con.close()
 
+# --- Coordination entre processus (web / worker) par la base ---
+def acquire_lease(name: str, ttl_s: float) -> str | None:
+    """Prend le verrou `name` pour ttl_s secondes s'il est libre ou expiré ; renvoie le jeton, sinon None."""
+    token, now = f"{os.getpid()}:{threading.get_ident()}:{time.time()}", time.time()
+    con = db()
+    try:
+        con.execute("INSERT INTO leases(name, owner, expires_at) VALUES(?,?,?) ON CONFLICT(name) DO UPDATE "
+                    "SET owner=excluded.owner, expires_at=excluded.expires_at WHERE leases.expires_at < ?",
+                    (name, token, now + ttl_s, now))
+        con.commit()
+        r = con.execute("SELECT owner FROM leases WHERE name=?", (name,)).fetchone()
+        return token if r and r["owner"] == token else None
+    finally:
+        con.close()
+
+def release_lease(name: str, token: str):
+    con = db()
+    try:
+        con.execute("DELETE FROM leases WHERE name=? AND owner=?", (name, token))
+        con.commit()
+    finally:
+        con.close()
+
+def enqueue_task(kind: str, arg=None) -> int:
+    """Tâche pour le worker (WEB_BACKGROUND=0) ; renvoie son id."""
+    con = db()
+    try:
+        cur = con.execute("INSERT INTO worker_tasks(kind, arg, status, created_at) VALUES(?,?,'pending',?)",
+                          (kind, _json.dumps(arg), datetime.now(timezone.utc).isoformat()))
+        con.commit()
+        return cur.lastrowid
+    finally:
+        con.close()
+
+def claim_task():
+    """Prochaine tâche en attente, marquée 'running' (réclamation atomique), ou None."""
+    con = db()
+    try:
+        while True:
+            r = con.execute("SELECT * FROM worker_tasks WHERE status='pending' ORDER BY id LIMIT 1").fetchone()
+            if not r:
+                return None
+            if con.execute("UPDATE worker_tasks SET status='running' WHERE id=? AND status='pending'",
+                           (r["id"],)).rowcount:
+                con.commit()
+                return r
+    finally:
+        con.close()
+
+def finish_task(task_id: int, ok: bool, result: str):
+    con = db()
+    try:
+        con.execute("UPDATE worker_tasks SET status=?, result=?, finished_at=? WHERE id=?",
+                    ("done" if ok else "failed", (result or "")[:2000], datetime.now(timezone.utc).isoformat(), task_id))
+        con.commit()
+    finally:
+        con.close()
+
+def worker_status_html() -> str:
+    """Admin (WEB_BACKGROUND=0) : dernier signe de vie du worker + tâches en file / récentes."""
+    if WEB_BACKGROUND:
+        return ""
+    con = db()
+    try:
+        counts = {r["status"]: r["n"] for r in con.execute(
+            "SELECT status, COUNT(*) AS n FROM worker_tasks GROUP BY status").fetchall()}
+        last = con.execute("SELECT id, kind, status, result FROM worker_tasks WHERE status IN ('done','failed') "
+                           "ORDER BY id DESC LIMIT 1").fetchone()
+    finally:
+        con.close()
+    beat = get_setting("worker_heartbeat", "")
+    out = f"<br>Worker : {'dernier signe ' + beat[:19].replace('T', ' ') + ' UTC' if beat else 'jamais vu'}"
+    out += f" • tâches : {counts.get('pending', 0)} en attente, {counts.get('running', 0)} en cours"
+    if last:
+        out += f" • #{last['id']} {last['kind']} ({last['status']}) : {escape((last['result'] or '')[:160])}"
+    return out
+
+def run_in_background(kind: str, arg, fn) -> str:
+    """Action admin longue : thread local (WEB_BACKGROUND) ou tâche pour le worker. Renvoie le message flash."""
+    if WEB_BACKGROUND:
+        threading.Thread(target=fn, daemon=True).start()
+        return "lancé en arrière-plan"
+    return f"confié au worker (tâche #{enqueue_task(kind, arg)})"
+
 # --- Bootstrap / cache OpenAI (clé une seule fois) ---
 _OPENAI_CACHE = {"key": None, "model": None}
 
@@ -202,233 +536,104 @@ def active_openai():
     return key, model
 
 # ================== UTILS TEXTE ==================
-TAG_RE = re.compile(r"<[^>]+>")
-FR_TOKENS = set(" le la les un une des du de au aux et en sur pour par avec dans que qui ne pas est été sont était selon afin aussi plus leur lui ses ces cette ce cela donc ainsi tandis alors contre entre vers depuis sans sous après avant comme lorsque tandis que où dont même".split())
-
-TITLE_MIN = 20
-TITLE_MAX = 110
-SITE_SUFFIX_PAT = re.compile(
-    r"\s*(?:[-–|»]\s*)?(?:CivilNet|Armenpress|News\.am|Factor\.am|Hetq|Azatutyun|RFE/RL)\s*$",
-    re.I
-)
-
-def strip_tags(s: str) -> str:
-    return TAG_RE.sub("", s or "")
-
-def looks_french(text: str) -> bool:
-    if not text: return False
-    t = text.lower()
-    words = re.findall(r"[a-zàâäéèêëïîôöùûüç'-]+", t)
-    if not words: return False
-    hits = sum(1 for w in words[:80] if w in FR_TOKENS)
-    return hits >= 5
-
-def _smart_truncate(s: str, limit: int) -> str:
-    if len(s) <= limit:
-        return s
-    cut = s[:limit].rsplit(" ", 1)[0].strip(",.;:—-– ")
-    return cut if len(cut) >= TITLE_MIN else s[:limit].rstrip()
-
-def _clean_punct(s: str) -> str:
-    s = re.sub(r"\s+", " ", s).strip()
-    s = re.sub(r"[\[\(](?:photos?|video|vidéo|live|mise à jour|update)[\]\)]", "", s, flags=re.I)
-    s = re.sub(r"[\[\(].{0,40}?[\]\)]\s*$", "", s)
-    s = re.sub(r"[“”]", '"', s)
-    s = re.sub(r"[‘’]", "'", s)
-    s = s.strip(" -–|:;,.")
-    return s
-
-def _sentence_case(fr: str) -> str:
-    if not fr: return fr
-    fr = fr.strip()
-    if fr.isupper() and len(fr) > 4:
-        fr = fr.capitalize()
-    if fr and fr[0].islower():
-        fr = fr[0].upper() + fr[1:]
-    return fr
-
-# --------- TITRES: anti-chiffres & parasites ----------
-BANNED_TITLE_WORDS = {
-    "lesarmeniens", "lesarmeniens.com", "armenien", "armeniens", "com",
-    "published", "publié", "publication", "rss", "feed",
-    "facebook", "instagram", "twitter", "x", "tiktok", "youtube", "whatsapp"
-}
-
-def _alpha_ratio(s: str) -> float:
-    if not s: return 0.0
-    letters = sum(1 for ch in s if ch.isalpha())
-    return letters / max(1, len(s))
-
-def _digit_ratio(s: str) -> float:
-    if not s: return 0.0
-    digits = sum(1 for ch in s if ch.isdigit())
-    return digits / max(1, len(s))
-
-def _strip_numeric_noise(text: str) -> str:
-    """Enlève tokens dominés par des chiffres (ex: '29-30-', '155-1-2', '2024')."""
-    toks = re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9'’\-]+", text or "")
-    kept = []
-    for w in toks:
-        wl = w.strip("-_—–:;,.")
-        if not wl or wl.lower() in BANNED_TITLE_WORDS: 
-            continue
-        if wl.isdigit():
-            continue
-        if _digit_ratio(wl) >= 0.35:
-            continue
-        kept.append(wl)
-    return " ".join(kept)
-
-def normalize_title(src: str) -> str:
-    if not src:
-        return "Actualité"
-    t = src.strip()
-    # enlève suffixes de site + urls + mots parasites fréquents
-    t = SITE_SUFFIX_PAT.sub("", t)
-    t = re.sub(r"(?i)\blesarmeniens\s*\.?\s*com\b", "", t)
-    t = re.sub(r"(?i)\b(published|publié|publication|rss|feed)\b", "", t)
-    t = re.sub(r"\bhttps?://\S+\b", "", t)
-    # anti-chiffres & nettoyage
-    t = _strip_numeric_noise(t)
-    t = _clean_punct(t)
-    t = re.sub(r"[^\w\sÀ-ÖØ-öø-ÿ’'\"!?.,:;()-–—]", " ", t)
-    t = re.sub(r"\s{2,}", " ", t).strip()
-    t = _sentence_case(t)
-
-    # Si trop de chiffres / trop pauvre → neutre (sera refait depuis le corps si besoin)
-    if _alpha_ratio(t) < 0.55 or _digit_ratio(t) > 0.25 or len(t.split()) < 5:
-        return "Actualité"
-
-    if len(t) > TITLE_MAX:
-        t = _smart_truncate(t, TITLE_MAX)
-    t = t.rstrip()
-    if t.endswith(("—", "–", "-", ":", ";", ",")):
-        t = t[:-1].rstrip()
-    return t or "Actualité"
-
-def _title_from_text_fallback(fr_text: str) -> str:
-    t = (fr_text or "").strip()
-    if not t: return "Actualité"
-    words = re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9'’\-]+", t)
-    base = " ".join(words[:16]).strip()
-    base = re.sub(r"\s+", " ", base)
-    base = base[:TITLE_MAX]
-    base = normalize_title(base)
-    return base
-
-def ensure_signature(body: str) -> str:
-    b = (body or "").rstrip()
-    if not b.endswith("- LesArmeniens.com"):
-        b += "\n\n- LesArmeniens.com"
-    return b
-
-# ------- Nettoyage (source + corps) -------
-def clean_source_html(html: str) -> str:
-    """Supprime blocs parasites avant extraction: partages, related, tags, nav, footer, scripts…"""
+# Règles titres/corps (normalize_title, clean_body_text, ensure_min_words…) : voir textnorm.py
+
+# ================== LANGUE (détection locale, évite des appels IA) ==================
+ARMENIAN_RE = re.compile(r"[\u0531-\u058F\uFB13-\uFB17]")
+CYRILLIC_RE = re.compile(r"[\u0400-\u04FF]")
+LANG_SAMPLE_CHARS = 1000
+FR_MIN_PROB = 0.90                       # corps: confiance minimale pour la voie locale
+FR_TITLE_MIN_PROB = 0.80                 # titres courts: modèle n-grammes moins sûr
+
+_LLM_STATS = {"loaded": False, "calls": 0, "avoided": 0, "local_articles": 0}
+_LLM_STATS_LOCK = threading.Lock()
+
+@lru_cache(maxsize=4096)
+def _detect_ngram(sample: str):
+    if detect_langs is None:
+        return ("fr", 0.9) if looks_french(sample) else ("", 0.0)
     try:
-        soup = BeautifulSoup(html or "", "html.parser")
-        for tag in soup.find_all(["aside","nav","footer","form","script","style"]):
-            tag.decompose()
-        junk_selectors = [
-            "[class*='share']", "[class*='sharing']", "[class*='social']",
-            "[class*='tags']", "[class*='related']", "[class*='recommend']",
-            "[class*='newsletter']", "[class*='subscribe']", "[class*='cookie']",
-            "[class*='promo']", "[class*='advert']", "[class*='banner']",
-            "[id*='share']", "[id*='social']", "[id*='related']",
-            ".td-post-author-name", ".td-post-source-tags",
-        ]
-        for sel in junk_selectors:
-            for n in soup.select(sel):
-                n.decompose()
-        for figcap in soup.find_all("figcaption"):
-            figcap.decompose()
-        return str(soup)
-    except Exception:
-        return html or ""
-
-CLEAN_LINES_PAT = re.compile(
-    r"""(?imx)
-    ^\s*(?:Lisez\s+aussi|Lire\s+aussi|Read\s+also|Related\s+articles?|More\s+on|Voir\s+aussi)\b.*$|
-    ^\s*(?:Photo|Crédit|Credit|Copyright)\s*:.*$|
-    ^\s*(?:Avec\s+AFP|Sources?\s*:).*$|
-    ^\s*(?:Suivez-nous|Follow\s+us|Abonnez-vous).*$|
-    ^\s*(?:©|Tous\s+droits\s+réservés).*$|
-    ^\s*Publié\s+le\s+.*$|
-    ^\s*Auteur\s*:.*$
-    """,
-    re.UNICODE,
-)
-
-def clean_body_text(body: str) -> str:
-    """Nettoie le texte final: supprime lignes inutiles, espaces multiples, doublons, assure signature."""
-    if not body:
-        return body
-    sig = "- LesArmeniens.com"
-    b = body.strip()
-    had_sig = b.endswith(sig)
-    if had_sig:
-        b = b[: -len(sig)].rstrip()
-    lines = [ln for ln in b.splitlines() if not CLEAN_LINES_PAT.match(ln or "")]
-    b = "\n".join(lines)
-    b = re.sub(r"[ \t]+", " ", b)
-    b = re.sub(r"\n{3,}", "\n\n", b).strip()
-    uniq = []
-    for para in b.split("\n\n"):
-        p = para.strip()
-        if not uniq or uniq[-1] != p:
-            uniq.append(p)
-    b = "\n\n".join(uniq).strip()
-    b = ensure_signature(b)
-    return b
-
-# ------- Helpers longueur >= 120 -------
-STOP_FR = set("""
-le la les un une des du de au aux en sur pour par avec dans que qui ne pas est été
-sont était selon afin aussi plus leur lui ses ces cette ce cela donc ainsi tandis
-alors contre entre vers depuis sans sous après avant comme lorsque où dont même
-""".split())
-
-def _tokenize_words(text: str) -> list[str]:
-    return re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9'’\-]+", (text or "").lower())
-
-def _word_count(text: str) -> int:
-    return len(_tokenize_words(text))
-
-def ensure_min_words(body_text: str, source_text: str, min_words: int = TARGET_MIN_WORDS) -> str:
-    """Si body_text < min_words, complète à partir de la source (nettoyée), borne à TARGET_MAX_WORDS, garde signature."""
-    body = (body_text or "").strip()
-    sig = "- LesArmeniens.com"
-    if body.endswith(sig):
-        body = body[:-len(sig)].rstrip()
-
-    if _word_count(body) >= min_words:
-        return ensure_signature(body)
-
-    src_clean = strip_tags(source_text or "")
-    extra = " ".join([w for w in src_clean.split() if w not in set(body.split())]) or src_clean
-
-    body_words = _tokenize_words(body)
-    extra_words = _tokenize_words(extra)
-    need = max(0, min_words - len(body_words))
-    if need > 0 and extra_words:
-        take = min(len(extra_words), int(need * 1.3))
-        body = (body + " " + " ".join(extra_words[:take])).strip()
-
-    if _word_count(body) > TARGET_MAX_WORDS:
-        body = " ".join(_tokenize_words(body)[:TARGET_MAX_WORDS])
+        best = detect_langs(sample)[0]
+        return best.lang, best.prob
+    except LangDetectException:
+        return "", 0.0
+
+def detect_language(text: str):
+    """(code langue, probabilité). Écriture arménienne/cyrillique tranchée sans modèle, sinon n-grammes (cache)."""
+    sample = " ".join((text or "")[:LANG_SAMPLE_CHARS].split())
+    letters = sum(1 for ch in sample if ch.isalpha())
+    if not letters:
+        return "", 0.0
+    hy = len(ARMENIAN_RE.findall(sample))
+    if hy / letters >= 0.3:
+        return "hy", hy / letters
+    ru = len(CYRILLIC_RE.findall(sample))
+    if ru / letters >= 0.3:
+        return "ru", ru / letters
+    return _detect_ngram(sample)
+
+def is_french(text: str, min_prob: float = FR_MIN_PROB) -> bool:
+    lang, prob = detect_language(text)
+    return lang == "fr" and prob >= min_prob
+
+def is_french_title(title: str) -> bool:
+    return looks_french(title) or is_french(title, FR_TITLE_MIN_PROB)
+
+def count_llm(avoided=False, local_article=False):
+    with _LLM_STATS_LOCK:
+        if not _LLM_STATS["loaded"]:
+            try:
+                saved = _json.loads(get_setting("llm_stats", "{}") or "{}")
+                for k in ("calls", "avoided", "local_articles"):
+                    _LLM_STATS[k] += int(saved.get(k, 0))
+            except (ValueError, TypeError):
+                pass
+            _LLM_STATS["loaded"] = True
+        _LLM_STATS["avoided" if avoided else "calls"] += 1
+        if local_article:
+            _LLM_STATS["local_articles"] += 1
+
+def flush_llm_stats(extra=None):
+    """extra : autres réglages écrits dans le même commit (ex. last_import_result)."""
+    values = dict(extra or {})
+    with _LLM_STATS_LOCK:
+        if _LLM_STATS["loaded"]:
+            values["llm_stats"] = _json.dumps({k: _LLM_STATS[k] for k in ("calls", "avoided", "local_articles")})
+    values["llm_usage"] = _json.dumps(llm.stats_snapshot())
+    set_settings(values)
+
+def restore_llm_usage():
+    try:
+        llm.restore_day(_json.loads(get_setting("llm_usage", "{}") or "{}"))
+    except ValueError:
+        pass
 
-    return ensure_signature(body)
+def llm_stats_summary() -> str:
+    with _LLM_STATS_LOCK:
+        st = dict(_LLM_STATS)
+    if not st["loaded"]:
+        try:
+            st.update(_json.loads(get_setting("llm_stats", "{}") or "{}"))
+        except ValueError:
+            pass
+    total = st["calls"] + st["avoided"]
+    if not total:
+        return ""
+    return (f"Appels IA : {st['calls']} effectués, {st['avoided']} évités "
+            f"({100 * st['avoided'] / total:.0f} %) • {st['local_articles']} article(s) FR traités localement")
 
 # ================== TITRE/CORPS — FORCER LE FRANÇAIS ==================
 def enforce_french_title(text: str, title_src: str) -> str:
     """Si le titre n'est pas clairement FR, traduis-le en FR (secours IA), sinon normalise."""
     t = (text or "").strip()
-    if looks_french(t):
+    if is_french_title(t):
+        count_llm(avoided=True)
         return normalize_title(t)
 
     key, model = active_openai()
     if not key:
         return normalize_title(t or title_src or "Actualité")
+    count_llm()
 
     prompt = (
         "Traduis en FRANÇAIS ce TITRE d'article, fidèle et naturel. "
@@ -436,13 +641,8 @@ def enforce_french_title(text: str, title_src: str) -> str:
         f"Titre source: {strip_tags(title_src or t)}"
     )
     try:
-        r = requests.post("https://api.openai.com/v1/chat/completions",
-                          headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
-                          json={"model": model or "gpt-4o-mini", "temperature": 0.1,
-                                "messages":[{"role":"user","content":prompt}]},
-                          timeout=30)
-        j = r.json()
-        out = (j.get("choices") or [{}])[0].get("message", {}).get("content","").strip()
+        out = llm.chat(key, model, [{"role": "user", "content": prompt}],
+                       temperature=0.1, timeout=30, max_tokens=80, purpose="titre")
         return normalize_title(strip_tags(out) or (title_src or t))
     except Exception as e:
         print("[AI] enforce_french_title fail:", e)
@@ -457,12 +657,14 @@ def enforce_french_body(text: str, source_text: str) -> str:
     src = strip_tags(source_text or "")
     b = strip_tags(text or "").strip()
 
-    if looks_french(b) and _word_count(b) >= TARGET_MIN_WORDS:
+    if word_count(b) >= TARGET_MIN_WORDS and is_french(b):
+        count_llm(avoided=True)
         return clean_body_text(ensure_signature(b))
 
     # Secours IA si dispo
     key, model = active_openai()
     if key:
+        count_llm()
         prompt = (
             "Traduis fidèlement en FRANÇAIS le texte d'article ci-dessous, style neutre et informatif.\n"
             f"Longueur visée: {TARGET_MIN_WORDS}–{TARGET_MAX_WORDS} mots (±10%). "
@@ -471,13 +673,8 @@ def enforce_french_body(text: str, source_text: str) -> str:
             f"TEXTE:\n{src or b}"
         )
         try:
-            r = requests.post("https://api.openai.com/v1/chat/completions",
-                              headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
-                              json={"model": model or "gpt-4o-mini", "temperature": 0.2,
-                                    "messages":[{"role":"user","content":prompt}]},
-                              timeout=60)
-            j = r.json()
-            out = (j.get("choices") or [{}])[0].get("message", {}).get("content","").strip()
+            out = llm.chat(key, model, [{"role": "user", "content": prompt}],
+                           temperature=0.2, timeout=60, purpose="corps")
             b = strip_tags(out or b or src)
         except Exception as e:
             print("[AI] enforce_french_body fail:", e)
@@ -488,12 +685,100 @@ def enforce_french_body(text: str, source_text: str) -> str:
     b = clean_body_text(b)
     return b
 
+# ================== ARTICLES LONGS (map-reduce) ==================
+def split_paragraph_chunks(text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> list[str]:
+    """Découpe sur les paragraphes en morceaux ≤ max_tokens ; un paragraphe trop long est coupé aux phrases."""
+    max_chars = max(400, max_tokens * len(text or " ") // llm.estimate_tokens(text or " "))
+    pieces = []
+    for para in (p.strip() for p in (text or "").split("\n\n")):
+        if not para:
+            continue
+        while len(para) > max_chars:
+            cut = para.rfind(". ", 0, max_chars)
+            cut = cut + 1 if cut > max_chars // 2 else max_chars
+            pieces.append(para[:cut].strip()); para = para[cut:].strip()
+        if para:
+            pieces.append(para)
+    chunks, cur = [], ""
+    for p in pieces:
+        if cur and len(cur) + 2 + len(p) > max_chars:
+            chunks.append(cur); cur = p
+        else:
+            cur = f"{cur}\n\n{p}" if cur else p
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+def condense_chunk(chunk: str, idx: int, total: int, title: str, words: int, key: str, model: str) -> str:
+    prompt = (
+        f"Extrait {idx}/{total} d'un article (titre: {title}).\n"
+        f"Résume-le en FRANÇAIS en environ {words} mots, sans rien inventer: garde faits, chiffres, noms, citations clés. "
+        "Texte brut, pas de listes, pas d'introduction.\n\n"
+        f"EXTRAIT:\n{chunk}"
+    )
+    count_llm()
+    out = llm.chat(key, model, [{"role": "user", "content": prompt}],
+                   temperature=0.1, timeout=60, max_tokens=words * 3, purpose="morceau")  # label fixe (métriques)
+    return strip_tags(out).strip()
+
+def condense_long_article(text: str, title: str, key: str, model: str) -> str:
+    """Map: condense chaque morceau en parallèle ; renvoie les résumés dans l'ordre (entrée du reduce)."""
+    chunks = split_paragraph_chunks(text)
+    words = max(80, (TARGET_MAX_WORDS * 3 // 2) // max(1, len(chunks)))
+    with ThreadPoolExecutor(max_workers=max(1, min(CHUNK_PARALLEL, len(chunks)))) as pool:
+        parts = list(pool.map(lambda a: condense_chunk(a[1], a[0] + 1, len(chunks), title, words, key, model),
+                              enumerate(chunks)))
+    print(f"[AI] article long: {len(text)} car. → {len(chunks)} morceaux condensés")
+    return "\n\n".join(p for p in parts if p)
+
 # ================== RÉÉCRITURE (titre + corps en FR, avec double vérif) ==================
+REWRITE_SYSTEM = "Tu écris en français clair et exact. Réponds uniquement en JSON."
+
+def rewrite_messages(title_src_clean: str, source_text: str) -> list:
+    """Messages de la réécriture Titre + Corps (appel direct ou ligne de batch)."""
+    prompt = (
+        "Tu es un journaliste francophone.\n"
+        "1) TRADUIS en FRANÇAIS le TITRE SOURCE, naturel et fidèle (6–14 mots). "
+        "   Interdictions: nom de média, URL, «published/publié», signature, émojis. Pas de point final.\n"
+        "2) RÉÉCRIS en FRANÇAIS le CORPS sans inventer, en conservant les infos factuelles.\n"
+        f"   Longueur: {TARGET_MIN_WORDS}–{TARGET_MAX_WORDS} mots (±10%). Style neutre, informatif. Pas de listes à puces.\n"
+        "Réponds STRICTEMENT en JSON: {\"title\": \"...\", \"body\": \"...\"}\n"
+        "Le 'body' doit être du TEXTE BRUT (pas de balises) et DOIT se terminer par: - LesArmeniens.com.\n\n"
+        f"TITRE SOURCE: {title_src_clean}\n"
+        f"TEXTE SOURCE: {source_text}"
+    )
+    return [{"role": "system", "content": REWRITE_SYSTEM}, {"role": "user", "content": prompt}]
+
+def parse_rewrite_output(out: str):
+    """Réponse JSON {title, body} (ou, à défaut, 1re ligne = titre / reste = corps)."""
+    try:
+        data = _json.loads(out)
+        title_fr = strip_tags(data.get("title","")).strip()
+        body_fr  = strip_tags(data.get("body","")).strip()
+    except Exception:
+        parts = (out or "").split("\n", 1)
+        title_fr = strip_tags(parts[0]).strip()
+        body_fr  = strip_tags(parts[1] if len(parts) > 1 else "").strip()
+    return title_fr, body_fr
+
+def finalize_rewrite(title_fr: str, body_fr: str, source_text: str, title_src_clean: str):
+    """Garde-fous finaux communs (appel direct ou batch) → (title_fr, body_fr, True)."""
+    # Corps FR garanti (jamais vide)
+    body_fr = enforce_french_body(body_fr, source_text)
+
+    # Titre FR normalisé ; s'il reste pauvre/numérique → refait depuis le corps FR
+    title_fr = enforce_french_title(title_fr, title_src_clean)
+    title_fr = normalize_title(title_fr)
+    if title_fr == "Actualité" or alpha_ratio(title_fr) < 0.55 or digit_ratio(title_fr) > 0.25:
+        title_fr = normalize_title(title_from_text(body_fr))
+    return (title_fr, body_fr, True)
+
 def rewrite_article_fr(title_src: str, raw_text: str):
     """
     Retourne (title_fr, body_fr, sure_fr).
     - Titre: traduction FR stricte (6–14 mots) ou fallback propre ; anti-chiffres
     - Corps: réécriture/traduction FR 120–800 mots, neutre, informative (jamais vide)
+    - Article long (> SINGLE_CALL_MAX_CHARS): morceaux condensés en parallèle, puis réécriture finale
     - Nettoyage + signature: - LesArmeniens.com
     """
     if not raw_text:
@@ -503,124 +788,294 @@ def rewrite_article_fr(title_src: str, raw_text: str):
     clean_input = strip_tags(raw_text)
     title_src_clean = strip_tags(title_src or "").strip()
 
+    # Voie locale : source déjà en français et assez longue → nettoyage sans réécriture IA
+    if word_count(clean_input) >= TARGET_MIN_WORDS and is_french(clean_input):
+        body_fr = clean_body_text(ensure_min_words(truncate_text(clean_input), clean_input))
+        count_llm(avoided=True, local_article=True)
+        title_fr = enforce_french_title(title_src_clean, title_src_clean)
+        if title_fr == "Actualité":
+            title_fr = normalize_title(title_from_text(body_fr))
+        return (title_fr, body_fr, True)
+
     def call_openai_both():
         """Demande Titre (traduction FR) + Corps (réécriture FR) en un seul JSON."""
-        prompt = (
-            "Tu es un journaliste francophone.\n"
-            "1) TRADUIS en FRANÇAIS le TITRE SOURCE, naturel et fidèle (6–14 mots). "
-            "   Interdictions: nom de média, URL, «published/publié», signature, émojis. Pas de point final.\n"
-            "2) RÉÉCRIS en FRANÇAIS le CORPS sans inventer, en conservant les infos factuelles.\n"
-            f"   Longueur: {TARGET_MIN_WORDS}–{TARGET_MAX_WORDS} mots (±10%). Style neutre, informatif. Pas de listes à puces.\n"
-            "Réponds STRICTEMENT en JSON: {\"title\": \"...\", \"body\": \"...\"}\n"
-            "Le 'body' doit être du TEXTE BRUT (pas de balises) et DOIT se terminer par: - LesArmeniens.com.\n\n"
-            f"TITRE SOURCE: {title_src_clean}\n"
-            f"TEXTE SOURCE: {clean_input}"
-        )
-        payload = {
-            "model": model or "gpt-4o-mini",
-            "temperature": 0.2,
-            "messages": [
-                {"role": "system", "content": "Tu écris en français clair et exact. Réponds uniquement en JSON."},
-                {"role": "user", "content": prompt}
-            ]
-        }
-        r = requests.post("https://api.openai.com/v1/chat/completions",
-                          headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
-                          json=payload, timeout=60)
-        j = r.json()
-        out = (j.get("choices") or [{}])[0].get("message", {}).get("content", "").strip()
-        try:
-            data = _json.loads(out)
-            title_fr = strip_tags(data.get("title","")).strip()
-            body_fr  = strip_tags(data.get("body","")).strip()
-        except Exception:
-            parts = out.split("\n", 1)
-            title_fr = strip_tags(parts[0]).strip()
-            body_fr  = strip_tags(parts[1] if len(parts) > 1 else "").strip()
-        return title_fr, body_fr
+        out = llm.chat(key, model, rewrite_messages(title_src_clean, prompt_input),
+                       temperature=0.2, timeout=60, purpose="réécriture")
+        return parse_rewrite_output(out)
 
     if key:
         try:
+            prompt_input = clean_input
+            if len(clean_input) > SINGLE_CALL_MAX_CHARS:
+                try:
+                    prompt_input = condense_long_article(clean_input, title_src_clean, key, model) \
+                                   or clean_input[:SINGLE_CALL_MAX_CHARS]
+                except Exception as e:
+                    print(f"[AI] condensation article long échouée: {e}")
+                    prompt_input = clean_input[:SINGLE_CALL_MAX_CHARS]
+            count_llm()
             title_fr, body_fr = call_openai_both()
-
-            # -------- GARDE-FOUS FINAUX --------
-            # Corps FR garanti (jamais vide)
-            body_fr = enforce_french_body(body_fr, clean_input)
-
-            # Titre FR normalisé ; s'il reste pauvre/numérique → refait depuis le corps FR
-            title_fr = enforce_french_title(title_fr, title_src_clean)
-            title_fr = normalize_title(title_fr)
-            if title_fr == "Actualité" or _alpha_ratio(title_fr) < 0.55 or _digit_ratio(title_fr) > 0.25:
-                title_fr = normalize_title(_title_from_text_fallback(body_fr))
-
-            return (title_fr, body_fr, True)
+            return finalize_rewrite(title_fr, body_fr, prompt_input, title_src_clean)
 
         except Exception as e:
             print(f"[AI] rewrite_article_fr failed: {e}")
 
     # Fallback local (pas d'IA)
-    fr_body = " ".join(strip_tags(raw_text).split())
-    if _word_count(fr_body) > TARGET_MAX_WORDS:
-        fr_body = " ".join(_tokenize_words(fr_body)[:TARGET_MAX_WORDS])
+    fr_body = truncate_text(strip_tags(raw_text))
     fr_body = ensure_min_words(fr_body, raw_text, TARGET_MIN_WORDS)
     fr_body = clean_body_text(fr_body)
-    fr_title = normalize_title(_title_from_text_fallback(fr_body))
+    fr_title = normalize_title(title_from_text(fr_body))
     return (fr_title, fr_body, False)
 
 # ================== HTTP & IMAGES ==================
-def http_get(url, timeout=20):
-    r = requests.get(url, timeout=timeout, allow_redirects=True, headers={
+class FetchRejected(requests.RequestException):
+    """Réponse refusée avant lecture du corps (type de contenu hors liste)."""
+
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.I)
+_XML_DECL_RE = re.compile(rb"""\s*<\?xml[^>]*?encoding=["']([A-Za-z0-9_.:-]+)""")
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+def _charset(content_type: str, head: bytes) -> str:
+    """Encodage : BOM, sinon en-tête Content-Type, sinon déclaration <?xml encoding?> ou <meta charset> /
+    http-equiv des premiers octets, sinon utf-8."""
+    name = next((enc for bom, enc in _BOMS if head.startswith(bom)), None)
+    if not name:
+        m = re.search(r"charset=[\"']?([A-Za-z0-9_.:-]+)", content_type or "", re.I)
+        name = m.group(1) if m else None
+    if not name:
+        m = _XML_DECL_RE.match(head) or _CHARSET_RE.search(head[:4096])
+        name = m.group(1).decode("ascii") if m else "utf-8"
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return "utf-8"
+
+class CappedReader:
+    """Lecteur borné : read(n) renvoie au plus n octets de read1, b"" une fois max_bytes atteint ou le délai
+    (deadline, time.monotonic) dépassé ; .cut = raison de l'arrêt ('taille' | 'delai') ou None."""
+
+    def __init__(self, read1, max_bytes, deadline):
+        self._read1, self.max_bytes, self.deadline = read1, max_bytes, deadline
+        self.size, self.cut = 0, None
+
+    def read(self, n=-1):
+        if self.cut:
+            return b""
+        if time.monotonic() > self.deadline:
+            self.cut = "delai"
+            return b""
+        try:
+            chunk = self._read1(n if n and n > 0 else 65536)
+        except urllib3.exceptions.ReadTimeoutError:
+            self.cut = "delai"
+            return b""
+        if self.size + len(chunk) > self.max_bytes:     # octets réellement perdus seulement
+            chunk = chunk[:self.max_bytes - self.size]
+            self.cut = "taille"
+        self.size += len(chunk)
+        return chunk
+
+def open_stream(url, kind, headers, timeout, types=None):
+    """GET en flux (réponse à fermer par l'appelant) ; statut compté, Content-Type filtré par types."""
+    try:
+        r = requests.get(url, timeout=timeout, allow_redirects=True, stream=True, headers=headers)
+    except requests.RequestException:
+        metrics.inc("fetch_responses_total", kind=kind, status="erreur")
+        raise
+    metrics.inc("fetch_responses_total", kind=kind, status=r.status_code)
+    try:
+        r.raise_for_status()
+        ctype = r.headers.get("Content-Type", "")
+        if types and ctype and not ctype.split(";")[0].strip().lower().startswith(types):
+            metrics.inc("fetch_truncated_total", kind=kind, reason="type")
+            raise FetchRejected(f"type de contenu refusé: {ctype} ({url})")
+    except Exception:
+        r.close()
+        raise
+    return r
+
+def fetch_text(url, kind, headers, timeout, max_bytes, types=None, stop_after=None):
+    """GET en flux, corps borné à max_bytes et à `timeout` secondes au total (goutte-à-goutte compris).
+    types : préfixes de Content-Type acceptés (None = tous) ; stop_after : marqueur (ex. b"</article>")
+    après lequel la lecture s'arrête. Décodé une seule fois (voir _charset). Contenu coupé par la taille
+    ou le délai : renvoyé mais pas mis en cache (le cache ne garde que des contenus complets)."""
+    deadline = time.monotonic() + timeout
+    with open_stream(url, kind, headers, timeout, types) as r:
+        ctype = r.headers.get("Content-Type", "")
+        # read1 : ce qui est arrivé, sans attendre 16 Ko
+        stream = CappedReader(lambda n: r.raw.read1(n, decode_content=True), max_bytes, deadline)
+        buf, size, cut = bytearray(), 0, None
+        while True:
+            chunk = stream.read(16384)
+            if not chunk:
+                break
+            buf += chunk
+            if stop_after and buf.find(stop_after, max(0, size - len(stop_after))) >= 0:
+                cut = "marqueur"
+                break
+            size = len(buf)
+        cut = cut or stream.cut
+        if cut == "delai" and not buf:
+            raise requests.Timeout(f"lecture trop lente: {url}")
+    if cut:
+        metrics.inc("fetch_truncated_total", kind=kind, reason=cut)
+        if cut != "marqueur":
+            print(f"[FETCH] lecture arrêtée ({cut}, {len(buf)} octets): {url}")
+    text = buf.decode(_charset(ctype, bytes(buf[:4096])), errors="replace")
+    if cut in (None, "marqueur"):
+        cache_put(url, kind, text)
+    return text
+
+def http_get(url, timeout=20, stop_after=None):
+    return fetch_text(url, "page", {
         "User-Agent": "Mozilla/5.0 (+RenderBot)",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "fr,en;q=0.8",
-    })
-    r.raise_for_status()
-    r.encoding = r.encoding or "utf-8"
-    return r.text
+    }, timeout, PAGE_MAX_BYTES, types=PAGE_TYPES, stop_after=stop_after)
 
 def fetch_xml(url, timeout=25):
-    r = requests.get(
-        url, timeout=timeout, allow_redirects=True,
-        headers={
-            "User-Agent": "Console-Armenie/1.0 (+https://armenian-console.onrender.com)",
-            "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8",
-            "Accept-Language": "fr,en;q=0.8",
-        },
-    )
-    r.raise_for_status()
-    r.encoding = r.encoding or "utf-8"
-    return r.text
-
-def soup_select_attr(soup, selector):
-    attr = None
-    sel = selector
-    if "::content" in selector:
-        sel, attr = selector.split("::content", 1)[0], "content"
-    elif "::src" in selector:
-        sel, attr = selector.split("::src", 1)[0], "src"
-    tag = soup.select_one(sel.strip())
-    if not tag:
+    return fetch_text(url, "feed", {
+        "User-Agent": "Console-Armenie/1.0 (+https://armenian-console.onrender.com)",
+        "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8",
+        "Accept-Language": "fr,en;q=0.8",
+    }, timeout, FEED_MAX_BYTES)
+
+# ================== CACHE DES PAGES BRUTES ==================
+# Chaque page/flux récupéré est gardé compressé (zlib) sous PAGE_CACHE_DIR/ab/<sha1>.z, indexé par URL
+# dans page_cache ; au-delà de PAGE_CACHE_MAX_MB les contenus les plus anciens sont évincés.
+_CACHE_STATE = {"since_evict": 0}
+_CACHE_LOCK = threading.Lock()
+
+def _cache_path(sha1: str) -> str:
+    return os.path.join(PAGE_CACHE_DIR, sha1[:2], sha1 + ".z")
+
+def cache_put(url: str, kind: str, text: str):
+    """Enregistre le contenu brut ; ne fait jamais échouer la récupération."""
+    if PAGE_CACHE_MAX_MB <= 0 or not text:
+        return
+    try:
+        data = text.encode("utf-8")
+        sha1 = hashlib.sha1(data).hexdigest()
+        path = _cache_path(sha1)
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = zlib.compress(data, 6)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+            size = len(blob)
+        con = db()
+        try:
+            con.execute("INSERT INTO page_cache(url, kind, sha1, size, fetched_at) VALUES(?,?,?,?,?) "
+                        "ON CONFLICT(url) DO UPDATE SET kind=excluded.kind, sha1=excluded.sha1, "
+                        "size=excluded.size, fetched_at=excluded.fetched_at",
+                        (url, kind, sha1, size, datetime.now(timezone.utc).isoformat()))
+            con.commit()
+        finally:
+            con.close()
+        with _CACHE_LOCK:
+            _CACHE_STATE["since_evict"] += size
+            due = _CACHE_STATE["since_evict"] > PAGE_CACHE_MAX_MB * 1024 * 1024 // 20
+            if due:
+                _CACHE_STATE["since_evict"] = 0
+        if due:
+            cache_evict()
+    except Exception as e:
+        print(f"[CACHE] put {url}: {e}")
+
+def cache_get(url: str):
+    """Contenu brut en cache pour cette URL, ou None."""
+    con = db()
+    try:
+        row = con.execute("SELECT sha1 FROM page_cache WHERE url=?", (url,)).fetchone()
+    finally:
+        con.close()
+    if not row:
         return None
-    if attr:
-        val = tag.get(attr)
-        return val if val else None
-    return tag.get_text(" ", strip=True)
-
-def find_main_image_in_html(html, base_url=None):
-    soup = BeautifulSoup(html, "html.parser")
-    for sel in ["meta[property='og:image']","meta[name='twitter:image']"]:
-        m = soup.select_one(sel)
-        if m and m.get("content"):
-            return urljoin(base_url or "", m["content"])
-    a = soup.find("article")
-    if a:
-        imgtag = a.find("img")
-        if imgtag and imgtag.get("src"):
-            return urljoin(base_url or "", imgtag["src"])
-    imgtag = soup.find("img")
-    if imgtag and imgtag.get("src"):
-        return urljoin(base_url or "", imgtag["src"])
-    return None
+    try:
+        with open(_cache_path(row["sha1"]), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+    except (OSError, zlib.error):
+        return None
+
+def cache_evict(max_bytes: int = None) -> tuple[int, int]:
+    """Évince les contenus les moins récemment récupérés jusqu'à ~90 % du plafond → (fichiers, octets)."""
+    max_bytes = PAGE_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    con = db()
+    try:
+        blobs = con.execute("SELECT sha1, MAX(size) AS size, MAX(fetched_at) AS last FROM page_cache "
+                            "GROUP BY sha1 ORDER BY last").fetchall()
+        total = sum(b["size"] for b in blobs)
+        removed, freed = 0, 0
+        for b in blobs:
+            if total - freed <= max_bytes * 0.9:
+                break
+            try:
+                os.remove(_cache_path(b["sha1"]))
+            except FileNotFoundError:
+                pass
+            con.execute("DELETE FROM page_cache WHERE sha1=?", (b["sha1"],))
+            removed += 1; freed += b["size"]
+        con.commit()
+    finally:
+        con.close()
+    if removed:
+        print(f"[CACHE] éviction: {removed} contenu(s), {_fmt_bytes(freed)}")
+    return removed, freed
+
+def cache_stats() -> dict:
+    con = db()
+    try:
+        r = con.execute("SELECT COUNT(*) AS urls, COUNT(DISTINCT sha1) AS blobs, "
+                        "COALESCE(SUM(size),0) AS size FROM page_cache").fetchone()
+        return {"urls": r["urls"], "blobs": r["blobs"], "size": r["size"]}
+    finally:
+        con.close()
+
+def reextract_cached(scraper_name: str = "", limit: int = 500) -> str:
+    """Rejoue l'extraction (nettoyage, sélecteurs, texte, image) sur les pages en cache, sans réseau."""
+    scrapers = get_compiled_scrapers()
+    by_host = {}
+    for sc in scrapers:
+        by_host.setdefault(urlparse(sc.index_url).netloc, sc)
+    index_urls = {sc.index_url: sc for sc in scrapers if sc.link_sel is not None}
+    con = db()
+    try:
+        rows = con.execute("SELECT url, kind FROM page_cache ORDER BY fetched_at DESC LIMIT ?", (limit,)).fetchall()
+    finally:
+        con.close()
+    t0 = time.perf_counter()
+    lines, pages, empty, no_img, chars = [], 0, 0, 0, 0
+    for r in rows:
+        url, raw = r["url"], cache_get(r["url"])
+        if raw is None:
+            continue
+        sc = index_urls.get(url) or by_host.get(urlparse(url).netloc)
+        if scraper_name and (sc is None or sc.name != scraper_name):
+            continue
+        try:
+            if r["kind"] == "feed":
+                lines.append(f"[flux]  {len(feedparser.parse(raw).entries):>4} entrées  {url}")
+                continue
+            if url in index_urls:
+                n = len(sc.link_sel.select(BeautifulSoup(raw, "html.parser")))
+                lines.append(f"[index] {n:>4} liens     {url}  ({sc.name})")
+                continue
+            _, title_src, text, img = extract_page(sc, url, raw)
+        except Exception as e:
+            lines.append(f"[ERR]   {url}: {e}")
+            continue
+        pages += 1; chars += len(text)
+        empty += len(text) < 40
+        no_img += not img
+        lines.append(f"[page]  {len(text):>6} car. {'img' if img else '---'}  {url}  «{title_src[:60]}»")
+    head = (f"Ré-extraction hors ligne: {pages} page(s) en {time.perf_counter() - t0:.1f}s — "
+            f"{empty} sans texte, {no_img} sans image, moyenne {chars // max(1, pages)} car.")
+    print("[CACHE]", head)
+    return head + "\n\n" + "\n".join(lines)
 
 def get_image_from_entry(entry, page_html=None, page_url=None):
     try:
@@ -659,53 +1114,58 @@ def get_image_from_entry(entry, page_html=None, page_url=None):
     return None
 
 def download_image(url):
+    """URL → (chemin /static/images/<sha1>.jpg, sha1, {w, h, lqip, srcset}) ; (None, None, None) si échec."""
     if not url:
-        return None, None
+        return None, None, None
     try:
-        r = requests.get(url, timeout=20)
+        with metrics.span("image_download"):
+            r = requests.get(url, timeout=20)
+        metrics.inc("fetch_responses_total", kind="image", status=r.status_code)
         r.raise_for_status()
         data = r.content
         try:
-            im = Image.open(io.BytesIO(data))
-            im.load()
-            if im.mode not in ("RGB", "L"):
-                im = im.convert("RGB")
-            os.makedirs("static/images", exist_ok=True)
-            sha1 = hashlib.sha1(data).hexdigest()
-            path = f"static/images/{sha1}.jpg"
-            if not os.path.exists(path):
-                im.save(path, format="JPEG", quality=88, optimize=True)
-            return "/" + path, sha1
+            with metrics.span("image_convert"):
+                path, sha1, meta = cpu_call(cpuwork.encode_image, data, IMAGES_DIR)
+            return "/" + path, sha1, meta
         except Exception as e:
             print(f"[IMG] convert/save fail {url}: {e}")
-            return None, None
+            return None, None, None
     except Exception as e:
         print(f"[IMG] download failed for {url}: {e}")
-        return None, None
+        return None, None, None
 
 # ================== EXTRACTION TEXTE ==================
-SEL_CANDIDATES = [
-    "article",
-    ".entry-content", ".post-content", ".td-post-content",
-    ".article-content", ".content-article", ".article-body",
-    "#article-body", "#content article", ".post__text", ".story-content",
-    ".single-content", ".content"
-]
-
-def extract_article_text(html):
-    soup = BeautifulSoup(html, "html.parser")
-    node_text, best_len = "", 0
-    for sel in SEL_CANDIDATES:
-        cand = soup.select_one(sel)
-        if cand:
-            text = " ".join(p.get_text(" ", strip=True) for p in (cand.find_all(["p","h2","li"]) or [cand]))
-            text = re.sub(r"\s+", " ", text).strip()
-            if len(text) > best_len:
-                best_len = len(text); node_text = text
-    if not node_text:
-        text = " ".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
-        node_text = re.sub(r"\s+", " ", text).strip()
-    return node_text[:5000] if node_text else ""
+# Nettoyage, extraction et encodage d'images : cpuwork.py. Avec CPU_WORKERS > 0 ces étapes tournent dans un
+# pool de processus (file bornée, workers recyclés) pour ne pas tenir le GIL face aux requêtes publiques.
+_CPU = {"pool": None, "slots": threading.BoundedSemaphore(max(1, CPU_WORKERS) * 2)}
+_CPU_LOCK = threading.Lock()
+
+def _cpu_pool():
+    with _CPU_LOCK:
+        if _CPU["pool"] is None:
+            ctx = multiprocessing.get_context("forkserver")
+            try:
+                _CPU["pool"] = ProcessPoolExecutor(CPU_WORKERS, mp_context=ctx, max_tasks_per_child=CPU_RECYCLE)
+            except TypeError:                            # Python < 3.11 : pas de recyclage
+                _CPU["pool"] = ProcessPoolExecutor(CPU_WORKERS, mp_context=ctx)
+            print(f"[CPU] pool de {CPU_WORKERS} processus (recyclés toutes les {CPU_RECYCLE} tâches)")
+        return _CPU["pool"]
+
+def cpu_call(fn, *args):
+    """fn(*args) dans le pool de processus si CPU_WORKERS > 0, sinon dans le thread courant."""
+    if CPU_WORKERS <= 0:
+        return fn(*args)
+    with _CPU["slots"]:                                  # file bornée : l'import attend plutôt que d'empiler
+        pool = _cpu_pool()
+        try:
+            return pool.submit(fn, *args).result(timeout=CPU_TIMEOUT_S)
+        except BrokenProcessPool as e:
+            print(f"[CPU] pool cassé ({e}), recréé ; exécution locale")
+            with _CPU_LOCK:
+                if _CPU["pool"] is pool:
+                    _CPU["pool"] = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            return fn(*args)
 
 def html_from_entry(entry):
     if "content" in entry and getattr(entry, "content", None):
@@ -713,15 +1173,107 @@ def html_from_entry(entry):
         if isinstance(entry.content, dict): return entry.content.get("value","")
     return entry.get("summary","") or entry.get("description","")
 
+# ================== FRAGMENTS (pré-rendus à l'écriture) ==================
+# Carte HTML de l'accueil, <item> RSS échappé et extrait sont calculés une fois à l'insertion/édition
+# et stockés sur la ligne : "/" et "/rss.xml" ne font plus que concaténer.
+EXCERPT_WORDS = 55
+FRAGMENTS_VERSION = "3"      # à incrémenter quand render_fragments change (recalcul de tous les articles au boot)
+FRAG_ROOT = "\ue002"       # remplacé par request.url_root (sans "/" final) au moment de servir le flux
+
+def make_excerpt(body: str, limit: int = EXCERPT_WORDS) -> str:
+    b = (body or "").strip()
+    if b.endswith(SIGNATURE):
+        b = b[:-len(SIGNATURE)].rstrip()
+    words = b.split()
+    if len(words) <= limit:
+        return " ".join(words)
+    return " ".join(words[:limit]).rstrip(",.;:—-– ") + "…"
+
+IMG_SIZES = "(max-width: 800px) 100vw, 760px"     # largeur d'affichage (conteneur pico)
+
+def img_html(r, lazy=True) -> str:
+    """<img> avec dimensions intrinsèques (pas de saut de mise en page), srcset, aperçu flou en fond."""
+    if not r["image_url"]:
+        return ""
+    attrs = f"src='{r['image_url']}' alt=''"
+    style = "max-width:100%;height:auto"
+    if r["image_w"] and r["image_h"]:
+        attrs += f" width='{r['image_w']}' height='{r['image_h']}'"
+    if r["image_srcset"]:
+        attrs += f" srcset='{r['image_srcset']}' sizes='{IMG_SIZES}'"
+    if r["image_lqip"]:
+        style += f";background:#eee url({r['image_lqip']}) center/cover no-repeat"
+    if lazy:
+        attrs += " loading='lazy' decoding='async'"
+    return f"<img {attrs} style='{style}'>"
+
+def render_fragments(r) -> dict:
+    """r: ligne posts (id, title, body, created_at, published_at, image_url, image_*).
+    Renvoie excerpt / card_html / rss_item."""
+    title = r["title"] or ""
+    body = (r["body"] or "").replace(FRAG_ROOT, "")
+    excerpt = make_excerpt(body)
+    created = (r["created_at"] or "")[:16].replace("T", " ")
+    img = img_html(r)
+    card_html = (f"<article><header><h3><a href='/post/{r['id']}'>{escape(title)}</a></h3>"
+                 f"<small>{created}</small></header>{img}<p>{escape(excerpt)}</p>"
+                 f"<p><a href='/post/{r['id']}'>Lire la suite →</a></p></article>")
+    enclosure = (f"<enclosure url='{FRAG_ROOT}{r['image_url']}' type='image/jpeg'/>"
+                 if r["image_url"] else "")
+    # pubDate = mise en ligne (RFC 822, indépendant de la locale) ; lien = page de l'article, guid stable (id)
+    pub = utc_iso(r["published_at"] or r["created_at"])
+    pub = format_datetime(datetime.fromisoformat(pub), usegmt=True) if pub else ""
+    rss_item = (f"<item><title>{title.replace('&', '&amp;')}</title><link>{FRAG_ROOT}/post/{r['id']}</link>"
+                f"<guid isPermaLink='false'>{r['id']}</guid>"
+                f"<description><![CDATA[{body.replace('&', '&amp;')}]]></description>{enclosure}"
+                + (f"<pubDate>{pub}</pubDate>" if pub else "") + "</item>")
+    return {"excerpt": excerpt, "card_html": card_html, "rss_item": rss_item}
+
+def refresh_fragments(con, post_id):
+    """Recalcule et stocke les fragments d'un article (sans commit : transaction de l'appelant)."""
+    r = con.execute("SELECT id, title, body, created_at, published_at, image_url, image_w, image_h, image_lqip, "
+                    "image_srcset FROM posts WHERE id=?", (post_id,)).fetchone()
+    if not r:
+        return
+    f = render_fragments(r)
+    con.execute("UPDATE posts SET excerpt=?, card_html=?, rss_item=? WHERE id=?",
+                (f["excerpt"], f["card_html"], f["rss_item"], post_id))
+
+def mark_published(con, ids):
+    """Statut déjà passé à 'published' : date de mise en ligne + fragments (pubDate). Sans commit."""
+    now = now_iso()
+    for i in ids:
+        con.execute("UPDATE posts SET published_at=? WHERE id=?", (now, i))
+        con.execute("DELETE FROM post_tombstones WHERE id=?", (i,))
+        refresh_fragments(con, i)
+
+def mark_removed(con, ids, reason):
+    """Articles sortis de la publication (dépubliés, planifiés, supprimés, archivés) : tombstones pour la
+    synchro incrémentale de /api/posts + lastBuildDate du flux avancé. Sans commit."""
+    now = now_iso()
+    con.executemany("INSERT INTO post_tombstones(id, removed_at, reason) VALUES(?,?,?) ON CONFLICT(id) "
+                    "DO UPDATE SET removed_at=excluded.removed_at, reason=excluded.reason",
+                    [(i, now, reason) for i in ids])
+    con.execute("INSERT INTO settings(key,value) VALUES('feed_changed_at', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (now,))
+
+def post_body_html(body: str) -> str:
+    return str(escape(body or "")).replace("\n", "<br>")
+
 # ================== SCRAPE (RSS + index) ==================
 def already_have_link(link: str) -> bool:
     con = db()
     try:
-        return con.execute("SELECT 1 FROM posts WHERE orig_link=?", (link,)).fetchone() is not None
+        return (con.execute("SELECT 1 FROM posts WHERE orig_link=?", (link,)).fetchone() is not None or
+                con.execute("SELECT 1 FROM posts_archive WHERE orig_link=?", (link,)).fetchone() is not None or
+                con.execute("SELECT 1 FROM backfill_jobs WHERE orig_link=? AND status IN ('pending','submitted')",
+                            (link,)).fetchone() is not None)
     finally:
         con.close()
 
-def insert_post(title_fr, body_text, link, source, img_url):
+def prepare_post(title_fr, body_text, link, source, img_url):
+    """Image (article, sinon défaut) téléchargée et convertie → ligne prête pour write_batch, ou None
+    si REQUIRE_IMAGE et aucune image utilisable. Aucune écriture en base."""
     # 1) si l'article n'a pas d'image → tente l'image par défaut
     if not img_url:
         default_img = get_setting("default_image_url", "").strip()
@@ -729,112 +1281,227 @@ def insert_post(title_fr, body_text, link, source, img_url):
             img_url = default_img
 
     # 2) download/conversion ; si ça échoue → retente encore une fois avec l'image par défaut
-    local_path, sha1 = download_image(img_url) if img_url else (None, None)
+    local_path, sha1, meta = download_image(img_url) if img_url else (None, None, None)
     if (not local_path or not sha1):
         default_img = get_setting("default_image_url", "").strip()
         if default_img and (not img_url or img_url != default_img):
-            local_path, sha1 = download_image(default_img)
+            local_path, sha1, meta = download_image(default_img)
 
     # 3) exigence finale
     if REQUIRE_IMAGE and (not local_path or not sha1):
         print("[POST] rejet: aucune image utilisable (article + défaut)")
-        return False
+        return None
+    meta = meta or {}
+    return {"title": title_fr, "body": body_text, "orig_link": link, "source": source, "image_url": local_path,
+            "image_sha1": sha1, "image_w": meta.get("w"), "image_h": meta.get("h"),
+            "image_lqip": meta.get("lqip"), "image_srcset": meta.get("srcset")}
 
-    # anti-doublon image
-    if sha1:
-        con = db()
-        try:
-            if con.execute("SELECT 1 FROM posts WHERE image_sha1=?", (sha1,)).fetchone():
-                return False
-        except Exception:
-            pass
-        finally:
-            try: con.close()
-            except: pass
+def insert_post(title_fr, body_text, link, source, img_url):
+    """Un article isolé (import par URL, rattrapage) : prepare_post + write_batch ; False si refusé/doublon."""
+    row = prepare_post(title_fr, body_text, link, source, img_url)
+    if not row:
+        return False
+    try:
+        return bool(write_batch(posts=[row], source=source)[0])
+    except sqlite3.Error as e:
+        print("[DB] insert_post error:", e)
+        return False
 
-    now = datetime.now(timezone.utc).isoformat()
+# ---- Écritures par lots de l'import : articles acceptés + jobs de rattrapage + échantillon de scraper
+# + réglages, en une transaction (BEGIN IMMEDIATE … COMMIT) au lieu d'un commit par article. Doublons
+# (orig_link UNIQUE, image_sha1 UNIQUE) écartés par ON CONFLICT DO NOTHING, y compris au sein du lot.
+POST_COLS = ("title", "body", "orig_link", "source", "image_url", "image_sha1",
+             "image_w", "image_h", "image_lqip", "image_srcset")
+
+def write_batch(posts=(), jobs=(), samples=(), settings=None, source=""):
+    """Une transaction ; renvoie (ids des articles créés, nombre de jobs créés). Lève en cas d'erreur base
+    (rien n'est écrit). posts : lignes de prepare_post ; jobs : (title_src, raw_text, link, source, img_url) ;
+    samples : (nom, url, html)."""
+    now = now_iso()
     status = "published" if AUTO_PUBLISH else "draft"
-
+    published_at = now if status == "published" else None
+    ids, n_jobs = [], 0
     con = db()
     try:
-        con.execute("""INSERT INTO posts
-          (title, body, status, created_at, updated_at, publish_at, image_url, image_sha1, orig_link, source)
-          VALUES(?,?,?,?,?,?,?,?,?,?)""",
-          (title_fr, body_text, status, now, now, None, local_path, sha1, link, source))
-        con.commit()
-        return True
-    except Exception as e:
-        print("[DB] insert_post error:", e)
-        return False
+        t0 = time.perf_counter()
+        with metrics.span("db_batch", source=source):
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for p in posts:
+                    cur = con.execute(
+                        f"INSERT INTO posts({', '.join(POST_COLS)}, status, created_at, updated_at, published_at) "
+                        f"VALUES({', '.join('?' * (len(POST_COLS) + 4))}) ON CONFLICT DO NOTHING",
+                        (*(p[c] for c in POST_COLS), status, now, now, published_at))
+                    if cur.rowcount:
+                        ids.append(cur.lastrowid)
+                        refresh_fragments(con, cur.lastrowid)
+                for title_src, raw_text, link, src, img_url in jobs:
+                    n_jobs += con.execute(
+                        "INSERT INTO backfill_jobs(orig_link, source, title_src, raw_text, img_url, status, "
+                        "created_at, updated_at) VALUES(?,?,?,?,?,'pending',?,?) ON CONFLICT(orig_link) DO NOTHING",
+                        (link, src, title_src, raw_text, img_url, now, now)).rowcount
+                for name, url, html in samples:
+                    con.execute("INSERT INTO scraper_samples(name, url, html, fetched_at) VALUES(?,?,?,?) "
+                                "ON CONFLICT(name) DO UPDATE SET url=excluded.url, html=excluded.html, "
+                                "fetched_at=excluded.fetched_at",
+                                (name, url, zlib.compress(html.encode("utf-8")), now))
+                if settings:
+                    con.executemany("INSERT INTO settings(key,value) VALUES(?,?) "
+                                    "ON CONFLICT(key) DO UPDATE SET value=excluded.value", list(settings.items()))
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
     finally:
         con.close()
+    if len(posts) + len(jobs) > 1:
+        print(f"[DB] lot {source}: {len(ids)}/{len(posts)} article(s), {n_jobs}/{len(jobs)} job(s) "
+              f"en {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if ids and status == "published":
+        notify_published(ids)
+    return ids, n_jobs
+
+class WriteBatch:
+    """Accumule les écritures d'une source pendant l'import ; flush() (write_batch) tous les IMPORT_BATCH_ROWS
+    éléments, quand le plus ancien attend depuis IMPORT_BATCH_S, et en fin de source (appelant).
+    created / skipped : bilan des lots déjà écrits (doublons détectés à l'écriture comptés en skipped)."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.posts, self.jobs, self.samples = [], [], []
+        self.created = self.skipped = 0
+        self.since = None
+
+    def _added(self):
+        self.since = self.since or time.monotonic()
+        if (len(self.posts) + len(self.jobs) >= IMPORT_BATCH_ROWS
+                or time.monotonic() - self.since >= IMPORT_BATCH_S):
+            self.flush()
+
+    def add_post(self, title_fr, body_text, link, source, img_url) -> bool:
+        """False si l'article est refusé d'emblée (pas d'image) ; sinon écrit au prochain lot."""
+        row = prepare_post(title_fr, body_text, link, source, img_url)
+        if not row:
+            return False
+        self.posts.append(row)
+        self._added()
+        return True
+
+    def add_job(self, title_src, raw_text, link, source, img_url):
+        self.jobs.append((title_src, raw_text, link, source, img_url))
+        self._added()
 
-def scrape_rss_once(feeds):
+    def add_sample(self, name, url, page_html):
+        self.samples = [(name, url, page_html)]
+
+    def flush(self):
+        if not (self.posts or self.jobs or self.samples):
+            return
+        posts, jobs, samples = self.posts, self.jobs, self.samples
+        self.posts, self.jobs, self.samples, self.since = [], [], [], None
+        try:
+            ids, n_jobs = write_batch(posts, jobs, samples, source=self.source)
+        except sqlite3.Error as e:
+            print(f"[DB] lot {self.source} non écrit: {e}")
+            metrics.inc("import_skipped_total", len(posts) + len(jobs), source=self.source, reason="erreur_base")
+            self.skipped += len(posts) + len(jobs)
+            return
+        dups = len(posts) - len(ids)         # jobs déjà en file : ni créés ni ignorés (comme avant)
+        if ids:
+            metrics.inc("import_created_total", len(ids), source=self.source)
+        if dups:
+            metrics.inc("import_skipped_total", dups, source=self.source, reason="doublon")
+        self.created += len(ids) + n_jobs
+        self.skipped += dups
+
+def scrape_rss_once(feeds, max_entries=20, defer=False):
+    """defer=True: les articles extraits sont mis en file de rattrapage (batch) au lieu d'être réécrits."""
     MIN_SOURCE_CHARS = 40
     created, skipped = 0, 0
     for feed in feeds:
+        src = urlparse(feed).netloc or feed
+        batch = WriteBatch(src)
         try:
             try:
-                xml = fetch_xml(feed)
-                fp = feedparser.parse(xml)
+                with metrics.span("fetch_feed", source=src):
+                    xml = fetch_xml(feed)
+                with metrics.span("parse_feed", source=src):
+                    fp = feedparser.parse(xml)
             except Exception as e:
                 print(f"[FEED] fetch/parse error {feed}: {e}")
+                metrics.inc("import_skipped_total", source=src, reason="flux_erreur")
                 skipped += 1
                 continue
 
             feed_title = fp.feed.get("title","") if getattr(fp, "feed", None) else ""
-            for e in getattr(fp, "entries", [])[:20]:
+            for e in getattr(fp, "entries", [])[:max_entries]:
                 try:
                     link = e.get("link") or ""
                     if not link or already_have_link(link):
                         print("[RSS] skip: link vide/doublon", link)
+                        metrics.inc("import_skipped_total", source=src, reason="doublon")
                         skipped += 1; continue
 
                     title_src = (e.get("title") or "(Sans titre)").strip()
 
-                    # page → extraction texte
-                    page_html = ""
+                    # page → nettoyage + extraction texte / image (un seul parse)
+                    page_html, article_text, page_img = "", "", None
                     try:
-                        page_html = http_get(link)
-                        if page_html:
-                            page_html = clean_source_html(page_html)
+                        with metrics.span("fetch_page", source=src):
+                            page_html = http_get(link)
                     except Exception as ee:
                         print(f"[PAGE] fetch fail {link}: {ee}")
-                    article_text = extract_article_text(page_html) if page_html else ""
-                    if not article_text:
-                        article_text = BeautifulSoup(html_from_entry(e), "html.parser").get_text(" ", strip=True)
+                    with metrics.span("extract", source=src):
+                        if page_html:
+                            _, _, article_text, page_img = extract_page(None, link, page_html)
+                        if not article_text:
+                            article_text = BeautifulSoup(html_from_entry(e), "html.parser").get_text(" ", strip=True)
                     if not article_text or len(article_text) < MIN_SOURCE_CHARS:
                         print("[RSS] skip: texte trop court (<40 chars)", link)
+                        metrics.inc("import_skipped_total", source=src, reason="texte_court")
                         skipped += 1; continue
 
                     # image : tente la page / RSS, sinon image par défaut
-                    img_url = get_image_from_entry(e, page_html=page_html, page_url=link)
+                    with metrics.span("image_pick", source=src):
+                        img_url = get_image_from_entry(e, page_url=link) or page_img
                     if not img_url:
                         default_img = get_setting("default_image_url", "").strip()
                         if default_img:
                             img_url = default_img
                     if REQUIRE_IMAGE and not img_url:
                         print("[RSS] skip: pas d'image", link)
+                        metrics.inc("import_skipped_total", source=src, reason="sans_image")
                         skipped += 1
                         continue
 
+                    if defer:
+                        batch.add_job(title_src, article_text, link, feed_title, img_url)
+                        continue
+
                     # FR
-                    title_fr, body_text, _sure_fr = rewrite_article_fr(title_src, article_text)
+                    with metrics.span("rewrite", source=src):
+                        title_fr, body_text, _sure_fr = rewrite_article_fr(title_src, article_text)
                     if not body_text:
                         print("[RSS] skip: réécriture vide", link)
+                        metrics.inc("import_skipped_total", source=src, reason="reecriture_vide")
                         skipped += 1; continue
 
-                    if insert_post(title_fr, body_text, link, feed_title, img_url):
-                        created += 1
-                    else:
+                    with metrics.span("insert", source=src):
+                        ok = batch.add_post(title_fr, body_text, link, feed_title, img_url)
+                    if not ok:
+                        metrics.inc("import_skipped_total", source=src, reason="insertion_refusee")
                         skipped += 1
                 except Exception as ex:
                     skipped += 1
+                    metrics.inc("import_skipped_total", source=src, reason="erreur")
                     print(f"[RSS ENTRY] error: {ex}")
                     traceback.print_exc()
         except Exception as e:
             print(f"[FEED] parse error {feed}: {e}")
             continue
+        finally:
+            batch.flush()
+            created += batch.created; skipped += batch.skipped
     return created, skipped
 
 def normalize_url(base, href):
@@ -843,91 +1510,504 @@ def normalize_url(base, href):
     if href.startswith("#"): return None
     return urljoin(base, href)
 
-def scrape_index_once(scrapers_json):
+# ---- Sitemaps (Google News) : parse en flux, filtre par date, titre/image repris tels quels
+SITEMAP_MAX_CHILDREN = 3          # sous-sitemaps suivis par index (les plus récents)
+
+def _sitemap_key(tag):
+    """'{ns}local' → 'local', 'news:local' ou 'image:local' selon l'espace de noms."""
+    ns, _, local = tag[1:].partition("}") if tag.startswith("{") else ("", "", tag)
+    return ("news:" if "sitemap-news" in ns else "image:" if "sitemap-image" in ns else "") + local
+
+def parse_w3c_date(s):
+    """Date W3C (2024-05-01, 2024-05-01T10:00:00+04:00, …Z) → datetime UTC, ou None."""
+    try:
+        d = datetime.fromisoformat((s or "").strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (d if d.tzinfo else d.replace(tzinfo=timezone.utc)).astimezone(timezone.utc)
+
+def iter_sitemap(fp):
+    """Flux XML binaire → dicts {kind: 'url'|'sitemap', loc, date, title, image}, au fil du parse
+    (chaque <url>/<sitemap> est libéré après lecture : mémoire constante quelle que soit la taille)."""
+    for _ev, el in ET.iterparse(fp, events=("end",)):
+        kind = _sitemap_key(el.tag)
+        if kind not in ("url", "sitemap"):
+            continue
+        f = {}
+        for child in el.iter():
+            if child is not el and child.text and child.text.strip():
+                f.setdefault(_sitemap_key(child.tag), child.text.strip())
+        el.clear()
+        if f.get("loc"):
+            yield {"kind": kind, "loc": f["loc"],
+                   "date": parse_w3c_date(f.get("news:publication_date") or f.get("lastmod")),
+                   "title": f.get("news:title"), "image": f.get("image:loc")}
+
+def fetch_sitemap(url, timeout=25):
+    """Entrées du sitemap (ou de l'index de sitemaps) à url, au fil de la lecture (générateur). Lecture bornée
+    à SITEMAP_MAX_BYTES décompressés (.gz compris) et `timeout` secondes : au-delà, entrées déjà lues gardées."""
+    deadline = time.monotonic() + timeout
+    with open_stream(url, "sitemap", {
+        "User-Agent": "Console-Armenie/1.0 (+https://armenian-console.onrender.com)",
+        "Accept": "application/xml, text/xml;q=0.9, */*;q=0.8",
+    }, timeout) as r:
+        streams = [CappedReader(lambda n: r.raw.read1(n, decode_content=True), SITEMAP_MAX_BYTES, deadline)]
+        if urlparse(url).path.endswith(".gz"):
+            streams.append(CappedReader(gzip.GzipFile(fileobj=streams[0]).read1, SITEMAP_MAX_BYTES, deadline))
+        try:
+            yield from iter_sitemap(streams[-1])
+        except (ET.ParseError, EOFError):
+            if not any(st.cut for st in streams):
+                raise
+        cut = next((st.cut for st in streams if st.cut), None)
+        if cut:
+            metrics.inc("fetch_truncated_total", kind="sitemap", reason=cut)
+            print(f"[FETCH] sitemap arrêté ({cut}, {streams[-1].size} octets): {url}")
+
+def sitemap_links(sc, limit):
+    """[(lien, {title, image})] des articles les plus récents du sitemap, au plus `limit`, plus jeunes que
+    max_age_hours ; un index de sitemaps est suivi sur ses SITEMAP_MAX_CHILDREN sous-sitemaps les plus récents."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=sc.max_age_h)
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    keep = limit * 3
+    best, children, seq = [], [], 0          # best : tas borné des `keep` URLs les plus récentes
+
+    def take(url):
+        nonlocal seq
+        for e in fetch_sitemap(url):
+            if e["date"] is not None and e["date"] < cutoff:
+                continue
+            if e["kind"] == "sitemap":
+                children.append(e)
+                continue
+            seq += 1
+            item = (e["date"] or oldest, -seq, e)
+            if len(best) < keep:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+    take(sc.sitemap_url)
+    for child in heapq.nlargest(SITEMAP_MAX_CHILDREN, children, key=lambda e: e["date"] or oldest):
+        try:
+            take(urljoin(sc.sitemap_url, child["loc"]))
+        except Exception as e:
+            print(f"[SITEMAP] {child['loc']}: {e}")
+    urls = [e for _d, _s, e in sorted(best, reverse=True)]
+    links, seen = [], set()
+    for e in urls:
+        full = normalize_url(sc.sitemap_url, e["loc"])
+        if full and full not in seen:
+            seen.add(full)
+            links.append((full, {"title": e["title"], "image": e["image"] and urljoin(full, e["image"])}))
+        if len(links) >= limit:
+            break
+    return links
+
+def index_links(sc, limit):
+    """[(lien, {})] depuis la page d'index du scraper et son link_selector."""
+    with metrics.span("fetch_index", source=sc.name):
+        html = http_get(sc.index_url)
+    with metrics.span("parse_index", source=sc.name):
+        soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for a in sc.link_sel.select(soup, limit=limit * 3):
+        full = normalize_url(sc.index_url, a.get("href"))
+        if full and full not in links:
+            links.append(full)
+        if len(links) >= limit:
+            break
+    return [(link, {}) for link in links]
+
+# ---- Scrapers compilés (sélecteurs parsés une fois, réutilisés entre les cycles)
+class CompiledScraper:
+    def __init__(self, cfg):
+        if not isinstance(cfg, dict):
+            raise ValueError("chaque scraper doit être un objet {}")
+        self.name = cfg.get("name", "")
+        try:
+            # découverte : sitemap Google News (sitemap_url) ou page d'index + link_selector
+            self.sitemap_url = cfg.get("sitemap_url") or None
+            self.max_age_h = float(cfg.get("max_age_hours", 48))
+            if self.sitemap_url:
+                self.index_url = cfg.get("index_url") or self.sitemap_url
+                self.link_sel = None
+            else:
+                self.index_url = cfg["index_url"]
+                self.link_sel = sv.compile(cfg["link_selector"])
+            self.title = compile_extractor(cfg.get("title_selector", "h1"))
+            self.content_sel = sv.compile(cfg["content_selector"]) if cfg.get("content_selector") else None
+            self.images = [compile_extractor(s) for s in cfg.get("image_selectors", [])]
+            self.max_items = int(cfg.get("max_items", 6))
+            # lecture de la page article arrêtée après ce marqueur (ex. "</article>"), None = page entière
+            self.stop_after = cfg["stop_after"].encode("utf-8") if cfg.get("stop_after") else None
+            # sélecteurs bruts (picklables) pour cpuwork.process_page
+            self.selectors = (cfg.get("title_selector", "h1"), cfg.get("content_selector") or None,
+                              tuple(cfg.get("image_selectors", [])))
+        except KeyError as e:
+            raise ValueError(f"scraper «{self.name}»: clé manquante {e}")
+        except sv.SelectorSyntaxError as e:
+            raise ValueError(f"scraper «{self.name}»: sélecteur invalide ({e})")
+
+_SCRAPERS_CACHE = {"src": None, "compiled": [], "errors": []}
+
+def compile_scrapers(scrapers_json):
+    """Renvoie (compilés, erreurs). Un scraper invalide est écarté sans bloquer les autres."""
+    if not isinstance(scrapers_json, list):
+        raise ValueError("Le JSON de scrapers doit être une liste []")
+    compiled, errors = [], []
+    for cfg in scrapers_json:
+        try:
+            compiled.append(CompiledScraper(cfg))
+        except ValueError as e:
+            errors.append(str(e))
+    return compiled, errors
+
+def get_compiled_scrapers():
+    """Scrapers compilés depuis les paramètres ; recompile uniquement si le JSON a changé."""
+    src = get_setting("scrapers_json", _json.dumps(DEFAULT_SCRAPERS))
+    if src != _SCRAPERS_CACHE["src"]:
+        compiled, errors = compile_scrapers(_json.loads(src))
+        for err in errors:
+            print("[SCRAPER] config error:", err)
+        _SCRAPERS_CACHE.update(src=src, compiled=compiled, errors=errors)
+    return _SCRAPERS_CACHE["compiled"]
+
+def validate_scrapers_on_samples(compiled):
+    """Applique titre/contenu/images de chaque scraper à sa page d'exemple stockée ; renvoie les avertissements."""
+    con = db()
+    try:
+        samples = {r["name"]: r for r in con.execute("SELECT name, url, html FROM scraper_samples").fetchall()}
+    finally:
+        con.close()
+    warnings = []
+    for sc in compiled:
+        r = samples.get(sc.name)
+        if not r:
+            continue
+        psoup = BeautifulSoup(zlib.decompress(r["html"]).decode("utf-8"), "html.parser")
+        missing = []
+        if not extract_with(psoup, sc.title):
+            missing.append("title_selector")
+        if sc.content_sel is not None and not sc.content_sel.select_one(psoup):
+            missing.append("content_selector")
+        if sc.images and not any(extract_with(psoup, ex) for ex in sc.images):
+            missing.append("image_selectors")
+        if missing:
+            warnings.append(f"{sc.name}: {', '.join(missing)} ne trouve rien sur {r['url']}")
+    return warnings
+
+def extract_page(sc, link, raw):
+    """Page article brute → (html nettoyé, title_src, texte, image|None) ; sc=None: titre h1/og:title,
+    extraction générique. Nettoyage + extraction en un seul appel (pool de processus si CPU_WORKERS)."""
+    sels = sc.selectors if sc is not None else (None, None, ())
+    return cpu_call(cpuwork.process_page, raw, link, *sels)
+
+def scrape_index_once(scrapers, max_items=None, defer=False):
+    """max_items remplace la limite de chaque scraper ; defer=True: mise en file de rattrapage (batch)."""
     MIN_SOURCE_CHARS = 40
     created, skipped = 0, 0
-    for cfg in scrapers_json:
+    for sc in scrapers:
+        name = sc.name
+        limit = max_items or sc.max_items
+        batch = WriteBatch(name)
         try:
-            name = cfg.get("name","")
-            index_url = cfg["index_url"]
-            link_sel  = cfg["link_selector"]
-            max_items = int(cfg.get("max_items", 6))
-            html = http_get(index_url)
-            soup = BeautifulSoup(html, "html.parser")
-            links = []
-            for a in soup.select(link_sel)[: max_items * 3]:
-                href = a.get("href")
-                full = normalize_url(index_url, href)
-                if full and full not in links:
-                    links.append(full)
-                if len(links) >= max_items:
-                    break
-
-            for link in links:
+            if sc.sitemap_url:
+                with metrics.span("fetch_sitemap", source=name):
+                    links = sitemap_links(sc, limit)
+            else:
+                links = index_links(sc, limit)
+
+            sampled = False
+            for link, meta in links:
                 try:
                     if already_have_link(link):
                         print("[SCRAPER] skip: doublon", link)
+                        metrics.inc("import_skipped_total", source=name, reason="doublon")
                         skipped += 1; continue
-                    page = http_get(link)
-                    page = clean_source_html(page)
-                    psoup = BeautifulSoup(page, "html.parser")
-
-                    # titre source (pour traduction)
-                    title_sel = cfg.get("title_selector","h1")
-                    title_src = soup_select_attr(psoup, title_sel) or "(Sans titre)"
-
-                    # contenu
-                    content_sel = cfg.get("content_selector") or ""
-                    node_text = ""
-                    if content_sel:
-                        node = psoup.select_one(content_sel)
-                        if node:
-                            node_text = " ".join(p.get_text(" ", strip=True) for p in (node.find_all(["p","h2","li"]) or [node]))
-                            node_text = re.sub(r"\s+", " ", node_text).strip()
-                    if not node_text:
-                        node_text = extract_article_text(page)
+                    with metrics.span("fetch_page", source=name):
+                        page = http_get(link, stop_after=sc.stop_after)
+                    with metrics.span("extract", source=name):
+                        page, title_src, node_text, img = extract_page(sc, link, page)
+                    # métadonnées du sitemap prioritaires sur l'extraction (titre éditorial, image choisie)
+                    title_src = meta.get("title") or title_src
+                    img = meta.get("image") or img
+                    if not sampled:
+                        batch.add_sample(name, link, page)
+                        sampled = True
                     if not node_text or len(node_text) < MIN_SOURCE_CHARS:
                         print("[SCRAPER] skip: texte trop court (<40 chars)", link)
+                        metrics.inc("import_skipped_total", source=name, reason="texte_court")
                         skipped += 1; continue
 
                     # image : page / meta / fallback par défaut
-                    img = None
-                    for isel in cfg.get("image_selectors", []):
-                        val = soup_select_attr(psoup, isel)
-                        if val:
-                            img = urljoin(link, val)
-                            break
-                    if not img:
-                        img = find_main_image_in_html(page, base_url=link)
                     if not img:
                         default_img = get_setting("default_image_url", "").strip()
                         if default_img:
                             img = default_img
                     if REQUIRE_IMAGE and not img:
                         print("[SCRAPER] skip: pas d'image", link)
+                        metrics.inc("import_skipped_total", source=name, reason="sans_image")
                         skipped += 1
                         continue
 
+                    if defer:
+                        batch.add_job(title_src, node_text, link, name, img)
+                        continue
+
                     # FR
-                    title_fr, body_text, _sure = rewrite_article_fr(title_src, node_text)
+                    with metrics.span("rewrite", source=name):
+                        title_fr, body_text, _sure = rewrite_article_fr(title_src, node_text)
                     if not body_text:
                         print("[SCRAPER] skip: réécriture vide", link)
+                        metrics.inc("import_skipped_total", source=name, reason="reecriture_vide")
                         skipped += 1; continue
 
-                    if insert_post(title_fr, body_text, link, name, img):
-                        created += 1
-                    else:
+                    with metrics.span("insert", source=name):
+                        ok = batch.add_post(title_fr, body_text, link, name, img)
+                    if not ok:
+                        metrics.inc("import_skipped_total", source=name, reason="insertion_refusee")
                         skipped += 1
                 except Exception as inner:
                     skipped += 1
+                    metrics.inc("import_skipped_total", source=name, reason="erreur")
                     print(f"[SCRAPER:{name}] article error:", inner)
         except Exception as e:
+            metrics.inc("import_skipped_total", source=name, reason="index_erreur")
             print("[SCRAPER] config error:", e)
+        finally:
+            batch.flush()
+            created += batch.created; skipped += batch.skipped
     return created, skipped
 
+# ================== RATTRAPAGE (backfill par batch) ==================
+# Extraction comme l'import normal, mais les réécritures sont mises en file (backfill_jobs), envoyées
+# en un fichier JSONL à l'API batch, puis appliquées (insert_post) quand le batch est terminé.
+_BACKFILL_LOCK = threading.Lock()
+
+def extract_from_url(link):
+    """Page article isolée → (title_src, texte, image) ; texte vide si rien d'exploitable."""
+    return extract_page(None, link, http_get(link))[1:]
+
+def import_url(link: str) -> str:
+    """Importe un seul article (extraction, réécriture, insertion) ; renvoie le message de résultat."""
+    if already_have_link(link):
+        return f"Déjà importé : {link}"
+    title_src, text, img = extract_from_url(link)
+    if len(text) < 40:
+        return f"Texte introuvable ou trop court : {link}"
+    title_fr, body_text, _sure = rewrite_article_fr(title_src, text)
+    if not body_text:
+        return f"Réécriture vide : {link}"
+    ok = insert_post(title_fr, body_text, link, urlparse(link).netloc, img)
+    return f"{'Importé' if ok else 'Refusé (image absente ou doublon)'} : {link}"
+
+def rewrite_post(post_id: int) -> str:
+    """Refait la réécriture FR d'un article existant depuis sa source (cache de pages, sinon réseau) ;
+    l'image et le statut sont conservés."""
+    con = db()
+    try:
+        r = con.execute("SELECT orig_link FROM posts WHERE id=?", (post_id,)).fetchone()
+    finally:
+        con.close()
+    if not r or not r["orig_link"]:
+        return f"#{post_id} : article ou lien source introuvable"
+    link = r["orig_link"]
+    host = urlparse(link).netloc
+    sc = next((s for s in get_compiled_scrapers() if urlparse(s.index_url).netloc == host), None)
+    _, title_src, text, _img = extract_page(sc, link, cache_get(link) or http_get(link))
+    if len(text) < 40:
+        return f"#{post_id} : texte source introuvable ({link})"
+    title_fr, body_text, _sure = rewrite_article_fr(title_src, text)
+    if not body_text:
+        return f"#{post_id} : réécriture vide"
+    con = db()
+    try:
+        con.execute("UPDATE posts SET title=?, body=?, updated_at=? WHERE id=?",
+                    (title_fr, body_text, now_iso(), post_id))
+        refresh_fragments(con, post_id)
+        con.commit()
+    finally:
+        con.close()
+    return f"#{post_id} réécrit : {title_fr}"
+
+def backfill_collect(source: str, limit: int = 100) -> str:
+    """source: URL de flux RSS, nom de scraper, ou liste d'URLs d'articles (une par ligne)."""
+    lines = [l.strip() for l in (source or "").splitlines() if l.strip()]
+    if not lines:
+        return "Aucune source."
+    scrapers = {sc.name: sc for sc in get_compiled_scrapers()}
+    if len(lines) == 1 and lines[0] in scrapers:
+        created, skipped = scrape_index_once([scrapers[lines[0]]], max_items=limit, defer=True)
+    elif len(lines) == 1 and not looks_like_article_url(lines[0]):
+        created, skipped = scrape_rss_once(lines, max_entries=limit, defer=True)
+    else:
+        batch, skipped = WriteBatch("rattrapage"), 0
+        default_img = get_setting("default_image_url", "").strip()
+        for link in lines[:limit]:
+            try:
+                if already_have_link(link):
+                    skipped += 1; continue
+                title_src, text, img = extract_from_url(link)
+                img = img or default_img
+                if len(text) < 40 or (REQUIRE_IMAGE and not img):
+                    skipped += 1; continue
+                batch.add_job(title_src, text, link, urlparse(link).netloc, img)
+            except Exception as e:
+                skipped += 1
+                print(f"[BACKFILL] {link}: {e}")
+        batch.flush()
+        created, skipped = batch.created, skipped + batch.skipped
+    return f"Rattrapage: {created} article(s) en file, {skipped} ignoré(s)"
+
+def looks_like_article_url(u: str) -> bool:
+    return not re.search(r"(rss|feed|atom)(\.xml)?/?($|\?)", u, re.I)
+
+def backfill_submit() -> str:
+    """Envoie les jobs 'pending' : source FR → voie locale immédiate, le reste → un batch JSONL."""
+    key, model = active_openai()
+    with _BACKFILL_LOCK:
+        con = db()
+        try:
+            jobs = con.execute("SELECT * FROM backfill_jobs WHERE status='pending' ORDER BY id LIMIT ?",
+                               (BACKFILL_BATCH_MAX,)).fetchall()
+        finally:
+            con.close()
+        lines, local = [], 0
+        for j in jobs:
+            text = strip_tags(j["raw_text"] or "")
+            if not key or (word_count(text) >= TARGET_MIN_WORDS and is_french(text)):
+                apply_backfill_result(j, None, None)          # rewrite_article_fr: voie locale, sans batch
+                local += 1
+                continue
+            lines.append(llm.batch_line(f"bf-{j['id']}", model,
+                                        rewrite_messages(strip_tags(j["title_src"] or "").strip(),
+                                                         text[:SINGLE_CALL_MAX_CHARS])))
+        if not lines:
+            return f"Rattrapage: {local} traité(s) localement, rien à envoyer."
+        batch = llm.submit_batch(key, lines, metadata={"app": "console-armenie-backfill"})
+        ids = [int(l["custom_id"][3:]) for l in lines]
+        con = db()
+        try:
+            con.execute(f"UPDATE backfill_jobs SET status='submitted', batch_id=?, updated_at=? "
+                        f"WHERE id IN ({','.join('?' * len(ids))})",
+                        (batch["id"], datetime.now(timezone.utc).isoformat(), *ids))
+            con.commit()
+        finally:
+            con.close()
+        for _ in lines:
+            count_llm()
+        flush_llm_stats()
+        msg = f"Rattrapage: batch {batch['id']} envoyé ({len(lines)} articles), {local} traité(s) localement"
+        print("[BACKFILL]", msg)
+        return msg
+
+def _set_job(job_id, status, error=None):
+    con = db()
+    try:
+        con.execute("UPDATE backfill_jobs SET status=?, error=?, updated_at=? WHERE id=?",
+                    (status, error, datetime.now(timezone.utc).isoformat(), job_id))
+        con.commit()
+    finally:
+        con.close()
+
+def apply_backfill_result(job, content, error):
+    """content=None et error=None → réécriture directe (voie locale / fallback)."""
+    try:
+        if error:
+            _set_job(job["id"], "failed", error); return
+        if content is None:
+            title_fr, body_fr, _ = rewrite_article_fr(job["title_src"], job["raw_text"])
+        else:
+            text = strip_tags(job["raw_text"] or "")[:SINGLE_CALL_MAX_CHARS]
+            title_fr, body_fr = parse_rewrite_output(content)
+            title_fr, body_fr, _ = finalize_rewrite(title_fr, body_fr, text, strip_tags(job["title_src"] or "").strip())
+        if body_fr and insert_post(title_fr, body_fr, job["orig_link"], job["source"], job["img_url"]):
+            _set_job(job["id"], "done")
+        else:
+            _set_job(job["id"], "failed", "insertion refusée (image/doublon/corps vide)")
+    except Exception as e:
+        _set_job(job["id"], "failed", str(e)[:300])
+
+def backfill_poll() -> str:
+    """Interroge les batchs en cours et applique les résultats des batchs terminés."""
+    key, _model = active_openai()
+    con = db()
+    try:
+        batch_ids = [r["batch_id"] for r in con.execute(
+            "SELECT DISTINCT batch_id FROM backfill_jobs WHERE status='submitted'").fetchall()]
+    finally:
+        con.close()
+    done = 0
+    for bid in batch_ids:
+        b = llm.get_batch(key, bid)
+        st = b.get("status")
+        if st in ("validating", "in_progress", "finalizing", "cancelling"):
+            continue
+        con = db()
+        try:
+            jobs = {f"bf-{r['id']}": r for r in con.execute(
+                "SELECT * FROM backfill_jobs WHERE status='submitted' AND batch_id=?", (bid,)).fetchall()}
+        finally:
+            con.close()
+        for fid in (b.get("output_file_id"), b.get("error_file_id")):
+            if fid:
+                for custom_id, content, error in llm.batch_results(key, fid):
+                    job = jobs.pop(custom_id, None)
+                    if job is not None:
+                        apply_backfill_result(job, content, error); done += 1
+        for job in jobs.values():          # sans résultat (batch expiré/échoué) → remis en file
+            _set_job(job["id"], "pending", f"batch {bid}: {st}")
+        print(f"[BACKFILL] batch {bid} {st}: {done} appliqué(s), {len(jobs)} remis en file")
+    if done:
+        flush_llm_stats()
+    return f"Rattrapage: {done} résultat(s) appliqué(s)"
+
+def backfill_status() -> dict:
+    con = db()
+    try:
+        return {r["status"]: r["n"] for r in con.execute(
+            "SELECT status, COUNT(*) AS n FROM backfill_jobs GROUP BY status").fetchall()}
+    finally:
+        con.close()
+
+def run_backfill(source: str, limit: int = 100, poll: bool = False) -> str:
+    """Action « Rattrapage » de l'admin : vérifie les batchs (poll) ou met en file source puis envoie."""
+    try:
+        msgs = [backfill_poll()] if poll else [backfill_collect(source, limit) if source.strip() else "",
+                                                backfill_submit()]
+        msg = " • ".join(m for m in msgs if m)
+    except Exception as e:
+        msg = f"Erreur rattrapage: {e}"
+        traceback.print_exc()
+    set_setting("last_import_result", msg)
+    return msg
+
+def backfill_loop():
+    while True:
+        time.sleep(max(5, BACKFILL_POLL_S))
+        try:
+            if backfill_status().get("submitted"):
+                backfill_poll()
+        except Exception as e:
+            print("[BACKFILL] poll error:", e)
+
 # -------- utilitaire import (1 fois) --------
 def run_import_once():
     """Import RSS + scrapers une seule fois, renvoie (created, skipped, detail_msg)."""
+    token = acquire_lease("import", IMPORT_LEASE_S)
+    if not token:
+        print("[IMPORT] déjà en cours (autre thread ou processus)")
+        return 0, 0, "Import déjà en cours."
+    try:
+        if profiler.take_import():
+            return profiler.capture("import", _run_import_once)
+        return _run_import_once()
+    finally:
+        release_lease("import", token)
+
+def _run_import_once():
+    llm.start_run()
     # Vérification image par défaut si image obligatoire
     if REQUIRE_IMAGE:
         default_img = get_setting("default_image_url", "").strip()
@@ -941,9 +2021,7 @@ def run_import_once():
     feeds_txt = get_setting("feeds", "\n".join(DEFAULT_FEEDS))
     feed_list = [u.strip() for u in feeds_txt.splitlines() if u.strip()]
     try:
-        scrapers_cfg = _json.loads(get_setting("scrapers_json", _json.dumps(DEFAULT_SCRAPERS)))
-        if not isinstance(scrapers_cfg, list):
-            raise ValueError("Le JSON de scrapers doit être une liste []")
+        scrapers_cfg = get_compiled_scrapers()
     except Exception as e:
         msg = f"Config sites JSON invalide: {e}"
         set_setting("last_import_result", msg)
@@ -953,32 +2031,236 @@ def run_import_once():
     c2, s2 = scrape_index_once(scrapers_cfg)
     total_c, total_s = (c1 + c2), (s1 + s2)
     msg = f"Import OK: {total_c} créés, {total_s} ignorés (RSS {c1}/{s1}, Sites {c2}/{s2})"
-    set_setting("last_import_result", msg)
+    flush_llm_stats({"last_import_result": msg})
     return total_c, total_s, msg
 
 # ================== SCHEDULER (publication auto) ==================
+# Tas (publish_at, post_id) en mémoire + condition : le thread dort jusqu'à la prochaine échéance
+# et n'est réveillé que par save() (planifier / replanifier / annuler). Reconstruit depuis la base au boot.
+_SCHED_HEAP = []            # [(timestamp, post_id)] — entrées obsolètes ignorées à la sortie du tas
+_SCHED_DUE = {}             # post_id -> timestamp courant (référence pour invalider le tas)
+_SCHED_COND = threading.Condition()
+_SCHED_STATE = {"running": False}   # publish_due_loop lancé dans ce processus (sinon rien ne vide le tas)
+
+def _iso_to_ts(iso: str) -> float:
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def schedule_wakeup(post_id: int, publish_at=None):
+    """Enregistre (ou annule si publish_at=None) l'échéance d'un article et réveille le scheduler.
+    Sans scheduler dans ce processus (web avec WEB_BACKGROUND=0) : rien, le worker relit la base."""
+    if not _SCHED_STATE["running"]:
+        return
+    with _SCHED_COND:
+        if publish_at:
+            try:
+                ts = _iso_to_ts(publish_at)
+            except ValueError as e:
+                print(f"[SCHED] date invalide pour {post_id}: {publish_at} ({e})")
+                return
+            _SCHED_DUE[post_id] = ts
+            heapq.heappush(_SCHED_HEAP, (ts, post_id))
+        else:
+            _SCHED_DUE.pop(post_id, None)
+        _SCHED_COND.notify()
+
+def scheduler_rebuild(quiet=False):
+    """Recharge toutes les échéances 'scheduled' depuis la base (boot ; périodiquement dans le worker,
+    où les planifications sont faites par le processus web)."""
+    con = db()
+    try:
+        rows = con.execute(
+            "SELECT id, publish_at FROM posts WHERE status='scheduled' AND publish_at IS NOT NULL").fetchall()
+    finally:
+        con.close()
+    with _SCHED_COND:
+        _SCHED_HEAP.clear(); _SCHED_DUE.clear()
+    for r in rows:
+        schedule_wakeup(r["id"], r["publish_at"])
+    if not quiet:
+        print(f"[SCHED] {len(rows)} article(s) planifié(s) chargé(s)")
+
+def _next_due_ids(max_wait=None):
+    """Bloque jusqu'à ce qu'au moins une échéance soit atteinte, puis retire et renvoie les IDs dus ;
+    [] si max_wait secondes passent sans échéance."""
+    deadline = time.time() + max_wait if max_wait else None
+    with _SCHED_COND:
+        while True:
+            while _SCHED_HEAP and _SCHED_DUE.get(_SCHED_HEAP[0][1]) != _SCHED_HEAP[0][0]:
+                heapq.heappop(_SCHED_HEAP)
+            if deadline and time.time() >= deadline:
+                return []
+            wait = _SCHED_HEAP[0][0] - time.time() if _SCHED_HEAP else None
+            if deadline:
+                wait = min(wait, deadline - time.time()) if wait is not None else deadline - time.time()
+            if wait is None or wait > 0:
+                _SCHED_COND.wait(timeout=wait)
+                continue
+            ids, now_ts = [], time.time()
+            while _SCHED_HEAP and _SCHED_HEAP[0][0] <= now_ts:
+                ts, pid = heapq.heappop(_SCHED_HEAP)
+                if _SCHED_DUE.get(pid) == ts:
+                    del _SCHED_DUE[pid]
+                    ids.append(pid)
+            if ids:
+                return ids
+
+def publish_due_ids(ids):
+    """Publie ceux de ids encore planifiés et dont l'échéance en base est passée (le tas du worker peut
+    être en retard sur une replanification faite par le web) ; les autres sont réarmés à leur date en base."""
+    now = now_iso()
+    con = db()
+    try:
+        marks = ','.join('?'*len(ids))
+        rows = con.execute(f"SELECT id, publish_at FROM posts WHERE status='scheduled' AND id IN ({marks})",
+                           ids).fetchall()
+        due = [r["id"] for r in rows if (utc_iso(r["publish_at"]) or "") <= now]
+        later = [r for r in rows if r["id"] not in due]
+        if due:
+            con.execute(
+                f"UPDATE posts SET status='published', updated_at=? "
+                f"WHERE status='scheduled' AND publish_at <= ? AND id IN ({','.join('?'*len(due))})",
+                (now, now, *due)
+            )
+            mark_published(con, due)
+            con.commit()
+        print(f"[SCHED] Published IDs: {due}")
+    finally:
+        con.close()
+    for r in later:
+        schedule_wakeup(r["id"], r["publish_at"])
+    if due:
+        notify_published(due)
+
 def publish_due_loop():
+    _SCHED_STATE["running"] = True
+    try:
+        scheduler_rebuild()
+    except Exception as e:
+        print("[SCHED] rebuild error:", e)
+    last_rebuild = time.time()
     while True:
-        try:
-            now = datetime.now(timezone.utc).isoformat()
-            con = db()
+        ids = _next_due_ids(SCHED_RESYNC_S if ROLE["worker"] else None)
+        # worker : relecture aussi quand des échéances s'enchaînent (pas seulement après une attente vide)
+        if not ids or (ROLE["worker"] and time.time() - last_rebuild >= SCHED_RESYNC_S):
             try:
-                rows = con.execute(
-                    "SELECT id FROM posts WHERE status='scheduled' AND publish_at IS NOT NULL AND publish_at <= ?",
-                    (now,)).fetchall()
-                if rows:
-                    ids = [r["id"] for r in rows]
-                    con.execute(
-                        f"UPDATE posts SET status='published', updated_at=? WHERE id IN ({','.join('?'*len(ids))})",
-                        (now, *ids)
-                    )
-                    con.commit()
-                    print(f"[SCHED] Published IDs: {ids}")
-            finally:
-                con.close()
+                scheduler_rebuild(quiet=True)
+            except Exception as e:
+                print("[SCHED] rebuild error:", e)
+            last_rebuild = time.time()
+            if not ids:
+                continue
+        try:
+            publish_due_ids(ids)
         except Exception as e:
             print("[SCHED] loop error:", e)
-        time.sleep(30)
+            time.sleep(5)
+            for pid in ids:     # remet en file: nouvel essai immédiat au prochain tour
+                schedule_wakeup(pid, datetime.now(timezone.utc).isoformat())
+
+# ================== DIFFUSION (WebSub + webhooks) ==================
+# À chaque publication : ping « publish » au hub WebSub (les abonnés reçoivent le flux en quelques secondes)
+# et POST JSON aux webhooks configurés. Les envois passent par outbound_queue (reprise exponentielle,
+# survit aux redémarrages) et sont faits par outbound_loop, jamais dans la requête ou l'import.
+_PUSH_WAKE = threading.Event()
+
+def site_root() -> str:
+    """URL publique du site (admin, sinon PUBLIC_URL) ; jamais déduite de l'en-tête Host d'une requête.
+    Vide : pas de hub annoncé ni de notification."""
+    return (get_setting("site_url", "").strip() or PUBLIC_URL).rstrip("/")
+
+def websub_hub() -> str:
+    return get_setting("websub_hub", WEBSUB_HUB).strip()
+
+def _enqueue(con, kind, url, body, now):
+    con.execute("INSERT INTO outbound_queue(kind, url, body, status, attempts, next_at, created_at) "
+                "VALUES(?,?,?,'pending',0,?,?)", (kind, url, body, now, now))
+
+def notify_published(ids):
+    """Met en file le ping du hub et les webhooks pour les articles ids qui viennent d'être publiés."""
+    ids = [i for i in ids if i]
+    root, hub = site_root(), websub_hub()
+    hooks = [u.strip() for u in get_setting("webhook_urls", "").splitlines() if u.strip()]
+    if not ids or not root or not (hub or hooks):
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    con = db()
+    try:
+        # le hub relit tout le flux : un ping encore en attente couvre aussi ces articles
+        if hub and not con.execute("SELECT 1 FROM outbound_queue WHERE kind='websub' AND url=? "
+                                   "AND status='pending' AND attempts=0", (hub,)).fetchone():
+            _enqueue(con, "websub", hub, urlencode({"hub.mode": "publish", "hub.url": root + "/rss.xml"}), now)
+        if hooks:
+            rows = con.execute(f"SELECT id, title, created_at, published_at FROM posts WHERE status='published' "
+                               f"AND id IN ({','.join('?' * len(ids))})", ids).fetchall()
+            payload = _json.dumps({"event": "published", "feed": root + "/rss.xml", "posts": [
+                {"id": r["id"], "title": r["title"], "url": f"{root}/post/{r['id']}", "created_at": r["created_at"],
+                 "published_at": r["published_at"]}
+                for r in rows]}, ensure_ascii=False)
+            for u in hooks if rows else ():
+                _enqueue(con, "webhook", u, payload, now)
+        con.commit()
+    except Exception as e:
+        print("[PUSH] mise en file impossible:", e)
+    finally:
+        con.close()
+    _PUSH_WAKE.set()
+
+def deliver_outbound(limit=20) -> int:
+    """Envoie les messages échus ; échec → nouvel essai après 30 s, 1 min, 2 min… (max 1 h), abandon après
+    OUTBOUND_MAX_ATTEMPTS. Renvoie le nombre de messages traités."""
+    now = datetime.now(timezone.utc)
+    con = db()
+    try:
+        rows = con.execute("SELECT * FROM outbound_queue WHERE status='pending' AND next_at<=? ORDER BY id LIMIT ?",
+                           (now.isoformat(), limit)).fetchall()
+    finally:
+        con.close()
+    for r in rows:
+        ctype = "application/x-www-form-urlencoded" if r["kind"] == "websub" else "application/json; charset=utf-8"
+        try:
+            resp = requests.post(r["url"], data=r["body"].encode("utf-8"), timeout=10, headers={
+                "Content-Type": ctype, "User-Agent": "Console-Armenie/1.0 (+https://armenian-console.onrender.com)"})
+            metrics.inc("outbound_responses_total", kind=r["kind"], status=resp.status_code)
+            if resp.status_code >= 300:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            update, args = "status='done', attempts=attempts+1, last_error=NULL", ()
+        except Exception as e:
+            if not isinstance(e, RuntimeError):
+                metrics.inc("outbound_responses_total", kind=r["kind"], status="erreur")
+            attempts = r["attempts"] + 1
+            retry = now + timedelta(seconds=min(3600, 30 * 2 ** (attempts - 1)))
+            status = "failed" if attempts >= OUTBOUND_MAX_ATTEMPTS else "pending"
+            update, args = "status=?, attempts=?, next_at=?, last_error=?", (status, attempts, retry.isoformat(), str(e)[:300])
+            print(f"[PUSH] {r['kind']} {r['url']} essai {attempts}: {e}")
+        con = db()
+        try:
+            con.execute(f"UPDATE outbound_queue SET {update} WHERE id=?", (*args, r["id"]))
+            con.commit()
+        finally:
+            con.close()
+    return len(rows)
+
+def outbound_status() -> dict:
+    con = db()
+    try:
+        return {r["status"]: r["n"] for r in con.execute(
+            "SELECT status, COUNT(*) AS n FROM outbound_queue GROUP BY status").fetchall()}
+    finally:
+        con.close()
+
+def outbound_loop():
+    while True:
+        try:
+            if deliver_outbound():
+                continue
+        except Exception as e:
+            print("[PUSH] loop error:", e)
+        # réveil immédiat à la mise en file (même processus), sinon reprises échues / file du processus web
+        _PUSH_WAKE.wait(timeout=5 if ROLE["worker"] else 30)
+        _PUSH_WAKE.clear()
 
 # ======== Boucle d'import automatique (RSS + scrapers) ========
 def import_loop():
@@ -992,6 +2274,258 @@ def import_loop():
             set_setting("last_import_result", msg)
         time.sleep(max(60, IMPORT_INTERVAL_MIN * 60))
 
+# ================== RECHERCHE ==================
+SEARCH_PER_PAGE = 20
+_HL_OPEN, _HL_CLOSE = "\ue000", "\ue001"   # marqueurs neutres, remplacés par <mark> après échappement
+
+def fts_query(q: str) -> str:
+    """Transforme la saisie libre en requête FTS5 sûre: termes entre guillemets, préfixe sur le dernier."""
+    terms = re.findall(r"\w+", q or "")[:12]
+    if not terms:
+        return ""
+    parts = [f'"{t}"' for t in terms]
+    parts[-1] += "*"
+    return " ".join(parts)
+
+def search_posts(q, status=None, page=1, per_page=SEARCH_PER_PAGE):
+    """Retourne (rows, total). Chaque row = colonnes de posts + title_hl / snippet_hl (avec marqueurs)."""
+    page = max(1, int(page or 1))
+    offset = (page - 1) * per_page
+    con = db()
+    try:
+        if FTS_ENABLED:
+            match = fts_query(q)
+            if not match:
+                return [], 0
+            where, args = "posts_fts MATCH ?", [match]
+            if status:
+                where += " AND p.status=?"; args.append(status)
+            total = con.execute(
+                f"SELECT COUNT(*) FROM posts_fts JOIN posts p ON p.id=posts_fts.rowid WHERE {where}",
+                args).fetchone()[0]
+            rows = con.execute(
+                f"""SELECT p.*, highlight(posts_fts, 0, ?, ?) AS title_hl,
+                           snippet(posts_fts, 1, ?, ?, '…', 32) AS snippet_hl
+                    FROM posts_fts JOIN posts p ON p.id=posts_fts.rowid
+                    WHERE {where} ORDER BY bm25(posts_fts, 5.0, 1.0) LIMIT ? OFFSET ?""",
+                (_HL_OPEN, _HL_CLOSE, _HL_OPEN, _HL_CLOSE, *args, per_page, offset)).fetchall()
+        else:
+            terms = re.findall(r"\w+", q or "")[:12]
+            if not terms:
+                return [], 0
+            where = " AND ".join("(title LIKE ? OR body LIKE ?)" for _ in terms)
+            args = [x for t in terms for x in (f"%{t}%", f"%{t}%")]
+            if status:
+                where += " AND status=?"; args.append(status)
+            total = con.execute(f"SELECT COUNT(*) FROM posts WHERE {where}", args).fetchone()[0]
+            rows = con.execute(
+                f"""SELECT *, title AS title_hl, substr(body, 1, 240) AS snippet_hl
+                    FROM posts WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?""",
+                (*args, per_page, offset)).fetchall()
+        return rows, total
+    except sqlite3.OperationalError as e:
+        print("[SEARCH] requête invalide:", e)
+        return [], 0
+    finally:
+        con.close()
+
+def highlight_html(s: str) -> str:
+    return str(escape(s or "")).replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+def search_pager(endpoint, q, page, total, per_page=SEARCH_PER_PAGE):
+    last = max(1, (total + per_page - 1) // per_page)
+    links = []
+    if page > 1:
+        links.append(f"<a href='{url_for(endpoint, q=q, page=page - 1)}'>← Précédent</a>")
+    links.append(f"<small>Page {page}/{last} — {total} résultat(s)</small>")
+    if page < last:
+        links.append(f"<a href='{url_for(endpoint, q=q, page=page + 1)}'>Suivant →</a>")
+    return "<p>" + " · ".join(links) + "</p>"
+
+# ================== MAINTENANCE (archivage, images orphelines, VACUUM) ==================
+_MAINT_LOCK = threading.Lock()
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if abs(n) < 1024 or unit == "Go":
+            return f"{n:.0f} {unit}" if unit == "o" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def _db_size(con) -> int:
+    return con.execute("PRAGMA page_count").fetchone()[0] * con.execute("PRAGMA page_size").fetchone()[0]
+
+def archive_old_posts(con, days=ARCHIVE_AFTER_DAYS) -> int:
+    """Déplace les articles publiés plus vieux que `days` jours vers posts_archive (JSON zlib)."""
+    if days <= 0:
+        return 0
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    rows = con.execute("SELECT * FROM posts WHERE status='published' AND created_at < ?", (cutoff,)).fetchall()
+    now = datetime.now(timezone.utc).isoformat()
+    for r in rows:
+        data = zlib.compress(_json.dumps(dict(r), ensure_ascii=False).encode("utf-8"), 9)
+        con.execute("INSERT OR REPLACE INTO posts_archive(id, orig_link, source, created_at, archived_at, data) "
+                    "VALUES(?,?,?,?,?,?)", (r["id"], r["orig_link"], r["source"], r["created_at"], now, data))
+        con.execute("DELETE FROM posts WHERE id=?", (r["id"],))
+    mark_removed(con, [r["id"] for r in rows], "archive")
+    return len(rows)
+
+def gc_orphan_images(con, grace_s=3600):
+    """Supprime les JPEG de static/images non référencés par posts ni par posts_archive (l'image d'un article
+    archivé reste en place pour une restauration) ; fichiers récents épargnés (import en cours)."""
+    used = {os.path.basename(r["image_url"]) for r in
+            con.execute("SELECT image_url FROM posts WHERE image_url IS NOT NULL").fetchall()}
+    for (data,) in con.execute("SELECT data FROM posts_archive"):
+        try:
+            url = _json.loads(zlib.decompress(data)).get("image_url")
+        except (zlib.error, ValueError) as e:
+            print(f"[MAINT] archive illisible, nettoyage des images annulé: {e}")
+            return 0, 0
+        if url:
+            used.add(os.path.basename(url))
+    removed, freed = 0, 0
+    if not os.path.isdir(IMAGES_DIR):
+        return removed, freed
+    limit = time.time() - grace_s
+    for entry in os.scandir(IMAGES_DIR):
+        # variantes srcset <sha1>-<largeur>.jpg : gardées avec leur original
+        base = entry.name.split("-", 1)[0] + ".jpg" if "-" in entry.name else entry.name
+        if not entry.is_file() or base in used:
+            continue
+        try:
+            st = entry.stat()
+            if st.st_mtime > limit:
+                continue
+            os.remove(entry.path)
+            removed += 1; freed += st.st_size
+        except OSError as e:
+            print(f"[MAINT] suppression impossible {entry.path}: {e}")
+    return removed, freed
+
+def backfill_image_meta(limit=500) -> int:
+    """Dimensions / aperçu / variantes des images d'articles antérieurs aux métadonnées ; fragments recalculés.
+
+    Le calcul (cpu_call) se fait hors transaction ; chaque article est écrit et validé à part.
+    Fichier absent ou illisible : image_w=0, l'article n'est plus repris aux démarrages suivants."""
+    con = db()
+    try:
+        rows = con.execute("SELECT id, image_url FROM posts WHERE image_url IS NOT NULL AND image_w IS NULL "
+                           "ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        con.commit()
+        done, skipped = 0, 0
+        for r in rows:
+            path = r["image_url"].lstrip("/")
+            meta = None
+            if os.path.exists(path):
+                try:
+                    meta = cpu_call(cpuwork.describe_image, path)
+                except Exception as e:
+                    print(f"[IMG] métadonnées impossibles {path}: {e}")
+            if meta is None:
+                con.execute("UPDATE posts SET image_w=0 WHERE id=? AND image_url=? AND image_w IS NULL",
+                            (r["id"], r["image_url"]))
+                con.commit()
+                skipped += 1
+                continue
+            con.execute("UPDATE posts SET image_w=?, image_h=?, image_lqip=?, image_srcset=? "
+                        "WHERE id=? AND image_url=? AND image_w IS NULL",
+                        (meta["w"], meta["h"], meta["lqip"], meta["srcset"], r["id"], r["image_url"]))
+            refresh_fragments(con, r["id"])
+            con.commit()
+            done += 1
+    finally:
+        con.close()
+    if done or skipped:
+        print(f"[IMG] métadonnées ajoutées à {done} article(s), {skipped} image(s) absente(s) ou illisible(s)")
+    return done
+
+def run_maintenance():
+    """Archivage + ménage images + VACUUM incrémental/ANALYZE. Renvoie le message de résumé."""
+    if not _MAINT_LOCK.acquire(blocking=False):
+        return "Maintenance déjà en cours."
+    try:
+        con = db()
+        try:
+            before = _db_size(con)
+            archived = archive_old_posts(con)
+            con.execute("DELETE FROM outbound_queue WHERE status IN ('done','failed') AND created_at < ?",
+                        ((datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),))
+            con.execute("DELETE FROM post_tombstones WHERE removed_at < ?",
+                        (utc_iso(datetime.now(timezone.utc) - timedelta(days=API_TOMBSTONE_DAYS)),))
+            con.commit()
+            removed, img_freed = gc_orphan_images(con)
+            backfill_image_meta()
+            _cache_files, cache_freed = cache_evict()
+            if con.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # bascule unique en mode incrémental (nécessite un VACUUM complet)
+                con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                con.execute("VACUUM")
+            else:
+                con.execute("PRAGMA incremental_vacuum")
+            con.execute("ANALYZE")
+            con.commit()
+            db_freed = before - _db_size(con)
+        finally:
+            con.close()
+        msg = (f"Maintenance OK ({datetime.now(timezone.utc).isoformat(timespec='minutes')}): "
+               f"{archived} archivé(s), {removed} image(s) orpheline(s) supprimée(s), "
+               f"récupéré {_fmt_bytes(img_freed)} images + {_fmt_bytes(cache_freed)} cache pages "
+               f"+ {_fmt_bytes(max(0, db_freed))} base")
+        print("[MAINT]", msg)
+        set_setting("last_maintenance_result", msg)
+        return msg
+    finally:
+        _MAINT_LOCK.release()
+
+def maintenance_loop():
+    while True:
+        time.sleep(max(1, MAINTENANCE_INTERVAL_H) * 3600)
+        try:
+            run_maintenance()
+        except Exception as e:
+            msg = f"Erreur maintenance: {e}"
+            print("[MAINT] fatal:", msg)
+            set_setting("last_maintenance_result", msg)
+
+# ================== MÉTRIQUES (résumé admin) ==================
+def worker_metrics() -> dict:
+    """WEB_BACKGROUND=0 : dernier snapshot du worker (persisté à chaque signe de vie) → {"worker": snapshot}."""
+    if WEB_BACKGROUND:
+        return {}
+    try:
+        snap = _json.loads(get_setting("worker_metrics", "") or "{}")
+    except ValueError:
+        return {}
+    return {"worker": snap} if snap else {}
+
+def llm_usage_snapshot() -> dict:
+    """Tokens du jour / du dernier import : en mémoire, ou tels que persistés par le worker (WEB_BACKGROUND=0)."""
+    usage = llm.stats_snapshot()
+    if WEB_BACKGROUND:
+        return usage
+    try:
+        saved = _json.loads(get_setting("llm_usage", "") or "{}")
+    except ValueError:
+        return usage
+    return saved if saved.get("day_key") == usage["day_key"] and "run" in saved else usage
+
+def metrics_summary_html() -> str:
+    """Tableau des étapes (n, moyenne, p95, total) + raisons d'abandon ; vide si rien n'a été mesuré."""
+    if not metrics.ENABLED:
+        return ""
+    others = worker_metrics()
+    stages = metrics.stage_summary(others=others)
+    if not stages:
+        return ""
+    rows = "".join(f"<tr><td>{escape(r['key'])}</td><td>{r['n']}</td><td>{r['avg'] * 1000:.0f} ms</td>"
+                   f"<td>{r['p95'] * 1000:.0f} ms</td><td>{r['total']:.1f} s</td></tr>" for r in stages)
+    skips = ", ".join(f"{escape(k)} {v:g}"
+                      for k, v in metrics.counter_summary("import_skipped_total", "reason", others))
+    created = sum(v for _k, v in metrics.counter_summary("import_created_total", "source", others))
+    return (f"<details><summary>Temps par étape (depuis le démarrage) — {created:g} créé(s)"
+            f"{' • ignorés : ' + skips if skips else ''}</summary>"
+            f"<table><thead><tr><th>Étape</th><th>n</th><th>moy.</th><th>p95</th><th>total</th></tr></thead>"
+            f"<tbody>{rows}</tbody></table><small>Détail par source et par route : <code>/metrics</code></small></details>")
+
 # ================== UI ==================
 LAYOUT = """
 <!doctype html><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
@@ -1002,6 +2536,7 @@ LAYOUT = """
   <ul><li><strong>{{appname}}</strong></li></ul>
   <ul>
     <li><a href="{{ url_for('home') }}">Accueil</a></li>
+    <li><a href="{{ url_for('search') }}">Recherche</a></li>
     <li><a href="{{ url_for('rss_xml') }}" target="_blank">RSS</a></li>
     {% if session.get('ok') %}
       <li><a href="{{ url_for('admin') }}">Admin</a></li>
@@ -1025,39 +2560,214 @@ def page(body, title=""):
 def health():
     return "OK"
 
+@app.get("/metrics")
+def metrics_endpoint():
+    if METRICS_TOKEN:
+        auth = request.headers.get("Authorization", "")
+        if METRICS_TOKEN not in (request.args.get("token", ""), auth.removeprefix("Bearer ").strip()):
+            return Response("forbidden\n", 403, mimetype="text/plain")
+    return Response(metrics.render(worker_metrics()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 def home():
     con = db()
     try:
-        rows = con.execute("SELECT * FROM posts WHERE status='published' ORDER BY id DESC LIMIT 50").fetchall()
+        rows = con.execute("SELECT card_html FROM posts WHERE status='published' ORDER BY id DESC LIMIT 50").fetchall()
     finally:
         con.close()
     if not rows:
         return page("<h2>Dernières publications</h2><p>Aucune publication pour l’instant.</p>", "Publications")
-    cards = []
-    for r in rows:
-        img = f"<img src='{r['image_url']}' alt='' style='max-width:100%;height:auto'>" if r["image_url"] else ""
-        created = (r['created_at'] or '')[:16].replace('T',' ')
-        body_html = (r['body'] or '').replace("\n", "<br>")
-        cards.append(f"<article><header><h3>{r['title']}</h3><small>{created}</small></header>{img}<p>{body_html}</p></article>")
-    return page("<h2>Dernières publications</h2>" + "".join(cards), "Publications")
+    return page("<h2>Dernières publications</h2>" + "".join(r["card_html"] or "" for r in rows), "Publications")
+
+@app.get("/post/<int:post_id>")
+def post_view(post_id):
+    """Permalien des items du flux : colonnes utiles seulement (pas de fragments ni de texte source)."""
+    con = db()
+    try:
+        r = con.execute("SELECT id, title, body, created_at, image_url, image_w, image_h, image_lqip, image_srcset "
+                        "FROM posts WHERE id=? AND status='published'", (post_id,)).fetchone()
+    finally:
+        con.close()
+    if not r:
+        return page("<p>Article introuvable.</p>", "Introuvable"), 404
+    img = img_html(r, lazy=False)
+    created = (r['created_at'] or '')[:16].replace('T',' ')
+    return page(f"<article><header><h2>{escape(r['title'] or '')}</h2><small>{created}</small></header>"
+                f"{img}<p>{post_body_html(r['body'])}</p></article>", r["title"] or APP_NAME)
+
+# ---- Flux RSS : items pré-rendus, les plus récents d'abord ; ?since=<date ISO ou RFC 822>&limit=N → seulement
+# les articles mis en ligne après since, du plus ancien au plus récent ; s'il en reste, lien atom rel='next'
+# (since + after_id du dernier item) ; lastBuildDate / Last-Modified = dernier changement (If-Modified-Since → 304)
+RSS_LIMIT = 100
+RSS_MAX_LIMIT = 500
+
+def parse_since(value: str):
+    """?since= → published_at comparable (utc_iso), ou None si illisible."""
+    iso = utc_iso(value)
+    if iso is None:
+        try:
+            iso = utc_iso(parsedate_to_datetime(value).isoformat())
+        except (TypeError, ValueError):
+            return None
+    return iso
+
+def feed_last_change(con):
+    """Dernier changement visible du flux (mise en ligne, modification, retrait) → datetime UTC, ou None."""
+    r = con.execute("SELECT MAX(published_at) AS p, MAX(updated_at) AS u FROM posts WHERE status='published'").fetchone()
+    gone = con.execute("SELECT value FROM settings WHERE key='feed_changed_at'").fetchone()
+    stamps = [utc_iso(v) for v in (r["p"], r["u"], gone["value"] if gone else None) if v]
+    stamps = [v for v in stamps if v]
+    return datetime.fromisoformat(max(stamps)) if stamps else None
 
 @app.get("/rss.xml")
 def rss_xml():
+    since = request.args.get("since", "").strip()
+    since_iso = parse_since(since) if since else None
+    if since and not since_iso:
+        return Response("since : date ISO 8601 ou RFC 822 attendue\n", status=400, mimetype="text/plain")
+    limit = max(1, min(request.args.get("limit", RSS_LIMIT, type=int) or RSS_LIMIT, RSS_MAX_LIMIT))
+    after_id = request.args.get("after_id", type=int)
     con = db()
     try:
-        rows = con.execute("SELECT * FROM posts WHERE status='published' ORDER BY id DESC LIMIT 100").fetchall()
+        last = feed_last_change(con)
+        ims = request.if_modified_since
+        if last and ims and last.replace(microsecond=0) <= ims:
+            resp = Response(status=304)
+            resp.last_modified = last
+            return resp
+        if since_iso:
+            # croissant depuis since : un client qui reprend au dernier item reçu ne perd rien
+            cond, args = (("(published_at, id) > (?, ?)", (since_iso, after_id)) if after_id is not None
+                          else ("published_at > ?", (since_iso,)))
+            rows = con.execute(f"SELECT id, published_at, rss_item FROM posts WHERE status='published' AND {cond} "
+                               "ORDER BY published_at ASC, id ASC LIMIT ?", (*args, limit)).fetchall()
+        else:
+            rows = con.execute("SELECT rss_item FROM posts WHERE status='published' "
+                               "ORDER BY published_at DESC, id DESC LIMIT ?", (limit,)).fetchall()
     finally:
         con.close()
+    items = "".join(r["rss_item"] or "" for r in rows).replace(FRAG_ROOT, request.url_root.rstrip("/"))
+    root = site_root()
+    hub, topic = (websub_hub(), root + "/rss.xml") if root else ("", "")
+    links = (f"<atom:link rel='hub' href='{escape(hub)}'/><atom:link rel='self' href='{escape(topic)}'/>"
+             if hub else "")
+    nxt = (url_for("rss_xml", since=rows[-1]["published_at"], after_id=rows[-1]["id"], limit=limit, _external=True)
+           if since_iso and len(rows) == limit else "")
+    if nxt:
+        links += f"<atom:link rel='next' href='{escape(nxt)}'/>"
+    if last:
+        links += f"<lastBuildDate>{format_datetime(last, usegmt=True)}</lastBuildDate>"
+    rss = f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0' xmlns:atom='http://www.w3.org/2005/Atom'><channel><title>{APP_NAME} — Flux</title><link>{request.url_root}</link><description>Articles publiés</description>{links}{items}</channel></rss>"
+    resp = Response(rss, mimetype="application/rss+xml")
+    if last:
+        resp.last_modified = last
+    if hub or nxt:
+        resp.headers["Link"] = ", ".join(([f'<{hub}>; rel="hub"', f'<{topic}>; rel="self"'] if hub else [])
+                                         + ([f'<{nxt}>; rel="next"'] if nxt else []))
+    return resp
+
+# ---- API JSON (lecture seule, articles publiés)
+API_FIELDS = ("id", "title", "body", "excerpt", "created_at", "updated_at", "image_url", "source", "orig_link")
+API_DEFAULT_FIELDS = ("id", "title", "excerpt", "created_at", "updated_at", "image_url", "source")
+API_MAX_LIMIT = 100
+API_TOMBSTONE_DAYS = 90      # retraits conservés pour la synchro ; curseur plus ancien → resync complète
+
+@app.get("/api/posts")
+def api_posts():
+    """
+    Pagination par curseur :
+    - before_id=N → articles d'id < N, du plus récent au plus ancien (défaut : depuis le plus récent)
+    - since_id=N  → articles d'id > N, du plus ancien au plus récent
+    - updated_since=ISO[&after_id=N] → articles modifiés après (updated_at, id) (tri updated_at, id) —
+      synchro incrémentale ; "deleted" : ids sortis de la publication depuis updated_since (dépubliés,
+      planifiés, supprimés, archivés) ; "resync": true si le curseur dépasse API_TOMBSTONE_DAYS
+    - fields=id,title,... (body seulement si demandé) • limit ≤ 100 • ETag / If-None-Match
+    """
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()] or list(API_DEFAULT_FIELDS)
+    bad = [f for f in fields if f not in API_FIELDS]
+    if bad:
+        return {"error": f"champs inconnus: {', '.join(bad)}", "allowed": list(API_FIELDS)}, 400
+    cols = list(dict.fromkeys(["id", "updated_at", *fields]))
+    limit = min(API_MAX_LIMIT, max(1, request.args.get("limit", 20, type=int) or 20))
+    since_id = request.args.get("since_id", type=int)
+    before_id = request.args.get("before_id", type=int)
+    updated_since = request.args.get("updated_since", "").strip()
+    after_id = request.args.get("after_id", type=int)
+    if updated_since:
+        updated_since = utc_iso(updated_since)
+        if not updated_since:
+            return {"error": "updated_since : date ISO 8601 attendue"}, 400
+
+    where, args = ["status='published'"], []
+    if updated_since:
+        if after_id is not None:
+            where.append("(updated_at, id) > (?, ?)"); args += [updated_since, after_id]
+        else:
+            where.append("updated_at > ?"); args.append(updated_since)
+        order = "updated_at ASC, id ASC"
+    elif since_id is not None:
+        where.append("id > ?"); args.append(since_id)
+        order = "id ASC"
+    else:
+        if before_id is not None:
+            where.append("id < ?"); args.append(before_id)
+        order = "id DESC"
+    con = db()
+    try:
+        rows = con.execute(f"SELECT {', '.join(cols)} FROM posts WHERE {' AND '.join(where)} "
+                           f"ORDER BY {order} LIMIT ?", (*args, limit)).fetchall()
+        # >= : un retrait horodaté à la seconde du curseur n'est jamais perdu (ids redonnés : sans effet)
+        deleted = [r["id"] for r in con.execute(
+            "SELECT id FROM post_tombstones WHERE removed_at >= ? ORDER BY id", (updated_since,)).fetchall()
+        ] if updated_since else None
+    finally:
+        con.close()
+
+    root = request.url_root.rstrip("/")
     items = []
     for r in rows:
-        title = (r["title"] or "").replace("&","&amp;")
-        desc  = (r["body"] or "").replace("&","&amp;")
-        enclosure = f"<enclosure url='{request.url_root.rstrip('/') + r['image_url']}' type='image/jpeg'/>" if r["image_url"] else ""
-        pub   = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S %z')
-        items.append(f"<item><title>{title}</title><link>{request.url_root}</link><guid isPermaLink='false'>{r['id']}</guid><description><![CDATA[{desc}]]></description>{enclosure}<pubDate>{pub}</pubDate></item>")
-    rss = f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel><title>{APP_NAME} — Flux</title><link>{request.url_root}</link><description>Articles publiés</description>{''.join(items)}</channel></rss>"
-    return Response(rss, mimetype="application/rss+xml")
+        it = {f: r[f] for f in fields}
+        if it.get("image_url"):
+            it["image_url"] = root + it["image_url"]
+        items.append(it)
+    cursor = {}
+    if rows:
+        if updated_since:
+            cursor["updated_since"], cursor["after_id"] = rows[-1]["updated_at"] or "", rows[-1]["id"]
+        elif since_id is not None:
+            cursor["since_id"] = rows[-1]["id"]
+        else:
+            cursor["before_id"] = rows[-1]["id"]
+    elif updated_since:
+        cursor = {"updated_since": updated_since, **({"after_id": after_id} if after_id is not None else {})}
+    body = {"items": items, "next": cursor if len(rows) == limit else None, "resume": cursor or None}
+    if updated_since:
+        body["deleted"] = deleted
+        body["resync"] = updated_since < utc_iso(datetime.now(timezone.utc) - timedelta(days=API_TOMBSTONE_DAYS))
+    payload = _json.dumps(body, ensure_ascii=False)
+    etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+    if etag in [t.strip() for t in request.headers.get("If-None-Match", "").split(",")]:
+        return Response(status=304, headers={"ETag": etag})
+    return Response(payload, mimetype="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.get("/search")
+def search():
+    q = request.args.get("q", "").strip()
+    page_no = max(1, request.args.get("page", 1, type=int) or 1)
+    form = f"""<form method="get" action="{url_for('search')}" role="search">
+      <input type="search" name="q" value="{escape(q)}" placeholder="Rechercher un article…">
+      <button>Rechercher</button></form>"""
+    if not q:
+        return page("<h2>Recherche</h2>" + form, "Recherche")
+    rows, total = search_posts(q, status="published", page=page_no)
+    if not rows:
+        return page(f"<h2>Recherche</h2>{form}<p>Aucun résultat pour « {escape(q)} ».</p>", "Recherche")
+    cards = []
+    for r in rows:
+        created = (r['created_at'] or '')[:16].replace('T',' ')
+        cards.append(f"<article><header><h3>{highlight_html(r['title_hl'])}</h3><small>{created}</small></header>"
+                     f"<p>{highlight_html(r['snippet_hl'])}</p></article>")
+    return page("<h2>Recherche</h2>" + form + "".join(cards) + search_pager("search", q, page_no, total), "Recherche")
 
 @app.route("/admin", methods=["GET","POST"])
 def admin():
@@ -1078,6 +2788,23 @@ def admin():
     default_image = get_setting("default_image_url", "").strip()
     scrapers_json_txt = get_setting("scrapers_json", _json.dumps(DEFAULT_SCRAPERS, ensure_ascii=False, indent=2))
     last_result = get_setting("last_import_result", "").strip()
+    last_maint = get_setting("last_maintenance_result", "").strip()
+    cstats = cache_stats()
+    armed = profiler.ARMED
+    profile_state = ("Armé : prochain import" if armed["import"] else
+                     f"Armé : {armed['remaining']} requête(s) {escape(armed['route'])}" if armed["route"] else
+                     "Profileur inactif")
+    profile_list = "".join(
+        f"<p><small>{c} — " + " • ".join(f"<a href='{url_for('profile_file', capture=c, fname=f)}'>{f}</a>"
+                                         for f in profiler.ARTEFACTS) + "</small></p>"
+        for c in profiler.list_captures())
+    llm_summary = llm_stats_summary()
+    usage = llm_usage_snapshot()
+    if usage["day"]["calls"]:
+        llm_summary += (f"<br>Tokens IA aujourd'hui : {llm.format_stats(usage['day'])}"
+                        f"<br>Dernier import : {llm.format_stats(usage['run'])}")
+    q = request.args.get("q", "").strip()
+    page_no = max(1, request.args.get("page", 1, type=int) or 1)
 
     con = db()
     try:
@@ -1094,8 +2821,9 @@ def admin():
                       if published else
                       "<button name='action' value='publish' class='secondary'>✅ Publier maintenant</button>")
         return f"""
-        <details>
-          <summary><b>{r['title'] or '(Sans titre)'}</b> — <small>{r['status']}</small></summary>
+        <details id="post-{r['id']}">
+          <summary><input type="checkbox" name="ids" value="{r['id']}" form="bulk" aria-label="Sélectionner">
+            <b>{r['title'] or '(Sans titre)'}</b> — <small class="status">{r['status']}</small></summary>
           {img}
           <form method="post" action="{url_for('save', post_id=r['id'])}">
             <label>Titre<input name="title" value="{(r['title'] or '').replace('"','&quot;')}"></label>
@@ -1114,9 +2842,24 @@ def admin():
           </form>
         </details>"""
 
+    search_html = f"""
+    <form method="get" action="{url_for('admin')}" role="search">
+      <input type="search" name="q" value="{escape(q)}" placeholder="Rechercher (titre, contenu)…">
+      <button>🔎 Rechercher</button>
+    </form>"""
+    if q:
+        found, total = search_posts(q, page=page_no)
+        search_html += "<h4>Résultats</h4>" + (
+            "".join(f"<p><small>{highlight_html(r['snippet_hl'])}</small></p>" + card(r, r["status"] == "published")
+                    for r in found) or "<p>Aucun résultat.</p>")
+        search_html += search_pager("admin", q, page_no, total)
+
     body = f"""
+    {search_html}
     <h3>Paramètres</h3>
     {f"<p><mark>{last_result}</mark></p>" if last_result else ""}
+    {f"<p><small>{llm_summary}</small></p>" if llm_summary else ""}
+    {metrics_summary_html()}
     <article>
       <form method="post" action="{url_for('save_settings')}">
         <div class="grid">
@@ -1133,7 +2876,22 @@ def admin():
         <label>Sources RSS (une URL par ligne)
           <textarea name="feeds" rows="5">{feeds}</textarea>
         </label>
-        <label>Scrapers de sites (JSON)</label>
+        <div class="grid">
+          <label>URL publique du site <small>(topic WebSub et liens des webhooks ; défaut PUBLIC_URL)</small>
+            <input name="site_url" placeholder="https://armenian-console.onrender.com" value="{escape(site_root())}">
+          </label>
+          <label>Hub WebSub <small>(annoncé dans /rss.xml, notifié à chaque publication)</small>
+            <input name="websub_hub" placeholder="https://pubsubhubbub.appspot.com/" value="{escape(websub_hub())}">
+          </label>
+          <label>Webhooks à la publication (une URL par ligne)
+            <textarea name="webhook_urls" rows="2">{escape(get_setting("webhook_urls", ""))}</textarea>
+          </label>
+        </div>
+        <small>File sortante : {", ".join(f"{k} {v}" for k, v in outbound_status().items()) or "vide"}
+          {"" if site_root() else " • URL publique non configurée : ni hub annoncé ni notification"}</small>
+        <label>Scrapers de sites (JSON) <small>— <code>index_url</code> + <code>link_selector</code>, ou
+          <code>sitemap_url</code> (sitemap Google News ou index de sitemaps, filtré par <code>max_age_hours</code>, défaut 48) ;
+          <code>stop_after</code> (ex. <code>&lt;/article&gt;</code>) arrête la lecture des pages après ce marqueur</small></label>
         <textarea name="scrapers_json" rows="18" style="font-family:monospace">{scrapers_json_txt}</textarea>
         <button>💾 Enregistrer les paramètres</button>
       </form>
@@ -1141,9 +2899,82 @@ def admin():
       <form method="post" action="{url_for('import_now')}" style="margin-top:1rem">
         <button type="submit">🔁 Importer maintenant (RSS + Scraping)</button>
       </form>
-      <p><small>Import automatique toutes les {IMPORT_INTERVAL_MIN} min. • Cron HTTP: <code>{request.url_root}cron/import</code></small></p>
+      <p><small>Import automatique toutes les {IMPORT_INTERVAL_MIN} min. • Cron HTTP: <code>{request.url_root}cron/import</code>
+        {worker_status_html()}</small></p>
+
+      <form method="post" action="{url_for('backfill_now')}">
+        <label>Rattrapage par batch (flux RSS, nom de scraper, ou URLs d'articles une par ligne)
+          <textarea name="source" rows="2" placeholder="https://hetq.am/hy/rss"></textarea>
+        </label>
+        <div class="grid">
+          <input type="number" name="limit" value="100" min="1" max="1000">
+          <button type="submit" class="secondary">📦 Mettre en file + envoyer</button>
+          <button type="submit" name="poll" value="1" class="secondary">🔄 Vérifier les batchs</button>
+        </div>
+        <small>File : {", ".join(f"{k} {v}" for k, v in backfill_status().items()) or "vide"}</small>
+      </form>
+
+      <form method="post" action="{url_for('maintenance_now')}">
+        <button type="submit" class="secondary">🧹 Maintenance (archivage &gt; {ARCHIVE_AFTER_DAYS} j, images orphelines, VACUUM)</button>
+      </form>
+      {f"<p><small>{last_maint}</small></p>" if last_maint else ""}
+      <form method="get" action="{url_for('reextract')}" target="_blank">
+        <div class="grid">
+          <input name="scraper" placeholder="scraper (vide = tout le cache)">
+          <button type="submit" class="secondary">🔁 Ré-extraire depuis le cache</button>
+        </div>
+        <small>Cache pages : {cstats["urls"]} URL(s), {cstats["blobs"]} contenu(s), {_fmt_bytes(cstats["size"])} / {PAGE_CACHE_MAX_MB} Mo</small>
+      </form>
+    </article>
+
+    <article>
+      <form method="post" action="{url_for('profile_arm')}">
+        <div class="grid">
+          <select name="target">
+            <option value="import">Prochain import</option>
+            {"".join(f"<option>{escape(r)}</option>" for r in sorted({r.rule for r in app.url_map.iter_rules()}))}
+          </select>
+          <input type="number" name="n" value="20" min="1" max="1000" title="requêtes">
+          <button type="submit" class="secondary">🔬 Armer le profileur</button>
+          <button type="submit" name="disarm" value="1" class="secondary">Désarmer</button>
+        </div>
+        <small>{profile_state}</small>
+      </form>
+      {profile_list}
     </article>
 
+    <form id="bulk" method="post" action="{url_for('bulk')}">
+      <div class="grid">
+        <select name="action" aria-label="Action groupée">
+          <option value="publish">✅ Publier la sélection</option>
+          <option value="unpublish">⏸️ Dépublier la sélection</option>
+          <option value="schedule">🕒 Planifier la sélection</option>
+          <option value="delete">🗑️ Supprimer la sélection</option>
+        </select>
+        <input type="datetime-local" name="publish_at" aria-label="Publier à (UTC)">
+        <button type="submit" class="secondary">Appliquer aux articles cochés</button>
+      </div>
+      <small id="bulk-result"></small>
+    </form>
+    <script>
+    document.getElementById("bulk").addEventListener("submit", async (ev) => {{
+      ev.preventDefault();
+      const form = ev.target, out = document.getElementById("bulk-result");
+      const res = await (await fetch(form.action, {{method: "POST", body: new FormData(form)}})).json();
+      if (res.error) {{ out.textContent = "⚠️ " + res.error; return; }}
+      const status = {{publish: "published", unpublish: "draft", schedule: "scheduled"}}[res.action];
+      for (const id of res.done) {{
+        const el = document.getElementById("post-" + id);
+        if (!el) continue;
+        if (res.action === "delete") {{ el.remove(); continue; }}
+        el.querySelector(".status").textContent = status;
+        el.querySelector("input[name=ids]").checked = false;
+      }}
+      const skipped = Object.entries(res.skipped).map(([id, why]) => "#" + id + " " + why);
+      out.textContent = res.done.length + " article(s) traité(s)" + (skipped.length ? " — ignorés : " + skipped.join(", ") : "");
+    }});
+    </script>
+
     <h4>Brouillons</h4>{''.join(card(r) for r in drafts) or "<p>Aucun brouillon.</p>"}
     <h4>Planifiés</h4>{''.join(card(r) for r in scheduled) or "<p>Aucun article planifié.</p>"}
     <h4>Publiés</h4>{''.join(card(r, True) for r in pubs) or "<p>Rien de publié.</p>"}
@@ -1158,11 +2989,23 @@ def save_settings():
     set_setting("openai_model", request.form.get("openai_model","").strip())
     set_setting("feeds", request.form.get("feeds",""))
     set_setting("default_image_url", request.form.get("default_image_url","").strip())
+    set_setting("websub_hub", request.form.get("websub_hub","").strip())
+    site_url = request.form.get("site_url","").strip().rstrip("/")
+    if site_url and not re.match(r"https?://[^/\s]+$", site_url):
+        flash("URL publique ignorée : attendu https://domaine (sans chemin).")
+    else:
+        set_setting("site_url", site_url)
+    set_setting("webhook_urls", request.form.get("webhook_urls","").strip())
     scrapers_txt = request.form.get("scrapers_json","").strip()
     try:
-        _json.loads(scrapers_txt or "[]")
+        compiled, errors = compile_scrapers(_json.loads(scrapers_txt or "[]"))
+        if errors:
+            raise ValueError(" ; ".join(errors))
         set_setting("scrapers_json", scrapers_txt or "[]")
+        _SCRAPERS_CACHE.update(src=scrapers_txt or "[]", compiled=compiled, errors=[])
         flash("Paramètres enregistrés.")
+        for w in validate_scrapers_on_samples(compiled):
+            flash(f"⚠️ Sélecteur à vérifier — {w}")
     except Exception as e:
         flash(f"Config sites JSON invalide : {e}")
     return redirect(url_for("admin"))
@@ -1178,8 +3021,66 @@ def import_now():
             msg = f"Erreur : {e}\n{traceback.format_exc()}"
             print("[IMPORT WORKER] fatal:", msg)
             set_setting("last_import_result", msg)
-    threading.Thread(target=worker, daemon=True).start()
-    flash("Import lancé en arrière-plan. Recharge l’admin dans ~1 minute pour voir le résultat.")
+    flash("Import " + run_in_background("import", None, worker) +
+          ". Recharge l’admin dans ~1 minute pour voir le résultat.")
+    return redirect(url_for("admin"))
+
+@app.post("/backfill-now")
+def backfill_now():
+    if not session.get("ok"): return redirect(url_for("admin"))
+    source = request.form.get("source", "")
+    limit = max(1, min(1000, request.form.get("limit", 100, type=int) or 100))
+    poll = bool(request.form.get("poll"))
+    def worker():
+        run_backfill(source, limit, poll)
+    flash("Rattrapage " + run_in_background("backfill", {"source": source, "limit": limit, "poll": poll}, worker) + ".")
+    return redirect(url_for("admin"))
+
+@app.get("/reextract")
+def reextract():
+    if not session.get("ok"): return redirect(url_for("admin"))
+    report = reextract_cached(request.args.get("scraper", "").strip(),
+                              max(1, min(5000, request.args.get("limit", 500, type=int) or 500)))
+    return Response(report, mimetype="text/plain; charset=utf-8")
+
+@app.post("/profile-arm")
+def profile_arm():
+    if not session.get("ok"): return redirect(url_for("admin"))
+    target = request.form.get("target", "")
+    if request.form.get("disarm"):
+        profiler.disarm()
+        flash("Profilage désarmé.")
+    elif target == "import" and not WEB_BACKGROUND:
+        enqueue_task("profile_import")     # l'import tourne dans le worker : captures sous son PROFILE_DIR
+        flash("Profilage demandé au worker pour son prochain import.")
+    elif target == "import":
+        profiler.arm_import()
+        flash("Profilage armé pour le prochain import.")
+    elif target in {r.rule for r in app.url_map.iter_rules()}:
+        n = max(1, min(1000, request.form.get("n", 20, type=int) or 20))
+        profiler.arm_requests(target, n)
+        flash(f"Profilage armé pour les {n} prochaines requêtes {target}.")
+    return redirect(url_for("admin"))
+
+@app.get("/profiles/<capture>/<fname>")
+def profile_file(capture, fname):
+    if not session.get("ok"): return redirect(url_for("admin"))
+    path = profiler.artefact_path(capture, fname)
+    if not path:
+        return "introuvable", 404
+    return send_file(os.path.abspath(path), as_attachment=fname.endswith(".pstats"),
+                     mimetype="application/octet-stream" if fname.endswith(".pstats") else "text/plain")
+
+@app.post("/maintenance-now")
+def maintenance_now():
+    if not session.get("ok"): return redirect(url_for("admin"))
+    def worker():
+        try:
+            run_maintenance()
+        except Exception as e:
+            set_setting("last_maintenance_result", f"Erreur maintenance: {e}")
+            traceback.print_exc()
+    flash("Maintenance " + run_in_background("maintenance", None, worker) + ".")
     return redirect(url_for("admin"))
 
 @app.get("/import-now")
@@ -1189,6 +3090,8 @@ def import_now_get():
 
 @app.get("/cron/import")
 def cron_import():
+    if not WEB_BACKGROUND:
+        return f"Import confié au worker (tâche #{enqueue_task('import')})\n", 202, {"Content-Type": "text/plain; charset=utf-8"}
     c, s, msg = run_import_once()
     return f"{msg}\n", 200, {"Content-Type": "text/plain; charset=utf-8"}
 
@@ -1196,51 +3099,149 @@ def cron_import():
 def save(post_id):
     if not session.get("ok"): return redirect(url_for("admin"))
     action     = request.form.get("action","save")
-    title      = strip_tags(request.form.get("title","").strip())
-    body       = strip_tags(request.form.get("body","").strip())
+    title_in   = request.form.get("title","").strip()
+    body_in    = request.form.get("body","").replace("\r\n", "\n").strip()
     publish_at = request.form.get("publish_at","").strip()
 
-    if body:
-        body = " ".join(_tokenize_words(body))
-        if _word_count(body) > TARGET_MAX_WORDS:
-            body = " ".join(_tokenize_words(body)[:TARGET_MAX_WORDS])
-        body = ensure_min_words(body, body, TARGET_MIN_WORDS)
-        body = clean_body_text(body)
-
-    title = normalize_title(title)
-
+    sched = ()      # () = échéance inchangée ; (publish_at|None,) = à (re)planifier / annuler
+    published = False
     con = db()
     try:
-        con.execute("UPDATE posts SET title=?, body=?, updated_at=? WHERE id=?",
-                    (title, body, datetime.now(timezone.utc).isoformat(timespec="minutes"), post_id))
+        cur = con.execute("SELECT title, body, status FROM posts WHERE id=?", (post_id,)).fetchone()
+        # tombstone / feed_changed_at seulement si l'article était en ligne (brouillon jamais diffusé)
+        was_published = cur is not None and cur["status"] == "published"
+        # champs non modifiés dans le formulaire : ni re-normalisation ni recalcul des fragments
+        edited = cur is None or title_in != (cur["title"] or "").strip() or body_in != (cur["body"] or "").strip()
+        if edited:
+            title = normalize_title(strip_tags(title_in))
+            body = strip_tags(body_in)
+            if body:
+                body = normalize_edited_body(body)
+            con.execute("UPDATE posts SET title=?, body=?, updated_at=? WHERE id=?",
+                        (title, body, now_iso(), post_id))
+            refresh_fragments(con, post_id)
+        else:
+            con.execute("UPDATE posts SET updated_at=? WHERE id=?", (now_iso(), post_id))
         if action == "publish":
             row = con.execute("SELECT image_url FROM posts WHERE id=?", (post_id,)).fetchone()
             if REQUIRE_IMAGE and (not row or not row["image_url"]):
                 flash("Publication refusée : une image est obligatoire.")
             else:
                 con.execute("UPDATE posts SET status='published', publish_at=NULL WHERE id=?", (post_id,))
+                mark_published(con, [post_id])
+                sched = (None,)
+                published = True
                 flash("Publié immédiatement.")
         elif action == "unpublish":
             con.execute("UPDATE posts SET status='draft', publish_at=NULL WHERE id=?", (post_id,))
+            if was_published:
+                mark_removed(con, [post_id], "unpublish")
+            sched = (None,)
             flash("Dépublié.")
         elif action == "schedule":
             if not publish_at:
                 flash("Choisis une date/heure (UTC) pour planifier.")
             else:
-                iso_utc = publish_at if len(publish_at) == 16 else publish_at[:16]
-                iso_utc += ":00+00:00" if len(iso_utc) == 16 else ""
+                iso_utc = publish_at_utc(publish_at)
                 con.execute("UPDATE posts SET status='scheduled', publish_at=? WHERE id=?", (iso_utc, post_id))
+                if was_published:
+                    mark_removed(con, [post_id], "schedule")
+                sched = (iso_utc,)
                 flash(f"Planifié pour {iso_utc} (UTC).")
         elif action == "delete":
             con.execute("DELETE FROM posts WHERE id=?", (post_id,))
+            if was_published:
+                mark_removed(con, [post_id], "delete")
+            sched = (None,)
             flash("Supprimé.")
         else:
             flash("Enregistré.")
         con.commit()
     finally:
         con.close()
+    if sched:
+        schedule_wakeup(post_id, *sched)
+    if published:
+        notify_published([post_id])
     return redirect(url_for("admin"))
 
+def publish_at_utc(value: str) -> str:
+    """Valeur d'un champ datetime-local (UTC) → ISO avec fuseau, comme stocké dans publish_at."""
+    iso_utc = value if len(value) == 16 else value[:16]
+    return iso_utc + (":00+00:00" if len(iso_utc) == 16 else "")
+
+# ---- Actions groupées (sélection multiple dans /admin) : une seule transaction, sans re-normaliser
+# titre/corps ; fragments recalculés à la publication seulement (pubDate = published_at, via mark_published).
+BULK_ACTIONS = ("publish", "unpublish", "schedule", "delete")
+
+def apply_bulk(action: str, ids, publish_at=None):
+    """Applique action aux articles ids ; renvoie (ids traités, {id: raison} des ignorés)."""
+    ids = sorted(set(ids))
+    if not ids:
+        return [], {}
+    now = now_iso()
+    marks = ",".join("?" * len(ids))
+    con = db()
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        rows = {r["id"]: r for r in con.execute(
+            f"SELECT id, status, image_url FROM posts WHERE id IN ({marks})", ids).fetchall()}
+        skipped = {i: "introuvable" for i in ids if i not in rows}
+        for r in rows.values():
+            if action == "publish" and r["status"] == "published":
+                skipped[r["id"]] = "déjà publié"
+            elif action == "publish" and REQUIRE_IMAGE and not r["image_url"]:
+                skipped[r["id"]] = "image obligatoire"
+            elif action == "unpublish" and r["status"] == "draft":
+                skipped[r["id"]] = "déjà brouillon"
+        done = [i for i in ids if i not in skipped]
+        if done:
+            dm = ",".join("?" * len(done))
+            if action == "delete":
+                con.execute(f"DELETE FROM posts WHERE id IN ({dm})", done)
+            else:
+                status = {"publish": "published", "unpublish": "draft", "schedule": "scheduled"}[action]
+                con.execute(f"UPDATE posts SET status=?, publish_at=?, updated_at=? WHERE id IN ({dm})",
+                            (status, publish_at if action == "schedule" else None, now, *done))
+            if action == "publish":
+                mark_published(con, done)
+            else:
+                removed = [i for i in done if rows[i]["status"] == "published"]
+                if removed:
+                    mark_removed(con, removed, action)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    finally:
+        con.close()
+    for i in done:
+        schedule_wakeup(i, publish_at if action == "schedule" else None)
+    if action == "publish":
+        notify_published(done)
+    return done, skipped
+
+@app.post("/bulk")
+def bulk():
+    """Réponse JSON courte {action, done, skipped, error} au lieu d'un nouveau rendu de /admin."""
+    if not session.get("ok"):
+        return {"error": "non connecté"}, 403
+    action = request.form.get("action", "")
+    ids = [int(x) for x in request.form.getlist("ids") if x.isdigit()]
+    publish_at = request.form.get("publish_at", "").strip()
+    if action not in BULK_ACTIONS:
+        return {"error": f"action inconnue: {action}"}, 400
+    if not ids:
+        return {"error": "aucun article sélectionné"}, 400
+    if action == "schedule" and not publish_at:
+        return {"error": "date/heure (UTC) requise pour planifier"}, 400
+    try:
+        done, skipped = apply_bulk(action, ids, publish_at_utc(publish_at) if action == "schedule" else None)
+    except sqlite3.Error as e:
+        return {"error": f"base : {e}"}, 500
+    print(f"[BULK] {action}: {len(done)} ok, {len(skipped)} ignoré(s)")
+    return {"action": action, "done": done, "skipped": {str(k): v for k, v in skipped.items()}}
+
 @app.get("/logout")
 def logout():
     session.clear(); return redirect(url_for("home"))
@@ -1250,16 +3251,28 @@ def alias_console():
     return redirect(url_for("admin"))
 
 # --------- boot ---------
-init_db()
-bootstrap_openai_key()
-# Import immédiat au démarrage
-try:
-    run_import_once()
-except Exception as e:
-    print("[BOOT] import initial failed:", e)
-
-threading.Thread(target=publish_due_loop, daemon=True).start()
-threading.Thread(target=import_loop, daemon=True).start()
+def start_background():
+    """Import immédiat puis boucles de fond : scheduler, import, maintenance, rattrapage, diffusion."""
+    try:
+        run_import_once()
+    except Exception as e:
+        print("[BOOT] import initial failed:", e)
+
+    threading.Thread(target=publish_due_loop, daemon=True).start()
+    threading.Thread(target=import_loop, daemon=True).start()
+    threading.Thread(target=maintenance_loop, daemon=True).start()
+    threading.Thread(target=backfill_loop, daemon=True).start()
+    threading.Thread(target=outbound_loop, daemon=True).start()
+    threading.Thread(target=backfill_image_meta, daemon=True).start()    # articles d'avant les métadonnées
+
+# Pas de démarrage dans les workers CPU : le module principal (app.py, worker.py) y est ré-importé
+# (forkserver) ; ils n'ont besoin que de cpuwork.
+if multiprocessing.parent_process() is None:
+    init_db()
+    bootstrap_openai_key()
+    restore_llm_usage()
+    if WEB_BACKGROUND:
+        start_background()
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,135 @@
+# bench_import.py — Débit de run_import_once hors ligne : flux/pages/images rejoués + faux OpenAI.
+# Usage:
+#   python bench/bench_import.py --synthetic 40 [--latency 0.4] [--rounds 3] [--out res.json] [--compare old.json]
+#   python bench/bench_import.py --fixtures DIR              (fixtures enregistrées, voir --record)
+#   python bench/bench_import.py --record DIR --from-db /chemin/site.db
+# Mesures : articles/min, p50/p95 par étape (fetch flux/page, nettoyage, extraction, réécriture, appel LLM,
+# image, insertion), pic RSS. Chaque lancement tourne dans un répertoire temporaire (site.db et images neufs).
+
+import argparse, json, os, resource, shutil, subprocess, sys, tempfile, time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+import openai_stub, replay  # noqa: E402
+
+# (objet, attribut, étape) — fonctions chronométrées pendant l'import
+STAGES = [
+    ("app", "fetch_xml", "fetch_feed"),
+    ("app", "http_get", "fetch_page"),
+    ("app", "extract_page", "extract_page"),      # nettoyage + extraction (cpuwork, éventuellement en pool)
+    ("app", "rewrite_article_fr", "rewrite"),
+    ("llm", "chat", "llm_call"),
+    ("app", "download_image", "image"),
+    ("app", "write_batch", "db_batch"),           # une transaction par lot (source)
+]
+
+def pct(samples, p):
+    if not samples: return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+def instrument(mods, timings):
+    def wrap(fn, stage):
+        def timed(*a, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                timings[stage].append(time.perf_counter() - t0)
+        return timed
+    for mod, attr, stage in STAGES:
+        setattr(mods[mod], attr, wrap(getattr(mods[mod], attr), stage))
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+def run(fixtures, args):
+    workdir = tempfile.mkdtemp(prefix="bench-import-")
+    os.chdir(workdir)
+    fx_srv, fx_url = replay.serve(fixtures, latency=args.net_latency)
+    ai_srv = openai_stub.serve(0, args.latency, 1.0)
+    os.environ.update(OPENAI_API_BASE=f"http://127.0.0.1:{ai_srv.server_address[1]}/v1",
+                      HTTP_PROXY=fx_url, http_proxy=fx_url, NO_PROXY="127.0.0.1,localhost",
+                      no_proxy="127.0.0.1,localhost", WEB_BACKGROUND="0")
+    import app, llm     # sans boucles de fond : seul run_import_once ci-dessous importe
+    app.set_setting("openai_key", "bench")
+    app.set_setting("default_image_url", "http://img.bench.am/default.jpg")
+    app.set_setting("feeds", "\n".join(fixtures.feeds))
+    app.set_setting("scrapers_json", json.dumps(fixtures.scrapers, ensure_ascii=False))
+    app._OPENAI_CACHE.update(key=None, model=None)
+
+    timings = defaultdict(list)
+    instrument({"app": app, "llm": llm}, timings)
+    rounds = []
+    for i in range(args.rounds):
+        con = app.db()
+        con.execute("DELETE FROM posts"); con.commit(); con.close()
+        shutil.rmtree(os.path.join(workdir, "static"), ignore_errors=True)
+        t0 = time.perf_counter()
+        created, skipped, _msg = app.run_import_once()
+        wall = time.perf_counter() - t0
+        rounds.append({"created": created, "skipped": skipped, "wall_s": round(wall, 3),
+                       "articles_per_min": round(created / wall * 60, 1) if wall else 0.0})
+        print(f"tour {i + 1}: {created} créés, {skipped} ignorés en {wall:.2f}s "
+              f"→ {rounds[-1]['articles_per_min']} articles/min")
+    fx_srv.shutdown(); ai_srv.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    stages = {st: {"n": len(v), "p50_ms": round(pct(v, 50) * 1000, 2), "p95_ms": round(pct(v, 95) * 1000, 2),
+                   "total_s": round(sum(v), 3)} for st, v in timings.items()}
+    apm = sorted(r["articles_per_min"] for r in rounds)
+    return {"rev": git_rev(), "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "rounds": rounds, "articles_per_min": apm[len(apm) // 2],
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "stages": stages}
+
+def report(res, old=None):
+    def delta(new, before):
+        return f" ({(new - before) / before * 100:+.0f}%)" if before else ""
+    o = old or {}
+    print(f"\n[{res['rev']}] articles/min (médiane): {res['articles_per_min']}"
+          f"{delta(res['articles_per_min'], o.get('articles_per_min'))} — pic RSS {res['peak_rss_mb']} Mo"
+          f"{delta(res['peak_rss_mb'], o.get('peak_rss_mb'))}")
+    print(f"{'étape':<14}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for st, v in res["stages"].items():
+        before = (o.get("stages") or {}).get(st, {})
+        print(f"{st:<14}{v['n']:>6}{v['p50_ms']:>10}{v['p95_ms']:>10}{v['total_s']:>10}"
+              f"{delta(v['p95_ms'], before.get('p95_ms'))}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--synthetic", type=int, default=40, help="nombre d'articles générés (défaut)")
+    src.add_argument("--fixtures", help="répertoire de fixtures enregistrées")
+    src.add_argument("--record", help="exporte le cache de pages de --from-db vers ce répertoire")
+    ap.add_argument("--from-db", default=os.path.join(ROOT, "site.db"))
+    ap.add_argument("--latency", type=float, default=0.4, help="latence du faux chat/completions (s)")
+    ap.add_argument("--net-latency", type=float, default=0.02, help="latence par requête HTTP rejouée (s)")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="écrit les résultats JSON (comparables entre commits)")
+    ap.add_argument("--compare", help="résultats JSON précédents à comparer")
+    args = ap.parse_args()
+    args.out, args.compare = [os.path.abspath(p) if p else p for p in (args.out, args.compare)]
+
+    if args.record:
+        n = replay.record(args.from_db, args.record)
+        print(f"{n} contenu(s) enregistrés dans {args.record}")
+        sys.exit(0)
+    fixtures = replay.Fixtures.load(args.fixtures) if args.fixtures else replay.synthetic(args.synthetic, args.seed)
+    res = run(fixtures, args)
+    old = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+    report(res, old)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=1)
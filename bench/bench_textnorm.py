@@ -0,0 +1,53 @@
+# bench_textnorm.py — Vérifie textnorm.py contre les sorties de référence puis mesure le coût par article.
+# Usage: python bench/bench_textnorm.py [--rounds 200]
+# Code de sortie 1 si une sortie diffère de bench/textnorm_golden.json.
+
+import argparse, json, os, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+import textnorm  # noqa: E402
+
+def check_golden(path):
+    with open(path, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    failures = 0
+    for i, case in enumerate(cases):
+        got = getattr(textnorm, case["fn"])(*case["args"])
+        if got != case["expected"]:
+            failures += 1
+            print(f"[DIFF] #{i} {case['fn']}({str(case['args'])[:80]}…)\n  attendu: {case['expected']!r:.200}\n  obtenu:  {got!r:.200}")
+    print(f"golden: {len(cases) - failures}/{len(cases)} identiques")
+    return failures == 0, cases
+
+def bench(cases, rounds):
+    titles = [c["args"][0] for c in cases if c["fn"] == "normalize_title"]
+    bodies = [c["args"][0] for c in cases if c["fn"] == "clean_body_text"]
+    sources = [b for b in bodies if b][::-1]
+    articles = [(titles[i % len(titles)], bodies[i % len(bodies)], sources[i % len(sources)])
+                for i in range(max(len(titles), len(bodies)))]
+    # même enchaînement que l'import: titre, complétion du corps, nettoyage, titre de secours
+    def one(title, body, src):
+        textnorm.normalize_title(title)
+        b = textnorm.clean_body_text(textnorm.ensure_min_words(body, src))
+        textnorm.title_from_text(b)
+        textnorm.normalize_edited_body(b)
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for a in articles:
+            one(*a)
+        samples.append((time.perf_counter() - t0) / len(articles))
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1e6
+    p95 = samples[int(len(samples) * 0.95) - 1] * 1e6
+    print(f"articles: {len(articles)} × {rounds} tours — par article: p50 {p50:.1f} µs, p95 {p95:.1f} µs")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--golden", default=os.path.join(HERE, "textnorm_golden.json"))
+    args = ap.parse_args()
+    ok, cases = check_golden(args.golden)
+    bench(cases, args.rounds)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,212 @@
+# loadtest.py — Charge sur les pages publiques (/, /rss.xml, /health, static/images/*) servies comme en
+# production (gunicorn -w 1 -k gthread --threads 8), avec puis sans import simultané.
+# Usage: python bench/loadtest.py [--posts 500] [--concurrency 16] [--duration 20] [--import-articles 40] [--worker]
+# --worker : web en WEB_BACKGROUND=0 + `python -m worker run` à côté (l'import quitte le processus web).
+# Mesures par phase : requêtes/s, p50/p95/p99 par route, erreurs, attentes de verrou SQLite (sonde lectrice
+# sans busy-timeout : chaque SQLITE_BUSY = une lecture qui aurait dû attendre l'écrivain).
+
+import argparse, io, json, os, random, shutil, socket, sqlite3, subprocess, sys, tempfile, threading, time
+from collections import defaultdict
+
+import requests
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+import openai_stub, replay  # noqa: E402
+from bench_import import pct  # noqa: E402
+
+GUNICORN = ["-w", "1", "-k", "gthread", "--threads", "8"]       # comme render.yaml
+N_IMAGES = 20
+
+SEED_SCRIPT = """
+import sys, os, random
+sys.path.insert(0, os.getcwd())
+import app
+n, n_img = int(sys.argv[1]), int(sys.argv[2])
+rng = random.Random(1)
+words = "le gouvernement arménien a annoncé un nouveau programme de rénovation des routes et des écoles".split()
+con = app.db()
+for i in range(n):
+    title = f"Article {i} : " + " ".join(rng.choice(words) for _ in range(8))
+    body = " ".join(rng.choice(words) for _ in range(rng.randint(150, 600))) + "\\n\\n- LesArmeniens.com"
+    cur = con.execute("INSERT INTO posts(title, body, status, created_at, updated_at, image_url, image_sha1, "
+                      "orig_link, source) VALUES(?,?,'published',datetime('now'),datetime('now'),?,?,?,?)",
+                      (title, body, f"/static/images/seed{i % n_img}.jpg", f"seed{i}", f"https://seed.bench/{i}", "seed"))
+    app.refresh_fragments(con, cur.lastrowid)
+con.commit(); con.close()
+"""
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def prepare(workdir, n_posts):
+    """Copie l'application dans workdir (static/ relatif à app.py), crée et remplit site.db, génère les images."""
+    for name in ("app.py", "llm.py", "textnorm.py", "metrics.py", "profiler.py", "cpuwork.py", "worker.py"):
+        shutil.copy(os.path.join(ROOT, name), workdir)
+    os.makedirs(os.path.join(workdir, "static", "images"), exist_ok=True)
+    for i in range(N_IMAGES):
+        buf = io.BytesIO()
+        Image.effect_noise((960, 540), 40).convert("RGB").save(buf, format="JPEG", quality=85)
+        with open(os.path.join(workdir, "static", "images", f"seed{i}.jpg"), "wb") as f:
+            f.write(buf.getvalue())
+    subprocess.run([sys.executable, "-c", SEED_SCRIPT, str(n_posts), str(N_IMAGES)], cwd=workdir, check=True,
+                   env=dict(os.environ, WEB_BACKGROUND="0"), stdout=subprocess.DEVNULL)
+
+def lock_probe(db_path, stop, out):
+    """Lecture type page d'accueil en boucle, sans attente : compte les SQLITE_BUSY et la durée d'attente."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        waited = False
+        while True:
+            try:
+                con = sqlite3.connect(db_path, timeout=0)
+                try:
+                    con.execute("SELECT card_html FROM posts WHERE status='published' ORDER BY id DESC LIMIT 50").fetchall()
+                finally:
+                    con.close()
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                waited = True
+                time.sleep(0.001)
+        out["probes"] += 1
+        if waited:
+            out["busy"] += 1
+            w = time.perf_counter() - t0
+            out["wait_s"] += w
+            out["max_wait_s"] = max(out["max_wait_s"], w)
+        time.sleep(0.005)
+
+def readers(base, concurrency, stop, lat, errors):
+    paths = ["/"] * 4 + ["/rss.xml"] * 3 + ["/health"] * 1 + [f"/static/images/seed{i}.jpg" for i in range(N_IMAGES // 5)]
+    def worker(seed):
+        rng = random.Random(seed)
+        s = requests.Session()
+        while not stop.is_set():
+            path = rng.choice(paths)
+            route = "/static/images/*" if path.startswith("/static/") else path
+            t0 = time.perf_counter()
+            try:
+                r = s.get(base + path, timeout=30)
+                ok = r.status_code == 200
+            except requests.RequestException:
+                ok = False
+            lat[route].append(time.perf_counter() - t0)
+            if not ok:
+                errors[route] += 1
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    return threads
+
+def phase(name, base, db_path, args, until=None):
+    """Lance les lecteurs + la sonde ; s'arrête après --duration s ou quand until() devient vrai."""
+    stop = threading.Event()
+    lat, errors = defaultdict(list), defaultdict(int)
+    probe = {"probes": 0, "busy": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+    t0 = time.perf_counter()
+    threads = readers(base, args.concurrency, stop, lat, errors)
+    pt = threading.Thread(target=lock_probe, args=(db_path, stop, probe), daemon=True)
+    pt.start()
+    while time.perf_counter() - t0 < args.duration and not (until and until()):
+        time.sleep(0.2)
+    stop.set()
+    for t in threads + [pt]:
+        t.join(timeout=35)
+    wall = time.perf_counter() - t0
+    total = sum(len(v) for v in lat.values())
+    print(f"\n== {name} : {total} requêtes en {wall:.1f}s → {total / wall:.0f} req/s "
+          f"({args.concurrency} clients)")
+    print(f"{'route':<18}{'n':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erreurs':>9}")
+    for route in sorted(lat):
+        v = lat[route]
+        print(f"{route:<18}{len(v):>7}{len(v) / wall:>8.0f}{pct(v, 50) * 1000:>9.1f}{pct(v, 95) * 1000:>9.1f}"
+              f"{pct(v, 99) * 1000:>9.1f}{errors[route]:>9}")
+    print(f"verrou SQLite (sonde): {probe['busy']}/{probe['probes']} lectures bloquées, "
+          f"attente totale {probe['wait_s'] * 1000:.0f} ms, max {probe['max_wait_s'] * 1000:.1f} ms")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--posts", type=int, default=500, help="articles publiés dans la base de test")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=20, help="durée max d'une phase (s)")
+    ap.add_argument("--import-articles", type=int, default=40, help="articles importés pendant la 2e phase (0 = pas de phase)")
+    ap.add_argument("--latency", type=float, default=0.2, help="latence du faux chat/completions (s)")
+    ap.add_argument("--worker", action="store_true", help="import dans un processus worker séparé")
+    ap.add_argument("--keep", action="store_true", help="garde le répertoire de travail")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    db_path = os.path.join(workdir, "site.db")
+    prepare(workdir, args.posts)
+    fixtures = replay.synthetic(max(1, args.import_articles))
+    fx_srv, fx_url = replay.serve(fixtures, latency=0.02)
+    ai_srv = openai_stub.serve(0, args.latency, 1.0)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, IMPORT_INTERVAL_MIN="100000", HTTP_PROXY=fx_url, http_proxy=fx_url,
+               NO_PROXY="127.0.0.1,localhost", no_proxy="127.0.0.1,localhost",
+               OPENAI_API_BASE=f"http://127.0.0.1:{ai_srv.server_address[1]}/v1")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", *GUNICORN, "-b", f"127.0.0.1:{port}", "app:app"],
+                              cwd=workdir, env=dict(env, WEB_BACKGROUND="0" if args.worker else "1"),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    worker = subprocess.Popen([sys.executable, "-m", "worker", "run"], cwd=workdir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) if args.worker else None
+    try:
+        for _ in range(100):
+            try:
+                if requests.get(base + "/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                time.sleep(0.2)
+        else:
+            raise SystemExit("serveur injoignable")
+        print(f"{args.posts} articles, serveur gunicorn {' '.join(GUNICORN)} sur {base}"
+              f"{' + processus worker' if worker else ''}")
+
+        phase("lecture seule", base, db_path, args)
+
+        if args.import_articles:
+            con = sqlite3.connect(db_path)
+            for k, v in (("openai_key", "bench"), ("default_image_url", "http://img.bench.am/default.jpg"),
+                         ("feeds", "\n".join(fixtures.feeds)),
+                         ("scrapers_json", json.dumps(fixtures.scrapers, ensure_ascii=False))):
+                con.execute("INSERT INTO settings(key,value) VALUES(?,?) "
+                            "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (k, v))
+            con.commit(); con.close()
+            result = {}
+            def do_import():
+                t0 = time.perf_counter()
+                result["msg"] = requests.get(base + "/cron/import", timeout=3600).text.strip()
+                while worker:               # tâche confiée au worker : attendre sa fin dans worker_tasks
+                    con = sqlite3.connect(db_path)
+                    row = con.execute("SELECT status, result FROM worker_tasks ORDER BY id DESC LIMIT 1").fetchone()
+                    con.close()
+                    if row and row[0] in ("done", "failed"):
+                        result["msg"] = row[1]
+                        break
+                    time.sleep(0.2)
+                result["wall"] = time.perf_counter() - t0
+            it = threading.Thread(target=do_import, daemon=True)
+            it.start()
+            phase("pendant un import", base, db_path, args, until=lambda: not it.is_alive())
+            it.join()
+            print(f"import: {result.get('msg')} en {result.get('wall', 0):.1f}s")
+    finally:
+        for proc in (server, worker):
+            if proc:
+                proc.terminate()
+                proc.wait(timeout=10)
+        fx_srv.shutdown(); ai_srv.shutdown()
+        if args.keep:
+            print("répertoire conservé:", workdir)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# openai_stub.py — Faux serveur OpenAI local (chat/completions, files, batches) pour tests et benchs.
+# Usage: python bench/openai_stub.py [--port 8765] [--latency 0.3] [--batch-delay 5]
+# Puis: OPENAI_API_BASE=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python app.py
+# Réponses déterministes en français ; le compte de tokens est estimé (≈ 4 caractères / token).
+
+import argparse, json, re, threading, time, uuid
+from email.parser import BytesParser
+from email.policy import default as email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER = ("Selon les informations disponibles, les autorités ont présenté les principaux éléments du dossier "
+          "et ont précisé que les discussions se poursuivront dans les prochains jours avec les partenaires concernés. ")
+
+STATE = {"files": {}, "batches": {}}
+LOCK = threading.Lock()
+OPTS = argparse.Namespace(latency=0.0, batch_delay=5.0)
+
+def _tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+def fake_completion(body: dict) -> dict:
+    """Réponse chat/completions : JSON {title, body} si le prompt le demande, sinon texte FR."""
+    messages = body.get("messages") or []
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    words = max(30, min(int(body.get("max_tokens") or 400) // 2, 180))
+    text = " ".join((FILLER * (words // 25 + 1)).split()[:words])
+    if "Réponds STRICTEMENT en JSON" in prompt:
+        content = json.dumps({"title": "Les autorités présentent les principaux éléments du nouveau programme",
+                              "body": text + "\n\n- LesArmeniens.com"}, ensure_ascii=False)
+    else:
+        content = text
+    pt, ct = _tokens(prompt), _tokens(content)
+    return {"id": "chatcmpl-" + uuid.uuid4().hex[:12], "object": "chat.completion", "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": pt, "completion_tokens": ct, "total_tokens": pt + ct}}
+
+def _run_batch(batch_id: str):
+    """Traite le fichier d'entrée puis publie le fichier de sortie après --batch-delay secondes."""
+    time.sleep(OPTS.batch_delay)
+    with LOCK:
+        b = STATE["batches"][batch_id]
+        raw = STATE["files"].get(b["input_file_id"], b"")
+    out = []
+    for line in raw.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        req = json.loads(line)
+        out.append(json.dumps({"id": "req-" + uuid.uuid4().hex[:8], "custom_id": req.get("custom_id"),
+                               "response": {"status_code": 200, "body": fake_completion(req.get("body") or {})},
+                               "error": None}, ensure_ascii=False))
+    fid = "file-" + uuid.uuid4().hex[:12]
+    with LOCK:
+        STATE["files"][fid] = "\n".join(out).encode("utf-8")
+        b.update(status="completed", output_file_id=fid, completed_at=int(time.time()),
+                 request_counts={"total": len(out), "completed": len(out), "failed": 0})
+
+class Handler(BaseHTTPRequestHandler):
+    def _json(self, code, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("x-ratelimit-limit-requests", "10000")
+        self.send_header("x-ratelimit-remaining-requests", "9999")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        if self.path.endswith("/chat/completions"):
+            body = json.loads(self._body() or b"{}")
+            if OPTS.latency:
+                time.sleep(OPTS.latency)
+            return self._json(200, fake_completion(body))
+        if self.path.endswith("/files"):
+            head = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode()
+            msg = BytesParser(policy=email_policy).parsebytes(head + self._body())
+            data = b""
+            for part in msg.iter_parts():
+                if part.get_param("name", header="content-disposition") == "file":
+                    data = part.get_payload(decode=True) or b""
+            fid = "file-" + uuid.uuid4().hex[:12]
+            with LOCK:
+                STATE["files"][fid] = data
+            return self._json(200, {"id": fid, "object": "file", "bytes": len(data), "purpose": "batch"})
+        if self.path.endswith("/batches"):
+            req = json.loads(self._body() or b"{}")
+            bid = "batch_" + uuid.uuid4().hex[:12]
+            with LOCK:
+                STATE["batches"][bid] = {"id": bid, "object": "batch", "status": "in_progress",
+                                         "input_file_id": req.get("input_file_id"), "output_file_id": None,
+                                         "error_file_id": None, "metadata": req.get("metadata") or {},
+                                         "created_at": int(time.time())}
+            threading.Thread(target=_run_batch, args=(bid,), daemon=True).start()
+            return self._json(200, STATE["batches"][bid])
+        self._json(404, {"error": {"message": f"route inconnue: {self.path}"}})
+
+    def do_GET(self):
+        m = re.search(r"/files/([\w-]+)/content$", self.path)
+        if m:
+            with LOCK:
+                data = STATE["files"].get(m.group(1))
+            if data is None:
+                return self._json(404, {"error": {"message": "fichier inconnu"}})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        m = re.search(r"/batches/([\w-]+)$", self.path)
+        if m:
+            with LOCK:
+                b = STATE["batches"].get(m.group(1))
+            return self._json(200, b) if b else self._json(404, {"error": {"message": "batch inconnu"}})
+        self._json(404, {"error": {"message": f"route inconnue: {self.path}"}})
+
+    def log_message(self, fmt, *args):
+        pass
+
+def serve(port: int = 8765, latency: float = 0.0, batch_delay: float = 5.0):
+    """Démarre le serveur dans un thread ; renvoie l'objet serveur (server.shutdown() pour l'arrêter)."""
+    OPTS.latency, OPTS.batch_delay = latency, batch_delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="latence simulée par appel chat (s)")
+    ap.add_argument("--batch-delay", type=float, default=5.0, help="durée avant qu'un batch soit 'completed' (s)")
+    args = ap.parse_args()
+    srv = serve(args.port, args.latency, args.batch_delay)
+    print(f"stub OpenAI sur http://127.0.0.1:{args.port}/v1 (latence {args.latency}s, batch {args.batch_delay}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,157 @@
+# replay.py — Serveur de fixtures HTTP (flux, pages, images) pour rejouer un import hors ligne.
+# Le serveur est utilisé comme proxy HTTP (HTTP_PROXY) : les URLs d'origine sont conservées, seules les
+# URLs https:// sont ramenées en http:// dans les contenus rejoués. Images absentes des fixtures :
+# JPEG synthétique déterministe par URL (bruit, donc coût de décodage/encodage réaliste et sha1 distincts).
+#
+# Format d'un répertoire de fixtures : index.json {"feeds": [...], "scrapers": [...], "urls": {url: fichier}}
+# + les fichiers (UTF-8). --record (bench_import.py) le produit depuis le cache de pages d'un site.db.
+
+import hashlib, io, json, os, random, sqlite3, threading, time, zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from PIL import Image
+
+def _http(url: str) -> str:
+    return "http://" + url[len("https://"):] if url.startswith("https://") else url
+
+class Fixtures:
+    def __init__(self, feeds, scrapers, bodies: dict):
+        self.feeds = [_http(u) for u in feeds]
+        self.scrapers = [dict(sc, index_url=_http(sc["index_url"])) for sc in scrapers]
+        self.bodies = {_http(u): b.replace("https://", "http://").encode("utf-8") for u, b in bodies.items()}
+        self._images = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str):
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            idx = json.load(f)
+        bodies = {}
+        for url, name in idx["urls"].items():
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                bodies[url] = f.read()
+        return cls(idx.get("feeds", []), idx.get("scrapers", []), bodies)
+
+    def image(self, url: str) -> bytes:
+        with self._lock:
+            data = self._images.get(url)
+        if data is None:
+            seed = int(hashlib.sha1(url.encode()).hexdigest()[:8], 16)
+            im = Image.effect_noise((960, 540), 30 + seed % 40).convert("RGB")
+            buf = io.BytesIO()
+            im.save(buf, format="JPEG", quality=85)
+            data = buf.getvalue()
+            with self._lock:
+                self._images[url] = data
+        return data
+
+def record(db_path: str, out_dir: str, cache_dir: str = None) -> int:
+    """Exporte pages + flux du cache (page_cache) et la config feeds/scrapers d'un site.db → fixtures."""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "page_cache")
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    try:
+        rows = con.execute("SELECT url, sha1 FROM page_cache").fetchall()
+        settings = {r["key"]: r["value"] for r in con.execute("SELECT key, value FROM settings").fetchall()}
+    finally:
+        con.close()
+    os.makedirs(out_dir, exist_ok=True)
+    urls = {}
+    for r in rows:
+        try:
+            with open(os.path.join(cache_dir, r["sha1"][:2], r["sha1"] + ".z"), "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error):
+            continue
+        name = r["sha1"] + ".txt"
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+        urls[r["url"]] = name
+    recorded = set(urls)
+    feeds = [u for u in (settings.get("feeds") or "").splitlines() if u.strip() in recorded]
+    scrapers = [sc for sc in json.loads(settings.get("scrapers_json") or "[]") if sc.get("index_url") in recorded]
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"feeds": feeds, "scrapers": scrapers, "urls": urls}, f, ensure_ascii=False, indent=1)
+    return len(urls)
+
+# ------- Corpus synthétique (aucun enregistrement disponible) -------
+HY_WORDS = ("Հայաստանի կառավարությունը այսօր հայտարարեց նոր ծրագրի մասին որը կներառի ճանապարհների "
+            "վերանորոգում դպրոցների կառուցում և գյուղատնտեսության աջակցություն ըստ նախարարի խոսքերի "
+            "աշխատանքները կսկսվեն գալիք ամիսներին Երևանում և մարզերում").split()
+EN_WORDS = ("the government announced a new programme today that will include road repairs school building "
+            "and support for agriculture according to the minister work will begin in the coming months "
+            "in Yerevan and the regions").split()
+FR_PARA = ("Le gouvernement a annoncé aujourd'hui un nouveau programme qui comprendra la rénovation des routes, "
+           "la construction d'écoles et un soutien à l'agriculture. Selon le ministre, les travaux commenceront "
+           "dans les prochains mois à Erevan et dans les régions du pays. ")
+
+def _paragraphs(rng, words, n_chars):
+    paras, size = [], 0
+    while size < n_chars:
+        p = " ".join(rng.choice(words) for _ in range(rng.randint(40, 90))).capitalize() + "."
+        paras.append(p); size += len(p)
+    return paras
+
+def synthetic(n: int, seed: int = 1) -> Fixtures:
+    """n articles : ~1/3 via un flux RSS, le reste via un scraper d'index ; mélange hy/en/fr, ~10 % d'articles longs."""
+    rng = random.Random(seed)
+    host, feed_url, index_url = "http://news.bench.am", "http://news.bench.am/rss", "http://news.bench.am/latest"
+    bodies, items, links = {}, [], []
+    n_feed = min(20, max(1, n // 3))
+    for i in range(n):
+        url = f"{host}/article/{i}"
+        lang = rng.random()
+        if lang < 0.1:
+            paras = [FR_PARA * 2] * rng.randint(3, 5)
+            title = f"Le gouvernement présente son programme numéro {i} pour les régions"
+        else:
+            words = HY_WORDS if lang < 0.75 else EN_WORDS
+            paras = _paragraphs(rng, words, 12000 if rng.random() < 0.1 else rng.randint(1200, 3500))
+            title = " ".join(rng.choice(words) for _ in range(9)).capitalize()
+        body = "".join(f"<p>{p}</p>" for p in paras)
+        bodies[url] = (f"<html><head><title>{title}</title>"
+                       f"<meta property='og:image' content='https://img.bench.am/{i}.jpg'></head><body>"
+                       f"<nav><a href='/'>Accueil</a></nav><h1>{title}</h1>"
+                       f"<div class='article-body'>{body}</div><footer>© bench</footer></body></html>")
+        if i < n_feed:
+            items.append(f"<item><title>{title}</title><link>{url}</link><guid>{url}</guid>"
+                         f"<description>{paras[0][:200]}</description></item>")
+        else:
+            links.append(f"<li><a class='news-link' href='/article/{i}'>{title}</a></li>")
+    bodies[feed_url] = ("<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel>"
+                        f"<title>Bench News</title><link>{host}</link>{''.join(items)}</channel></rss>")
+    bodies[index_url] = f"<html><body><ul>{''.join(links)}</ul></body></html>"
+    scraper = {"name": "Bench", "index_url": index_url, "link_selector": "a.news-link",
+               "title_selector": "h1", "content_selector": ".article-body",
+               "image_selectors": ["meta[property='og:image']::content"], "max_items": max(1, n - n_feed)}
+    return Fixtures([feed_url], [scraper] if links else [], bodies)
+
+# ------- Serveur (proxy HTTP) -------
+def serve(fixtures: Fixtures, port: int = 0, latency: float = 0.0):
+    """Démarre le proxy de fixtures dans un thread → (serveur, 'http://127.0.0.1:port')."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = self.path if self.path.startswith("http") else f"http://{self.headers.get('Host')}{self.path}"
+            if latency:
+                time.sleep(latency)
+            body, ctype = fixtures.bodies.get(url), "text/html; charset=utf-8"
+            if body is None and urlsplit(url).path.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+                body, ctype = fixtures.image(url), "image/jpeg"
+            if body is None:
+                self.send_response(404); self.send_header("Content-Length", "0"); self.end_headers()
+                return
+            if body.lstrip().startswith(b"<?xml"):
+                ctype = "application/rss+xml; charset=utf-8"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
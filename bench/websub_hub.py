@@ -0,0 +1,113 @@
+# websub_hub.py — Hub WebSub minimal (abonnement vérifié, publish → distribution du flux) pour tests locaux.
+# Usage: python bench/websub_hub.py [--port 8766]
+# Puis dans /admin : Hub WebSub = http://127.0.0.1:8766/ ; un abonné s'inscrit par
+#   POST / hub.mode=subscribe&hub.topic=<flux>&hub.callback=<url>  (vérification GET avec hub.challenge)
+# À chaque hub.mode=publish, le flux est relu et POSTé à chaque abonné (en-têtes Link hub/self).
+# GET /stats : abonnements et publications reçues (JSON).
+
+import argparse, json, secrets, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode
+
+import requests
+
+STATE = {"subs": {}, "published": []}      # subs: topic -> {callback: expiration (epoch)}
+LOCK = threading.Lock()
+
+def verify(mode, topic, callback, lease):
+    """Vérification d'intention : l'abonné doit renvoyer hub.challenge tel quel."""
+    challenge = secrets.token_hex(8)
+    sep = "&" if "?" in callback else "?"
+    try:
+        r = requests.get(callback + sep + urlencode({"hub.mode": mode, "hub.topic": topic,
+                                                      "hub.challenge": challenge, "hub.lease_seconds": lease}),
+                         timeout=10)
+    except requests.RequestException:
+        return False
+    return r.ok and r.text.strip() == challenge
+
+def subscribe(mode, topic, callback, lease):
+    if not verify(mode, topic, callback, lease):
+        print(f"[HUB] vérification refusée {callback}")
+        return
+    with LOCK:
+        subs = STATE["subs"].setdefault(topic, {})
+        if mode == "subscribe":
+            subs[callback] = time.time() + lease
+        else:
+            subs.pop(callback, None)
+    print(f"[HUB] {mode} {topic} → {callback}")
+
+def distribute(topic, hub_url):
+    try:
+        r = requests.get(topic, timeout=15)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[HUB] flux illisible {topic}: {e}")
+        return
+    now = time.time()
+    with LOCK:
+        STATE["published"].append({"topic": topic, "at": now, "bytes": len(r.content)})
+        callbacks = [cb for cb, exp in STATE["subs"].get(topic, {}).items() if exp > now]
+    for cb in callbacks:
+        try:
+            requests.post(cb, data=r.content, timeout=10, headers={
+                "Content-Type": r.headers.get("Content-Type", "application/rss+xml"),
+                "Link": f'<{hub_url}>; rel="hub", <{topic}>; rel="self"'})
+        except requests.RequestException as e:
+            print(f"[HUB] distribution échouée {cb}: {e}")
+    print(f"[HUB] publish {topic} → {len(callbacks)} abonné(s)")
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                                              .decode("utf-8")).items()}
+        mode = form.get("hub.mode", "")
+        hub_url = f"http://{self.headers.get('Host')}/"
+        if mode in ("subscribe", "unsubscribe") and form.get("hub.topic") and form.get("hub.callback"):
+            lease = int(form.get("hub.lease_seconds") or 86400)
+            threading.Thread(target=subscribe, args=(mode, form["hub.topic"], form["hub.callback"], lease),
+                             daemon=True).start()
+            return self._reply(202)
+        if mode == "publish" and (form.get("hub.url") or form.get("hub.topic")):
+            threading.Thread(target=distribute, args=(form.get("hub.url") or form["hub.topic"], hub_url),
+                             daemon=True).start()
+            return self._reply(204)
+        self._reply(400, "hub.mode/hub.topic/hub.callback manquants\n")
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with LOCK:
+                body = json.dumps({"subs": {t: list(s) for t, s in STATE["subs"].items()},
+                                   "published": STATE["published"]})
+            return self._reply(200, body, "application/json")
+        self._reply(404)
+
+    def _reply(self, code, text="", ctype="text/plain; charset=utf-8"):
+        data = text.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+def serve(port: int = 8766):
+    """Démarre le hub dans un thread ; renvoie l'objet serveur (server.shutdown() pour l'arrêter)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8766)
+    args = ap.parse_args()
+    srv = serve(args.port)
+    print(f"hub WebSub sur http://127.0.0.1:{args.port}/ (statistiques : /stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,190 @@
+# cpuwork.py — Travail CPU de l'import (Console Arménienne) : nettoyage/extraction HTML, encodage d'images.
+# Aucun effet de bord à l'import (ni base, ni réseau, ni threads) : ces fonctions peuvent tourner dans le
+# processus web ou dans un pool de processus (CPU_WORKERS, voir app.cpu_call). Entrées/sorties picklables.
+
+import base64, hashlib, io, os, re
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+import soupsieve as sv
+from PIL import Image, ImageFilter
+
+ARTICLE_MAX_CHARS = int(os.environ.get("ARTICLE_MAX_CHARS", "60000"))   # borne de sécurité à l'extraction
+IMAGE_WIDTHS = (480, 960)        # variantes réduites pour srcset (seulement si l'original est plus large)
+LQIP_WIDTH = 16                  # aperçu flou inline (data URI) affiché pendant le chargement
+
+SEL_CANDIDATES = [
+    "article",
+    ".entry-content", ".post-content", ".td-post-content",
+    ".article-content", ".content-article", ".article-body",
+    "#article-body", "#content article", ".post__text", ".story-content",
+    ".single-content", ".content"
+]
+
+JUNK_SELECTORS = [
+    "[class*='share']", "[class*='sharing']", "[class*='social']",
+    "[class*='tags']", "[class*='related']", "[class*='recommend']",
+    "[class*='newsletter']", "[class*='subscribe']", "[class*='cookie']",
+    "[class*='promo']", "[class*='advert']", "[class*='banner']",
+    "[id*='share']", "[id*='social']", "[id*='related']",
+    ".td-post-author-name", ".td-post-source-tags",
+]
+
+# ------- Nettoyage -------
+def clean_source_html(html: str) -> str:
+    """Supprime blocs parasites avant extraction: partages, related, tags, nav, footer, scripts…"""
+    try:
+        soup = BeautifulSoup(html or "", "html.parser")
+        for tag in soup.find_all(["aside","nav","footer","form","script","style"]):
+            tag.decompose()
+        for sel in JUNK_SELECTORS:
+            for n in soup.select(sel):
+                n.decompose()
+        for figcap in soup.find_all("figcaption"):
+            figcap.decompose()
+        return str(soup)
+    except Exception:
+        return html or ""
+
+# ------- Sélecteurs des scrapers -------
+@lru_cache(maxsize=256)
+def compile_extractor(selector):
+    """'sel::content' / 'sel::src' / 'sel' → (motif soupsieve compilé, attribut|None)."""
+    attr = None
+    sel = selector
+    if "::content" in selector:
+        sel, attr = selector.split("::content", 1)[0], "content"
+    elif "::src" in selector:
+        sel, attr = selector.split("::src", 1)[0], "src"
+    return sv.compile(sel.strip()), attr
+
+@lru_cache(maxsize=256)
+def compile_css(selector):
+    return sv.compile(selector)
+
+def extract_with(soup, extractor):
+    pat, attr = extractor
+    tag = pat.select_one(soup)
+    if not tag:
+        return None
+    if attr:
+        val = tag.get(attr)
+        return val if val else None
+    return tag.get_text(" ", strip=True)
+
+def soup_select_attr(soup, selector):
+    return extract_with(soup, compile_extractor(selector))
+
+# ------- Extraction -------
+def paragraphs_text(nodes):
+    """Texte des blocs, un paragraphe par bloc (séparés par une ligne vide, espaces internes réduits)."""
+    paras = (re.sub(r"\s+", " ", n.get_text(" ", strip=True)).strip() for n in nodes)
+    return "\n\n".join(p for p in paras if p)
+
+def article_text_from_soup(soup):
+    node_text, best_len = "", 0
+    for sel in SEL_CANDIDATES:
+        cand = soup.select_one(sel)
+        if cand:
+            text = paragraphs_text(cand.find_all(["p","h2","li"]) or [cand])
+            if len(text) > best_len:
+                best_len = len(text); node_text = text
+    if not node_text:
+        node_text = paragraphs_text(soup.find_all("p"))
+    return node_text[:ARTICLE_MAX_CHARS] if node_text else ""
+
+def extract_article_text(html):
+    return article_text_from_soup(BeautifulSoup(html, "html.parser"))
+
+def main_image_from_soup(soup, base_url=None):
+    for sel in ["meta[property='og:image']","meta[name='twitter:image']"]:
+        m = soup.select_one(sel)
+        if m and m.get("content"):
+            return urljoin(base_url or "", m["content"])
+    a = soup.find("article")
+    if a:
+        imgtag = a.find("img")
+        if imgtag and imgtag.get("src"):
+            return urljoin(base_url or "", imgtag["src"])
+    imgtag = soup.find("img")
+    if imgtag and imgtag.get("src"):
+        return urljoin(base_url or "", imgtag["src"])
+    return None
+
+def find_main_image_in_html(html, base_url=None):
+    return main_image_from_soup(BeautifulSoup(html, "html.parser"), base_url)
+
+def extract_from_soup(soup, link, title_sel=None, content_sel=None, image_sels=()):
+    """Page nettoyée et parsée → (title_src, texte, image|None).
+    title_sel=None : titre h1/og:title ; content_sel/image_sels : sélecteurs du scraper (chaînes)."""
+    if title_sel is not None:
+        title_src = extract_with(soup, compile_extractor(title_sel))
+    else:
+        og = soup.select_one("meta[property='og:title']")
+        h1 = soup.find("h1")
+        title_src = (h1.get_text(" ", strip=True) if h1 else "") or (og.get("content", "") if og else "")
+
+    text = ""
+    if content_sel:
+        node = compile_css(content_sel).select_one(soup)
+        if node:
+            text = paragraphs_text(node.find_all(["p","h2","li"]) or [node])[:ARTICLE_MAX_CHARS]
+    if not text:
+        text = article_text_from_soup(soup)
+
+    img = None
+    for sel in image_sels:
+        val = extract_with(soup, compile_extractor(sel))
+        if val:
+            img = urljoin(link, val)
+            break
+    if not img:
+        img = main_image_from_soup(soup, link)
+    return title_src or "(Sans titre)", text, img
+
+def process_page(raw_html, link, title_sel=None, content_sel=None, image_sels=()):
+    """Page brute → (html nettoyé, title_src, texte, image|None) : nettoyage puis un seul parse pour l'extraction."""
+    page = clean_source_html(raw_html)
+    return (page,) + extract_from_soup(BeautifulSoup(page, "html.parser"), link, title_sel, content_sel, image_sels)
+
+# ------- Images -------
+def image_meta(im, path: str) -> dict:
+    """Image ouverte (celle de path) → {w, h, lqip, srcset} ; écrit les variantes <sha1>-<largeur>.jpg manquantes."""
+    w, h = im.size
+    stem = path[:-len(".jpg")]
+    variants = []
+    for vw in IMAGE_WIDTHS:
+        if vw >= w:
+            break
+        vpath = f"{stem}-{vw}.jpg"
+        if not os.path.exists(vpath):
+            im.resize((vw, max(1, round(h * vw / w))), Image.LANCZOS).save(
+                vpath, format="JPEG", quality=82, optimize=True, progressive=True)
+        variants.append((vw, vpath))
+    small = im.resize((LQIP_WIDTH, max(1, round(h * LQIP_WIDTH / w)))).filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    small.save(buf, format="JPEG", quality=40)
+    return {"w": w, "h": h,
+            "lqip": "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+            "srcset": ", ".join(f"/{p} {vw}w" for vw, p in variants + [(w, path)])}
+
+def encode_image(data: bytes, dest_dir: str = "static/images"):
+    """Octets d'image → JPEG (qualité 88, optimisé) sous dest_dir/<sha1>.jpg + variantes ;
+    renvoie (chemin, sha1, image_meta). Lève si illisible."""
+    im = Image.open(io.BytesIO(data))
+    im.load()
+    if im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    os.makedirs(dest_dir, exist_ok=True)
+    sha1 = hashlib.sha1(data).hexdigest()
+    path = f"{dest_dir}/{sha1}.jpg"
+    if not os.path.exists(path):
+        im.save(path, format="JPEG", quality=88, optimize=True)
+    return path, sha1, image_meta(im, path)
+
+def describe_image(path: str) -> dict:
+    """image_meta d'un JPEG déjà enregistré (articles antérieurs aux métadonnées)."""
+    with Image.open(path) as im:
+        im.load()
+        return image_meta(im if im.mode in ("RGB", "L") else im.convert("RGB"), path)
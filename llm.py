@@ -0,0 +1,280 @@
+# llm.py — Client OpenAI chat/completions (Console Arménienne)
+# Limiteur à jetons (requêtes + tokens/min, recalé sur les en-têtes x-ratelimit-*), concurrence bornée,
+# retries avec jitter (429/5xx/réseau, Retry-After respecté), estimation et rognage du prompt,
+# totaux tokens/latence par import et par jour. API batch (fichiers JSONL) pour les gros rattrapages.
+
+import os, json, random, re, threading, time
+from datetime import datetime, timezone
+import requests
+import metrics
+
+API_BASE        = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip("/")
+API_URL         = os.environ.get("OPENAI_API_URL", API_BASE + "/chat/completions")
+RPM_LIMIT       = int(os.environ.get("LLM_RPM", "500"))          # requêtes / minute (avant recalage)
+TPM_LIMIT       = int(os.environ.get("LLM_TPM", "200000"))       # tokens / minute (avant recalage)
+MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+MAX_RETRIES     = int(os.environ.get("LLM_MAX_RETRIES", "4"))
+MAX_PROMPT_TOKENS = int(os.environ.get("LLM_MAX_PROMPT_TOKENS", "12000"))
+COMPLETION_TOKENS_GUESS = 1200                                   # réservé par appel si max_tokens absent
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    """Échec définitif d'un appel (après retries, ou erreur non réessayable)."""
+
+# ------- Estimation / rognage -------
+def estimate_tokens(text: str) -> int:
+    """~4 caractères/token en alphabet latin, ~2 pour l'arménien/cyrillique (prudent)."""
+    text = text or ""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii // 2 + 1
+
+def estimate_messages_tokens(messages) -> int:
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages) + 3
+
+def fit_prompt(messages, max_tokens: int = MAX_PROMPT_TOKENS):
+    """Rogne la fin du plus long message 'user' jusqu'à tenir dans max_tokens (estimés)."""
+    over = estimate_messages_tokens(messages) - max_tokens
+    if over <= 0:
+        return messages
+    idx = max((i for i, m in enumerate(messages) if m.get("role") == "user"),
+              key=lambda i: len(messages[i].get("content", "")), default=None)
+    if idx is None:
+        return messages
+    content = messages[idx]["content"]
+    ratio = max(0.0, 1 - (over + 16) / max(1, estimate_tokens(content)))
+    trimmed = content[:int(len(content) * ratio)].rsplit(" ", 1)[0] + " […]"
+    print(f"[LLM] prompt rogné: ~{over} tokens en trop ({len(content)} → {len(trimmed)} car.)")
+    return messages[:idx] + [dict(messages[idx], content=trimmed)] + messages[idx + 1:]
+
+# ------- Limiteur -------
+class TokenBucket:
+    """Seau à jetons rechargé en continu (capacity par minute). take() bloque jusqu'à disponibilité."""
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.capacity / 60.0)
+        self.stamp = now
+
+    def take(self, n: float) -> float:
+        """Consomme n jetons ; renvoie le temps passé à attendre (s)."""
+        waited = 0.0
+        n = min(n, self.capacity)                # une demande > capacité passe quand le seau est plein
+        while True:
+            with self.lock:
+                self._refill()
+                if self.level >= n:
+                    self.level -= n
+                    return waited
+                wait = (n - self.level) * 60.0 / self.capacity
+            wait = min(wait, 5.0)
+            time.sleep(wait); waited += wait
+
+    def refund(self, n: float):
+        with self.lock:
+            self.level = min(self.capacity, self.level + max(0.0, n))
+
+    def sync(self, limit, remaining):
+        """Recale sur les en-têtes de l'API (limite réelle et reste annoncé)."""
+        with self.lock:
+            self._refill()
+            if limit:
+                self.capacity = float(limit)
+            if remaining is not None:
+                self.level = min(self.level, float(remaining))
+
+_REQ_BUCKET = TokenBucket(RPM_LIMIT)
+_TOK_BUCKET = TokenBucket(TPM_LIMIT)
+_SEM = threading.BoundedSemaphore(max(1, MAX_CONCURRENCY))
+_SESSION = requests.Session()
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+def _parse_duration(v) -> float:
+    """'6m0s' / '1.5s' / '20ms' / '12' → secondes."""
+    if not v:
+        return 0.0
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    mult = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(n) * mult[u] for n, u in _DURATION_RE.findall(v))
+
+def _int_header(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+def _sync_limits(headers):
+    _REQ_BUCKET.sync(_int_header(headers, "x-ratelimit-limit-requests"),
+                     _int_header(headers, "x-ratelimit-remaining-requests"))
+    _TOK_BUCKET.sync(_int_header(headers, "x-ratelimit-limit-tokens"),
+                     _int_header(headers, "x-ratelimit-remaining-tokens"))
+
+def _retry_delay(headers, attempt: int) -> float:
+    ra = _parse_duration(headers.get("retry-after")) if headers else 0.0
+    if not ra and headers:
+        ra = max(_parse_duration(headers.get("x-ratelimit-reset-requests")) if
+                 _int_header(headers, "x-ratelimit-remaining-requests") == 0 else 0.0,
+                 _parse_duration(headers.get("x-ratelimit-reset-tokens")) if
+                 _int_header(headers, "x-ratelimit-remaining-tokens") == 0 else 0.0)
+    backoff = random.uniform(0, min(30.0, 1.0 * 2 ** attempt))    # full jitter
+    return ra + random.uniform(0, 0.5) if ra else backoff
+
+# ------- Métriques -------
+_STATS_LOCK = threading.Lock()
+
+def _blank():
+    return {"calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_ms_total": 0, "latency_ms_max": 0, "throttled_s": 0.0}
+
+_STATS = {"run": _blank(), "day": _blank(), "day_key": datetime.now(timezone.utc).date().isoformat()}
+
+def _record(**inc):
+    with _STATS_LOCK:
+        today = datetime.now(timezone.utc).date().isoformat()
+        if today != _STATS["day_key"]:
+            _STATS["day"], _STATS["day_key"] = _blank(), today
+        for bucket in (_STATS["run"], _STATS["day"]):
+            for k, v in inc.items():
+                if k == "latency_ms":
+                    bucket["latency_ms_total"] += v
+                    bucket["latency_ms_max"] = max(bucket["latency_ms_max"], v)
+                else:
+                    bucket[k] += v
+
+def start_run():
+    """Remet à zéro les totaux 'run' (début d'un import)."""
+    with _STATS_LOCK:
+        _STATS["run"] = _blank()
+
+def restore_day(saved: dict):
+    """Recharge les totaux du jour persistés (boot), s'ils concernent bien aujourd'hui."""
+    if not saved or saved.get("day_key") != _STATS["day_key"]:
+        return
+    with _STATS_LOCK:
+        for k in _STATS["day"]:
+            if k in saved.get("day", {}):
+                _STATS["day"][k] = saved["day"][k]
+
+def stats_snapshot() -> dict:
+    with _STATS_LOCK:
+        return {"run": dict(_STATS["run"]), "day": dict(_STATS["day"]), "day_key": _STATS["day_key"]}
+
+def format_stats(st: dict) -> str:
+    calls = st["calls"]
+    avg = st["latency_ms_total"] / calls if calls else 0
+    return (f"{calls} appel(s), {st['prompt_tokens'] + st['completion_tokens']} tokens "
+            f"({st['prompt_tokens']} in / {st['completion_tokens']} out), latence moy. {avg:.0f} ms "
+            f"(max {st['latency_ms_max']} ms), {st['retries']} retry, {st['errors']} échec(s), "
+            f"attente limiteur {st['throttled_s']:.1f} s")
+
+# ------- Appel -------
+def chat(key: str, model: str, messages, temperature: float = 0.2, timeout: float = 60,
+         max_tokens: int = None, purpose: str = "chat") -> str:
+    """Renvoie le contenu texte de la première réponse. Lève LLMError après épuisement des retries."""
+    if not key:
+        raise LLMError("clé OpenAI absente")
+    messages = fit_prompt(messages)
+    payload = {"model": model or "gpt-4o-mini", "temperature": temperature, "messages": messages}
+    if max_tokens:
+        payload["max_tokens"] = max_tokens
+    reserve = estimate_messages_tokens(messages) + (max_tokens or COMPLETION_TOKENS_GUESS)
+    headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+
+    for attempt in range(MAX_RETRIES + 1):
+        # créneau de concurrence tenu pour l'appel seulement, rendu avant l'attente du retry
+        with _SEM:
+            throttled = _REQ_BUCKET.take(1) + _TOK_BUCKET.take(reserve)
+            t0 = time.monotonic()
+            resp_headers, err = None, None
+            try:
+                with metrics.span("llm_call", purpose=purpose):
+                    r = _SESSION.post(API_URL, headers=headers, json=payload, timeout=timeout)
+                metrics.inc("llm_responses_total", status=r.status_code)
+                resp_headers = r.headers
+                if r.status_code == 200:
+                    j = r.json()
+                    usage = j.get("usage") or {}
+                    _TOK_BUCKET.refund(reserve - int(usage.get("total_tokens", reserve)))
+                    _sync_limits(r.headers)
+                    _record(calls=1, throttled_s=throttled,
+                            latency_ms=int((time.monotonic() - t0) * 1000),
+                            prompt_tokens=int(usage.get("prompt_tokens", 0)),
+                            completion_tokens=int(usage.get("completion_tokens", 0)))
+                    return ((j.get("choices") or [{}])[0].get("message", {}).get("content") or "").strip()
+                _TOK_BUCKET.refund(reserve)                      # rien consommé ; l'API recale via ses en-têtes
+                _sync_limits(r.headers)
+                err = LLMError(f"{purpose}: HTTP {r.status_code} {r.text[:200]}")
+                quota = "insufficient_quota" in r.text
+                if r.status_code not in RETRYABLE_STATUS or quota:
+                    _record(calls=1, errors=1, throttled_s=throttled)
+                    raise err
+            except requests.RequestException as e:
+                _TOK_BUCKET.refund(reserve)
+                metrics.inc("llm_responses_total", status="erreur")
+                err = LLMError(f"{purpose}: {e}")
+            except ValueError as e:                              # JSON illisible
+                err = LLMError(f"{purpose}: réponse invalide ({e})")
+        if attempt == MAX_RETRIES:
+            _record(calls=1, errors=1, throttled_s=throttled)
+            raise err
+        delay = _retry_delay(resp_headers, attempt)
+        _record(retries=1, throttled_s=throttled)
+        print(f"[LLM] {err} — nouvel essai dans {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+        time.sleep(delay)
+
+# ------- API batch (JSONL → /v1/files + /v1/batches) -------
+def _batch_api(method: str, path: str, key: str, timeout: float = 60, **kw):
+    if not key:
+        raise LLMError("clé OpenAI absente")
+    try:
+        r = _SESSION.request(method, API_BASE + path, headers={"Authorization": f"Bearer {key}"},
+                             timeout=timeout, **kw)
+    except requests.RequestException as e:
+        raise LLMError(f"batch {path}: {e}")
+    if r.status_code >= 400:
+        raise LLMError(f"batch {path}: HTTP {r.status_code} {r.text[:200]}")
+    return r
+
+def batch_line(custom_id: str, model: str, messages, temperature: float = 0.2) -> dict:
+    return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+            "body": {"model": model or "gpt-4o-mini", "temperature": temperature, "messages": fit_prompt(messages)}}
+
+def submit_batch(key: str, lines, metadata: dict = None) -> dict:
+    """Téléverse les lignes JSONL et crée le batch ; renvoie l'objet batch (id, status…)."""
+    data = "\n".join(json.dumps(l, ensure_ascii=False) for l in lines).encode("utf-8")
+    f = _batch_api("POST", "/files", key, data={"purpose": "batch"},
+                   files={"file": ("batch.jsonl", data, "application/jsonl")}).json()
+    return _batch_api("POST", "/batches", key, json={
+        "input_file_id": f["id"], "endpoint": "/v1/chat/completions",
+        "completion_window": "24h", "metadata": metadata or {}}).json()
+
+def get_batch(key: str, batch_id: str) -> dict:
+    return _batch_api("GET", f"/batches/{batch_id}", key).json()
+
+def batch_results(key: str, file_id: str):
+    """Itère (custom_id, contenu|None, erreur|None) depuis le fichier de sortie (ou d'erreurs) d'un batch."""
+    text = _batch_api("GET", f"/files/{file_id}/content", key, timeout=120).text
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        row = json.loads(raw)
+        resp = row.get("response") or {}
+        body = resp.get("body") or {}
+        if resp.get("status_code") == 200:
+            usage = body.get("usage") or {}
+            _record(calls=1, prompt_tokens=int(usage.get("prompt_tokens", 0)),
+                    completion_tokens=int(usage.get("completion_tokens", 0)))
+            content = ((body.get("choices") or [{}])[0].get("message", {}).get("content") or "").strip()
+            yield row.get("custom_id"), content, None
+        else:
+            err = row.get("error") or body.get("error") or {"message": f"HTTP {resp.get('status_code')}"}
+            yield row.get("custom_id"), None, str(err.get("message", err) if isinstance(err, dict) else err)
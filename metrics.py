@@ -0,0 +1,158 @@
+# metrics.py — Compteurs et histogrammes en mémoire (Console Arménienne), exposés au format Prometheus.
+# span("étape", source=...) chronomètre un bloc ; inc("nom", raison=...) compte un événement.
+# METRICS_ENABLED=0 : span() renvoie un contexte vide partagé et inc()/observe() sortent immédiatement.
+# snapshot() : état sérialisable (JSON) d'un autre processus (worker), fusionné à la lecture avec le label
+# process=<nom> (render/stage_summary/counter_summary, paramètre others).
+
+import os, threading, time
+
+ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+PREFIX = "console_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HELP = {
+    "stage_seconds": "Durée des étapes d'import (fetch, parse, extraction, réécriture, image, écriture)",
+    "http_request_seconds": "Durée des requêtes HTTP servies, par route",
+    "http_requests_total": "Requêtes HTTP servies, par route et statut",
+    "fetch_responses_total": "Réponses des sources (flux, pages, images), par type et statut",
+    "fetch_truncated_total": "Lectures de sources arrêtées avant la fin (taille, délai, marqueur) ou refusées (type)",
+    "llm_responses_total": "Réponses de l'API OpenAI, par statut",
+    "outbound_responses_total": "Notifications sortantes (hub WebSub, webhooks), par type et statut",
+    "import_created_total": "Articles créés, par source",
+    "import_skipped_total": "Articles ignorés, par source et raison",
+}
+
+_LOCK = threading.Lock()
+_COUNTERS = {}      # (nom, labels) -> valeur
+_HISTS = {}         # (nom, labels) -> [compte par bucket..., +Inf, somme]
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name: str, n: float = 1, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    with _LOCK:
+        _COUNTERS[k] = _COUNTERS.get(k, 0) + n
+
+def observe(name: str, seconds: float, **labels):
+    if not ENABLED:
+        return
+    k = _key(name, labels)
+    i = 0
+    while i < len(BUCKETS) and seconds > BUCKETS[i]:
+        i += 1
+    with _LOCK:
+        h = _HISTS.get(k)
+        if h is None:
+            h = _HISTS[k] = [0] * (len(BUCKETS) + 2)
+        h[i] += 1
+        h[-1] += seconds
+
+class _Span:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name, labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe("stage_seconds", time.perf_counter() - self.t0, stage=self.name, **self.labels)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NO_SPAN = _NoSpan()
+
+def span(stage: str, **labels):
+    return _Span(stage, labels) if ENABLED else _NO_SPAN
+
+# ------- Lecture -------
+def snapshot() -> dict:
+    with _LOCK:
+        return {"counters": [[n, [list(kv) for kv in l], v] for (n, l), v in _COUNTERS.items()],
+                "hists": [[n, [list(kv) for kv in l], list(h)] for (n, l), h in _HISTS.items()]}
+
+def _state(others=None):
+    """Compteurs et histogrammes locaux + ceux des snapshots others {processus: snapshot}."""
+    with _LOCK:
+        counters, hists = dict(_COUNTERS), {k: list(v) for k, v in _HISTS.items()}
+    for proc, snap in (others or {}).items():
+        key = lambda n, l: (n, tuple(sorted([tuple(kv) for kv in l] + [("process", proc)])))
+        for n, l, v in snap.get("counters", []):
+            counters[key(n, l)] = v
+        for n, l, h in snap.get("hists", []):
+            if len(h) == len(BUCKETS) + 2:
+                hists[key(n, l)] = h
+    return counters, hists
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+def render(others=None) -> str:
+    """Exposition texte Prometheus (version 0.0.4)."""
+    counters, hists = _state(others)
+    counters, hists = sorted(counters.items()), sorted(hists.items())
+    out, seen = [], set()
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            out.append(f"# HELP {PREFIX}{name} {HELP.get(name, name)}")
+            out.append(f"# TYPE {PREFIX}{name} {kind}")
+    for (name, labels), v in counters:
+        header(name, "counter")
+        out.append(f"{PREFIX}{name}{_fmt_labels(labels)} {v:g}")
+    for (name, labels), h in hists:
+        header(name, "histogram")
+        cum = 0
+        for b, c in zip(BUCKETS, h):
+            cum += c
+            out.append(f"{PREFIX}{name}_bucket{_fmt_labels(labels, [('le', f'{b:g}')])} {cum}")
+        cum += h[len(BUCKETS)]
+        out.append(f"{PREFIX}{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {cum}")
+        out.append(f"{PREFIX}{name}_sum{_fmt_labels(labels)} {h[-1]:.6f}")
+        out.append(f"{PREFIX}{name}_count{_fmt_labels(labels)} {cum}")
+    return "\n".join(out) + "\n"
+
+def _quantile(h, q):
+    total = sum(h[:-1])
+    if not total:
+        return 0.0
+    rank, cum, lo = q * total, 0, 0.0
+    for b, c in zip(BUCKETS + (BUCKETS[-1],), h[:-1]):
+        if c and cum + c >= rank:
+            return lo + (b - lo) * (rank - cum) / c
+        cum += c; lo = b
+    return BUCKETS[-1]
+
+def stage_summary(name: str = "stage_seconds", by: str = "stage", others=None) -> list[dict]:
+    """Agrège un histogramme par label `by` (toutes sources confondues) → [{key, n, avg, p95, total}]."""
+    hists = [(dict(labels), h) for (n, labels), h in _state(others)[1].items() if n == name]
+    merged = {}
+    for labels, h in hists:
+        m = merged.setdefault(labels.get(by, ""), [0] * len(h))
+        for i, v in enumerate(h):
+            m[i] += v
+    rows = []
+    for key, h in merged.items():
+        n = sum(h[:-1])
+        rows.append({"key": key, "n": n, "avg": h[-1] / n if n else 0.0, "p95": _quantile(h, 0.95), "total": h[-1]})
+    return sorted(rows, key=lambda r: -r["total"])
+
+def counter_summary(name: str, by: str, others=None) -> list[tuple[str, float]]:
+    items = [(dict(labels).get(by, ""), v) for (n, labels), v in _state(others)[0].items() if n == name]
+    merged = {}
+    for k, v in items:
+        merged[k] = merged.get(k, 0) + v
+    return sorted(merged.items(), key=lambda kv: -kv[1])
@@ -0,0 +1,201 @@
+# profiler.py — Capture de profil à la demande (Console Arménienne), armée depuis /admin.
+# Cible : le prochain run_import_once, ou les N prochaines requêtes d'une route.
+# Artefacts (PROFILE_DIR/<horodatage>-<cible>/) : profile.pstats (cProfile, thread appelant),
+# stacks.folded (échantillonnage de tous les threads concernés, format flamegraph.pl / speedscope),
+# memory.txt (tracemalloc : plus fortes hausses d'allocation), summary.txt (top cumulatif).
+# Non armé : un test de dict par import / par requête, rien d'autre.
+
+import cProfile, io, os, pstats, shutil, sys, threading, time, tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+
+PROFILE_DIR   = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP  = int(os.environ.get("PROFILE_KEEP", "5"))
+SAMPLE_HZ     = int(os.environ.get("PROFILE_SAMPLE_HZ", "100"))
+ARTEFACTS     = ("summary.txt", "profile.pstats", "stacks.folded", "memory.txt")
+
+ARMED = {"import": False, "route": None, "remaining": 0}
+_LOCK = threading.Lock()
+_PROFILING = threading.Lock()          # un seul cProfile actif à la fois (contrainte de l'interpréteur)
+_REQ = {}                              # session de profilage des requêtes en cours
+
+# ------- Échantillonneur (piles repliées) -------
+class Sampler:
+    """Échantillonne sys._current_frames(). only : ensemble (partagé, tenu à jour) des threads suivis ;
+    à défaut, threads de `include` + threads créés après le départ (ex. pool de condensation)."""
+    def __init__(self, include=(), only=None):
+        self.only = only
+        self.baseline = {t.ident for t in threading.enumerate()} - set(include)
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(1 / max(1, SAMPLE_HZ)):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (ident not in self.only if self.only is not None else ident in self.baseline):
+                    continue
+                if ident not in names:
+                    names[ident] = next((t.name for t in threading.enumerate() if t.ident == ident), str(ident))
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names[ident])
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join(timeout=2)
+        return "\n".join(f"{s} {n}" for s, n in self.stacks.most_common()) + "\n"
+
+# ------- Artefacts -------
+def _memory_report(before, after, limit=30) -> str:
+    stats = after.compare_to(before, "lineno") if before else after.statistics("lineno")
+    total = sum(s.size for s in after.statistics("filename"))
+    lines = [f"tracemalloc : {total / 1048576:.1f} Mo suivis en fin de capture ; plus fortes hausses :"]
+    lines += [str(s) for s in stats[:limit]]
+    return "\n".join(lines) + "\n"
+
+def _save(kind: str, profiles, folded: str, memory: str, wall: float, note: str = "") -> str:
+    name = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S") + "-" + kind
+    path = os.path.join(PROFILE_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    summary = io.StringIO()
+    summary.write(f"{kind} — {wall:.2f}s{' — ' + note if note else ''}\n\n")
+    if profiles:
+        st = pstats.Stats(profiles[0], stream=summary)
+        for p in profiles[1:]:
+            st.add(p)
+        st.dump_stats(os.path.join(path, "profile.pstats"))
+        st.sort_stats("cumulative").print_stats(40)
+    for fname, text in (("summary.txt", summary.getvalue()), ("stacks.folded", folded), ("memory.txt", memory)):
+        with open(os.path.join(path, fname), "w", encoding="utf-8") as f:
+            f.write(text)
+    for old in list_captures()[PROFILE_KEEP:]:
+        shutil.rmtree(os.path.join(PROFILE_DIR, old), ignore_errors=True)
+    print(f"[PROFILE] capture {name} enregistrée ({wall:.1f}s)")
+    return name
+
+def list_captures() -> list[str]:
+    try:
+        return sorted((d for d in os.listdir(PROFILE_DIR) if os.path.isdir(os.path.join(PROFILE_DIR, d))),
+                      reverse=True)
+    except FileNotFoundError:
+        return []
+
+def artefact_path(capture: str, fname: str):
+    """Chemin d'un artefact existant, ou None (noms contrôlés : pas de traversée de répertoire)."""
+    if fname not in ARTEFACTS or capture not in list_captures():
+        return None
+    path = os.path.join(PROFILE_DIR, capture, fname)
+    return path if os.path.exists(path) else None
+
+def _start_tracemalloc():
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(10)
+    return started, tracemalloc.take_snapshot()
+
+def _stop_tracemalloc(started, before) -> str:
+    report = _memory_report(before, tracemalloc.take_snapshot())
+    if started:
+        tracemalloc.stop()
+    return report
+
+# ------- Import -------
+def arm_import():
+    with _LOCK:
+        ARMED["import"] = True
+
+def take_import() -> bool:
+    """Vrai (une seule fois) si le prochain import doit être profilé."""
+    if not ARMED["import"]:
+        return False
+    with _LOCK:
+        armed, ARMED["import"] = ARMED["import"], False
+    return armed
+
+def capture(kind: str, fn, *args, **kw):
+    """Exécute fn sous cProfile + échantillonneur + tracemalloc, enregistre la capture, renvoie le résultat de fn."""
+    if not _PROFILING.acquire(blocking=False):
+        print("[PROFILE] profileur déjà actif, capture ignorée")
+        return fn(*args, **kw)
+    try:
+        started, before = _start_tracemalloc()
+        sampler = Sampler(include=[threading.get_ident()]).start()
+        prof = cProfile.Profile()
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            return fn(*args, **kw)
+        finally:
+            prof.disable()
+            wall = time.perf_counter() - t0
+            _save(kind, [prof], sampler.stop(), _stop_tracemalloc(started, before), wall)
+    finally:
+        _PROFILING.release()
+
+# ------- Requêtes -------
+def arm_requests(route: str, n: int):
+    with _LOCK:
+        if _REQ:
+            return
+        ARMED.update(route=route, remaining=max(1, n))
+        started, before = _start_tracemalloc()
+        inflight = set()
+        _REQ.update(profiles=[], walls=[], sampler=Sampler(only=inflight).start(), started=started,
+                    before=before, inflight=inflight)
+
+def request_start(rule: str):
+    """Appelé avant chaque requête quand ARMED['remaining'] ; renvoie un jeton ou None."""
+    if rule != ARMED["route"] or not _PROFILING.acquire(blocking=False):
+        return None
+    with _LOCK:
+        if ARMED["remaining"] <= 0 or not _REQ:
+            _PROFILING.release()
+            return None
+        ARMED["remaining"] -= 1
+        _REQ["inflight"].add(threading.get_ident())
+    prof = cProfile.Profile()
+    t0 = time.perf_counter()
+    prof.enable()
+    return prof, t0
+
+def request_stop(token):
+    prof, t0 = token
+    prof.disable()
+    _PROFILING.release()
+    with _LOCK:
+        if not _REQ:                   # désarmé entre-temps
+            return
+        _REQ["inflight"].discard(threading.get_ident())
+        _REQ["profiles"].append(prof)
+        _REQ["walls"].append(time.perf_counter() - t0)
+        done = ARMED["remaining"] <= 0 and not _REQ["inflight"]
+        sess = dict(_REQ) if done else None
+        if done:
+            _REQ.clear()
+            ARMED.update(route=None, remaining=0)
+    if sess:
+        walls = sess["walls"]
+        _save("requetes", sess["profiles"], sess["sampler"].stop(),
+              _stop_tracemalloc(sess["started"], sess["before"]), sum(walls),
+              note=f"{len(walls)} requête(s), moyenne {sum(walls) / len(walls) * 1000:.1f} ms")
+
+def disarm():
+    with _LOCK:
+        sess = dict(_REQ)
+        _REQ.clear()
+        ARMED.update({"import": False, "route": None, "remaining": 0})
+    if sess:
+        sess["sampler"].stop()
+        if sess["started"]:
+            tracemalloc.stop()
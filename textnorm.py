@@ -0,0 +1,207 @@
+# textnorm.py — Normalisation des titres et corps (Console Arménienne)
+# Motifs précompilés, une seule tokenisation par texte. Sorties identiques à l'ancienne chaîne de re.sub
+# (vérifié par bench/bench_textnorm.py contre bench/textnorm_golden.json).
+
+import os, re
+
+# Longueurs cibles (mots)
+TARGET_MIN_WORDS = int(os.environ.get("TARGET_MIN_WORDS", "120"))
+TARGET_MAX_WORDS = int(os.environ.get("TARGET_MAX_WORDS", "800"))
+
+SIGNATURE = "- LesArmeniens.com"
+TITLE_MIN = 20
+TITLE_MAX = 110
+TITLE_FALLBACK = "Actualité"
+
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ0-9'’\-]+")
+FR_WORD_RE = re.compile(r"[a-zàâäéèêëïîôöùûüç'-]+")
+FR_TOKENS = set(" le la les un une des du de au aux et en sur pour par avec dans que qui ne pas est été sont était selon afin aussi plus leur lui ses ces cette ce cela donc ainsi tandis alors contre entre vers depuis sans sous après avant comme lorsque tandis que où dont même".split())
+
+SITE_SUFFIX_PAT = re.compile(
+    r"\s*(?:[-–|»]\s*)?(?:CivilNet|Armenpress|News\.am|Factor\.am|Hetq|Azatutyun|RFE/RL)\s*$",
+    re.I
+)
+# signature du site, mots parasites, URLs — appliqués dans cet ordre (l'ordre compte pour les URLs)
+TITLE_JUNK_PATS = (
+    re.compile(r"(?i)\blesarmeniens\s*\.?\s*com\b"),
+    re.compile(r"(?i)\b(?:published|publié|publication|rss|feed)\b"),
+    re.compile(r"\bhttps?://\S+\b"),
+)
+
+BANNED_TITLE_WORDS = {
+    "lesarmeniens", "lesarmeniens.com", "armenien", "armeniens", "com",
+    "published", "publié", "publication", "rss", "feed",
+    "facebook", "instagram", "twitter", "x", "tiktok", "youtube", "whatsapp"
+}
+
+CLEAN_LINES_PAT = re.compile(
+    r"""(?imx)
+    ^\s*(?:Lisez\s+aussi|Lire\s+aussi|Read\s+also|Related\s+articles?|More\s+on|Voir\s+aussi)\b.*$|
+    ^\s*(?:Photo|Crédit|Credit|Copyright)\s*:.*$|
+    ^\s*(?:Avec\s+AFP|Sources?\s*:).*$|
+    ^\s*(?:Suivez-nous|Follow\s+us|Abonnez-vous).*$|
+    ^\s*(?:©|Tous\s+droits\s+réservés).*$|
+    ^\s*Publié\s+le\s+.*$|
+    ^\s*Auteur\s*:.*$
+    """,
+    re.UNICODE,
+)
+_HSPACE_RE = re.compile(r"[ \t]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…»])\s+")
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+
+# ------- Primitives -------
+def strip_tags(s: str) -> str:
+    return TAG_RE.sub("", s or "")
+
+def tokenize_words(text: str) -> list[str]:
+    return WORD_RE.findall((text or "").lower())
+
+def word_count(text: str) -> int:
+    return len(tokenize_words(text))
+
+def alpha_ratio(s: str) -> float:
+    if not s: return 0.0
+    return sum(1 for ch in s if ch.isalpha()) / max(1, len(s))
+
+def digit_ratio(s: str) -> float:
+    if not s: return 0.0
+    return sum(1 for ch in s if ch.isdigit()) / max(1, len(s))
+
+def looks_french(text: str) -> bool:
+    if not text: return False
+    words = FR_WORD_RE.findall(text.lower())
+    if not words: return False
+    return sum(1 for w in words[:80] if w in FR_TOKENS) >= 5
+
+def ensure_signature(body: str) -> str:
+    b = (body or "").rstrip()
+    if not b.endswith(SIGNATURE):
+        b += "\n\n" + SIGNATURE
+    return b
+
+def _strip_signature(body: str) -> str:
+    b = (body or "").strip()
+    return b[:-len(SIGNATURE)].rstrip() if b.endswith(SIGNATURE) else b
+
+# ------- Titres -------
+def _smart_truncate(s: str, limit: int) -> str:
+    if len(s) <= limit:
+        return s
+    cut = s[:limit].rsplit(" ", 1)[0].strip(",.;:—-– ")
+    return cut if len(cut) >= TITLE_MIN else s[:limit].rstrip()
+
+def normalize_title(src: str) -> str:
+    """
+    Titre propre, anti-chiffres : suffixes de site / URLs / mots parasites retirés, tokens dominés par
+    des chiffres écartés (ex: '29-30-', '155-1-2', '2024'), casse de phrase, ≤ TITLE_MAX.
+    Les tokens ne contiennent que lettres/chiffres/'/’/- : la ponctuation est donc réglée par la tokenisation.
+    """
+    if not src:
+        return TITLE_FALLBACK
+    t = SITE_SUFFIX_PAT.sub("", src.strip())
+    for pat in TITLE_JUNK_PATS:
+        t = pat.sub("", t)
+    kept = []
+    for w in WORD_RE.findall(t):
+        wl = w.strip("-")
+        if not wl or wl.lower() in BANNED_TITLE_WORDS:
+            continue
+        if sum(1 for ch in wl if ch.isdigit()) / len(wl) >= 0.35:
+            continue
+        kept.append(wl)
+    t = " ".join(kept).replace("’", "'")
+    if t.isupper() and len(t) > 4:
+        t = t.capitalize()
+    if t and t[0].islower():
+        t = t[0].upper() + t[1:]
+
+    # Si trop de chiffres / trop pauvre → neutre (sera refait depuis le corps si besoin)
+    if len(kept) < 5 or alpha_ratio(t) < 0.55 or digit_ratio(t) > 0.25:
+        return TITLE_FALLBACK
+
+    if len(t) > TITLE_MAX:
+        t = _smart_truncate(t, TITLE_MAX)
+    t = t.rstrip()
+    if t.endswith(("—", "–", "-", ":", ";", ",")):
+        t = t[:-1].rstrip()
+    return t or TITLE_FALLBACK
+
+def title_from_text(fr_text: str) -> str:
+    """Titre de secours construit sur les 16 premiers mots du corps."""
+    t = (fr_text or "").strip()
+    if not t: return TITLE_FALLBACK
+    base = " ".join(WORD_RE.findall(t)[:16])[:TITLE_MAX]
+    return normalize_title(base)
+
+# ------- Corps -------
+def clean_body_text(body: str) -> str:
+    """Nettoie le texte final: supprime lignes inutiles, espaces multiples, doublons, assure signature."""
+    if not body:
+        return body
+    b = _strip_signature(body)
+    b = "\n".join(ln for ln in b.splitlines() if not CLEAN_LINES_PAT.match(ln))
+    b = _MULTI_NL_RE.sub("\n\n", _HSPACE_RE.sub(" ", b)).strip()
+    uniq = []
+    for para in b.split("\n\n"):
+        p = para.strip()
+        if not uniq or uniq[-1] != p:
+            uniq.append(p)
+    return ensure_signature("\n\n".join(uniq).strip())
+
+def ensure_min_words(body_text: str, source_text: str, min_words: int = TARGET_MIN_WORDS,
+                     max_words: int = TARGET_MAX_WORDS) -> str:
+    """Si body_text < min_words, complète à partir de la source (nettoyée), borne à max_words, garde signature."""
+    body = _strip_signature(body_text)
+    body_words = tokenize_words(body)
+    if len(body_words) >= min_words:
+        return ensure_signature(body)
+
+    src_clean = strip_tags(source_text or "")
+    seen = set(body.split())
+    extra = " ".join(w for w in src_clean.split() if w not in seen) or src_clean
+    extra_words = tokenize_words(extra)
+
+    need = max(0, min_words - len(body_words))
+    if need > 0 and extra_words:
+        added = extra_words[:min(len(extra_words), int(need * 1.3))]
+        body = (body + " " + " ".join(added)).strip()
+        body_words = body_words + added
+
+    if len(body_words) > max_words:
+        body = " ".join(body_words[:max_words])
+    return ensure_signature(body)
+
+def normalize_edited_body(body: str, min_words: int = TARGET_MIN_WORDS, max_words: int = TARGET_MAX_WORDS) -> str:
+    """Corps saisi dans l'admin: tokenisé une fois, borné à max_words, complété si court, nettoyé, signé."""
+    words = tokenize_words(body)[:max_words]
+    b = " ".join(words)
+    if len(words) >= min_words:
+        return clean_body_text(ensure_signature(b))
+    return clean_body_text(ensure_min_words(b, b, min_words, max_words))
+
+def truncate_text(text: str, max_words: int = TARGET_MAX_WORDS) -> str:
+    """Texte inchangé s'il tient dans max_words, sinon coupé en fin de paragraphe ou de phrase
+    (casse, ponctuation et paragraphes conservés) ; mot à mot seulement si la première phrase déborde."""
+    if word_count(text) <= max_words:
+        return text
+    kept, n = [], 0
+    for para in re.split(r"\n\s*\n", text.strip()):
+        w = word_count(para)
+        if n + w <= max_words:
+            kept.append(para.strip()); n += w
+            continue
+        sentences = []
+        for sent in _SENTENCE_END_RE.split(para.strip()):
+            w = word_count(sent)
+            if n + w > max_words:
+                break
+            sentences.append(sent); n += w
+        if sentences:
+            kept.append(" ".join(sentences))
+        break
+    if kept:
+        return "\n\n".join(kept)
+    ends = [m.end() for m in WORD_RE.finditer(text)]
+    return text[:ends[max_words - 1]].strip() + "…"
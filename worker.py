@@ -0,0 +1,105 @@
+# worker.py — Processus de fond de la Console Arménienne, séparé du web (gunicorn app:app).
+# Usage:
+#   python -m worker run                  boucles : import, scheduler, maintenance, rattrapage, diffusion,
+#                                         + tâches mises en file par /admin et /cron/import
+#   python -m worker import               un import RSS + scrapers, puis sortie
+#   python -m worker url URL [URL…]       importe ces articles (extraction, réécriture, insertion)
+#   python -m worker rewrite ID [ID…]     refait la réécriture FR d'articles existants (--since DATE : tous
+#                                         ceux créés depuis DATE)
+#   python -m worker maintenance          archivage + ménage + VACUUM
+# Le web tourne alors avec WEB_BACKGROUND=0 ; les deux processus partagent site.db (même répertoire).
+
+import argparse, json, os, sys, time, traceback
+from datetime import datetime, timezone
+
+os.environ["WEB_BACKGROUND"] = "0"      # l'import de app ne lance pas les boucles : on les démarre ici
+import app  # noqa: E402
+import metrics  # noqa: E402
+import profiler  # noqa: E402
+
+TASK_POLL_S = float(os.environ.get("WORKER_POLL_S", "2"))
+HEARTBEAT_S = 60
+
+def run_task(task) -> str:
+    """Exécute une tâche de worker_tasks (mise en file par le processus web) ; renvoie le message."""
+    kind, arg = task["kind"], json.loads(task["arg"] or "null")
+    if kind == "import":
+        return app.run_import_once()[2]
+    if kind == "maintenance":
+        return app.run_maintenance()
+    if kind == "backfill":
+        return app.run_backfill(arg["source"], arg["limit"], arg["poll"])
+    if kind == "profile_import":
+        profiler.arm_import()
+        return "profilage armé pour le prochain import"
+    raise ValueError(f"tâche inconnue: {kind}")
+
+def beat():
+    """Signe de vie + métriques et tokens IA du worker, relus par le web (/metrics, /admin), en un commit."""
+    app.flush_llm_stats({"worker_heartbeat": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                         "worker_metrics": json.dumps(metrics.snapshot())})
+
+def run_forever():
+    app.ROLE["worker"] = True
+    app.start_background()
+    print(f"[WORKER] démarré (pid {os.getpid()}), file de tâches toutes les {TASK_POLL_S:g}s")
+    last_beat = 0.0
+    while True:
+        if time.time() - last_beat >= HEARTBEAT_S:
+            beat()
+            last_beat = time.time()
+        task = app.claim_task()
+        if not task:
+            time.sleep(TASK_POLL_S)
+            continue
+        print(f"[WORKER] tâche #{task['id']} {task['kind']}")
+        try:
+            app.finish_task(task["id"], True, run_task(task))
+        except Exception as e:
+            traceback.print_exc()
+            app.finish_task(task["id"], False, f"{type(e).__name__}: {e}")
+        last_beat = 0.0                  # métriques à jour dès la fin de la tâche
+
+def rewrite_ids(ids, since=None):
+    if since:
+        con = app.db()
+        try:
+            ids = list(ids) + [r["id"] for r in con.execute(
+                "SELECT id FROM posts WHERE created_at >= ? ORDER BY id", (since,)).fetchall()]
+        finally:
+            con.close()
+    for pid in dict.fromkeys(ids):
+        print(app.rewrite_post(pid))
+    app.flush_llm_stats()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m worker")
+    sub = ap.add_subparsers(dest="cmd")
+    sub.add_parser("run", help="boucles de fond + tâches (défaut)")
+    sub.add_parser("import", help="un import complet puis sortie")
+    p_url = sub.add_parser("url", help="importe un ou plusieurs articles par URL")
+    p_url.add_argument("urls", nargs="+")
+    p_rw = sub.add_parser("rewrite", help="refait la réécriture d'articles existants")
+    p_rw.add_argument("ids", nargs="*", type=int)
+    p_rw.add_argument("--since", help="date ISO : tous les articles créés depuis")
+    sub.add_parser("maintenance", help="archivage + ménage + VACUUM")
+    args = ap.parse_args(argv)
+
+    if args.cmd in (None, "run"):
+        run_forever()
+    elif args.cmd == "import":
+        print(app.run_import_once()[2])
+    elif args.cmd == "url":
+        for u in args.urls:
+            print(app.import_url(u))
+        app.flush_llm_stats()
+    elif args.cmd == "rewrite":
+        if not args.ids and not args.since:
+            ap.error("rewrite : donner des IDs ou --since")
+        rewrite_ids(args.ids, args.since)
+    elif args.cmd == "maintenance":
+        print(app.run_maintenance())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())